@@ -1,4 +1,6 @@
 """Awx package."""
+from .async_awx import AsyncAwx
 from .awx import Awx
+from .instrument import Instrument
 
-__all__ = [Awx]
+__all__ = [Awx, AsyncAwx, Instrument]
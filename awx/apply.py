@@ -0,0 +1,383 @@
+"""Awx desired state module."""
+import time
+
+from .base import LoggerMixin
+from .parallel import imap_bounded
+
+
+class AwxApply(LoggerMixin):
+    """Awx desired state class.
+
+    Brings AWX in line with a desired state document listing organizations,
+    users, teams, memberships and roles:
+
+        organizations:
+          - name: Carbon
+            description: Carbon Organization
+        users:
+          - username: carbon
+            password: password
+            email: carbon@carbon.com
+            organizations: [Carbon]
+            admin_of: [Carbon]
+        teams:
+          - name: ops
+            organization: Carbon
+            members: [carbon]
+        roles:
+          - user: carbon
+            role: use
+            inventory: production
+
+    The current state of every object named in the document is fetched in
+    bulk with name__in filters, then only the differences are applied, with
+    concurrent requests, in three phases: organizations, then users and
+    teams, then memberships and roles. Passwords are only set on creation.
+    Applying the same document twice changes nothing the second time.
+    """
+
+    __api__ = '/api/v1/'
+    __plural__ = dict(
+        organization='organizations',
+        user='users',
+        team='teams',
+        project='projects',
+        inventory='inventories',
+        credential='credentials',
+        job_template='job_templates',
+        workflow_job_template='workflow_job_templates'
+    )
+    __fields__ = dict(
+        organization=('description',),
+        user=('email', 'first_name', 'last_name', 'is_superuser',
+              'is_system_auditor'),
+        team=('description',)
+    )
+
+    def __init__(self, awx, concurrency=8, prune=False):
+        """Constructor.
+
+        :param awx: Awx client.
+        :type awx: Awx
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :param prune: Remove organization and team members missing from the
+            document, for the organizations and teams it declares.
+        :type prune: bool
+        """
+        self.awx = awx
+        self.concurrency = concurrency
+        self.prune = prune
+        self._objects = {}
+        self._members = {}
+
+    @property
+    def http(self):
+        """Return HTTP session instance."""
+        return self.awx.http
+
+    @property
+    def executor(self):
+        """Return executor instance."""
+        return self.awx.registry.executor
+
+    def plan(self, state):
+        """Return the changes needed to reach a desired state.
+
+        :param state: Desired state document.
+        :type state: dict
+        :return: Changes, each a dict with phase, action, kind and name
+            keys, plus the request details.
+        :rtype: list
+        """
+        self._fetch(state)
+        changes = []
+
+        for item in state.get('organizations', []):
+            changes.extend(self._plan_object(1, 'organization', item))
+
+        for item in state.get('users', []):
+            item = dict(item, name=item['username'])
+            changes.extend(self._plan_object(2, 'user', item))
+
+        for item in state.get('teams', []):
+            changes.extend(self._plan_object(2, 'team', item))
+
+        # memberships of organizations and teams
+        wanted = {}
+        for item in state.get('organizations', []):
+            wanted[('organization', item['name'], 'users')] = set()
+            wanted[('organization', item['name'], 'admins')] = set()
+        for item in state.get('teams', []):
+            wanted[('team', item['name'], 'users')] = set(
+                item.get('members', [])
+            )
+        for item in state.get('users', []):
+            for organization in item.get('organizations', []):
+                wanted.setdefault(('organization', organization, 'users'),
+                                  set()).add(item['username'])
+            for organization in item.get('admin_of', []):
+                wanted.setdefault(('organization', organization, 'admins'),
+                                  set()).add(item['username'])
+
+        # only the organizations and teams the document declares are pruned
+        declared = set(('organization', item['name'])
+                       for item in state.get('organizations', []))
+        declared.update(('team', item['name'])
+                        for item in state.get('teams', []))
+
+        for key in sorted(wanted):
+            kind, name, relation = key
+            current = self._members.get(key, set())
+            for member in sorted(wanted[key] - current):
+                changes.append(dict(
+                    phase=3, action='associate', kind=kind, name=name,
+                    relation=relation, member_kind='user', member=member
+                ))
+            if self.prune and (kind, name) in declared and \
+                    (kind, name) in self._objects:
+                for member in sorted(current - wanted[key]):
+                    changes.append(dict(
+                        phase=3, action='disassociate', kind=kind,
+                        name=name, relation=relation, member_kind='user',
+                        member=member
+                    ))
+
+        # roles granted on resources, grants already in place are skipped
+        grants = self._grants(state)
+        known = [g for g in grants
+                 if g[0] in self._objects and g[2] in self._objects]
+        resolved = self.awx.role.resolve_grants(
+            known, self._objects, self.concurrency
+        )
+        existing = self.awx.role.existing_grants(resolved, self.concurrency)
+        done = set(item['grant'] for item in resolved
+                   if item['principal'] + (item['role'],) in existing)
+
+        for grant in grants:
+            if grant in done:
+                continue
+            done.add(grant)
+            (member_kind, member), type, (kind, name) = grant
+            changes.append(dict(
+                phase=3, action='grant', kind=kind, name=name,
+                relation='%s_role' % type, member_kind=member_kind,
+                member=member, grant=grant
+            ))
+
+        return changes
+
+    def apply(self, state, dry_run=False):
+        """Apply a desired state.
+
+        :param state: Desired state document.
+        :type state: dict
+        :param dry_run: Only report the changes needed.
+        :type dry_run: bool
+        :return: Changes with their status, counts per action and status,
+            and the elapsed seconds.
+        :rtype: dict
+        """
+        start = time.time()
+        changes = self.plan(state)
+        report = dict(changes=changes, failed=0, elapsed=0)
+
+        for change in changes:
+            report.setdefault(change['action'], 0)
+            report[change['action']] += 1
+            change['status'] = 'planned'
+
+        if not dry_run:
+            for phase in (1, 2, 3):
+                todo = [c for c in changes if c['phase'] == phase]
+                for change, _, error in imap_bounded(
+                        self._execute, todo, self.concurrency, self.executor):
+                    if error is None:
+                        change['status'] = 'applied'
+                        continue
+                    change['status'] = 'failed'
+                    change['error'] = str(getattr(
+                        getattr(error, 'response', None), 'text', error
+                    ))
+                    report['failed'] += 1
+                    self.logger.error('Failed to %s %s %s: %s',
+                                      change['action'], change['kind'],
+                                      change['name'], change['error'])
+
+        report['elapsed'] = time.time() - start
+        self.logger.info('%s %d changes in %.1fs, %d failed.',
+                         'Planned' if dry_run else 'Applied', len(changes),
+                         report['elapsed'], report['failed'])
+        return report
+
+    def _path(self, kind, pk=None, relation=None):
+        """Return the API path of a collection, object or sub collection.
+
+        :param kind: Object kind, e.g. organization.
+        :type kind: str
+        :param pk: Object id.
+        :type pk: int
+        :param relation: Sub collection, e.g. users.
+        :type relation: str
+        :rtype: str
+        """
+        path = '%s%s/' % (self.__api__, self.__plural__[kind])
+        if pk is not None:
+            path += '%s/' % pk
+        if relation is not None:
+            path += '%s/' % relation
+        return path
+
+    def _grants(self, state):
+        """Return the role grants requested by a desired state document.
+
+        :param state: Desired state document.
+        :type state: dict
+        :return: (principal, role type, resource) tuples, see
+            AwxRole.resolve_grants.
+        :rtype: list
+        """
+        grants = []
+        for item in state.get('roles', []):
+            member_kind = 'team' if 'team' in item else 'user'
+            kinds = [k for k in self.__plural__
+                     if k in item and k not in ('user', 'team')]
+            if len(kinds) != 1:
+                raise Exception('Role %s needs exactly one resource.' % item)
+
+            grants.append(((member_kind, item[member_kind]), item['role'],
+                           (kinds[0], item[kinds[0]])))
+        return grants
+
+    def _fetch(self, state):
+        """Fetch the current state of the objects named in a document.
+
+        :param state: Desired state document.
+        :type state: dict
+        """
+        names = set()
+        for item in state.get('organizations', []):
+            names.add(('organization', item['name']))
+        for item in state.get('users', []):
+            names.add(('user', item['username']))
+            names.update(('organization', o) for o in
+                         item.get('organizations', []) +
+                         item.get('admin_of', []))
+        for item in state.get('teams', []):
+            names.add(('team', item['name']))
+            names.add(('organization', item['organization']))
+            names.update(('user', m) for m in item.get('members', []))
+        for principal, _, resource in self._grants(state):
+            names.update((principal, resource))
+
+        self._objects = self.awx.role.lookup_many(
+            names, concurrency=self.concurrency, required=False
+        )
+
+        # current members of organizations and teams
+        listings = []
+        for kind, name in sorted(self._objects):
+            relations = dict(organization=('users', 'admins'),
+                             team=('users',)).get(kind, ())
+            for relation in relations:
+                listings.append(((kind, name, relation), self._path(
+                    kind, self._id(kind, name), relation)))
+
+        self._members = {}
+        for (key, path), members, error in imap_bounded(
+                lambda item: list(self.http.iterate(item[1])),
+                listings, self.concurrency, self.executor):
+            if error is not None:
+                raise error
+            # members missing from the document are known for pruning
+            self._members[key] = set()
+            for obj in members:
+                self._objects.setdefault(('user', obj['username']), obj)
+                self._members[key].add(obj['username'])
+
+    def _id(self, kind, name):
+        """Return the id of an object.
+
+        :param kind: Object kind.
+        :type kind: str
+        :param name: Object name.
+        :type name: str
+        :rtype: int
+        :raises Exception: When the object does not exist.
+        """
+        try:
+            return self._objects[(kind, name)]['id']
+        except KeyError:
+            raise Exception('%s %s not found.' % (kind.capitalize(), name))
+
+    def _plan_object(self, phase, kind, item):
+        """Return the change creating or updating an object, if any.
+
+        :param phase: Phase the change is applied in.
+        :type phase: int
+        :param kind: Object kind.
+        :type kind: str
+        :param item: Desired object.
+        :type item: dict
+        :rtype: list
+        """
+        fields = dict((f, item[f]) for f in self.__fields__[kind]
+                      if f in item)
+        current = self._objects.get((kind, item['name']))
+
+        if current is None:
+            data = dict(fields)
+            if kind == 'user':
+                data.update(username=item['name'],
+                            password=item.get('password'))
+            else:
+                data['name'] = item['name']
+            if kind == 'team':
+                data['organization'] = item['organization']
+            return [dict(phase=phase, action='create', kind=kind,
+                         name=item['name'], data=data)]
+
+        changed = dict((f, v) for f, v in fields.items()
+                       if current.get(f) != v)
+        if changed:
+            return [dict(phase=phase, action='update', kind=kind,
+                         name=item['name'], data=changed)]
+        return []
+
+    def _execute(self, change):
+        """Apply a change.
+
+        :param change: Change.
+        :type change: dict
+        """
+        kind, name = change['kind'], change['name']
+
+        if change['action'] == 'create':
+            data = dict(change['data'])
+            if kind == 'team':
+                data['organization'] = self._id(
+                    'organization', data['organization']
+                )
+            self._objects[(kind, name)] = self.http.post(
+                self._path(kind), data
+            )
+
+        elif change['action'] == 'update':
+            self._objects[(kind, name)] = self.http.patch(
+                self._path(kind, self._id(kind, name)), change['data']
+            )
+
+        elif change['action'] == 'grant':
+            # every name is known once users and teams are created
+            role = self.awx.role
+            role.assign(role.resolve_grants(
+                [change['grant']], self._objects)[0])
+
+        else:
+            data = dict(id=self._id(change['member_kind'], change['member']))
+            if change['action'] == 'disassociate':
+                data['disassociate'] = True
+            self.http.post(
+                self._path(kind, self._id(kind, name), change['relation']),
+                data
+            )
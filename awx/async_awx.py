@@ -0,0 +1,208 @@
+"""Awx non-blocking client module."""
+from .awx import Awx
+from .parallel import Executor, Future
+
+
+class AsyncWrapper(object):
+    """Non-blocking wrapper class.
+
+    Mirrors a wrapper (e.g. AwxHost): calling a method, or reading a
+    property, schedules it on the client executor and returns a Future
+    instead of blocking the caller.
+    """
+
+    def __init__(self, wrapper, executor):
+        """Constructor.
+
+        :param wrapper: Wrapper instance.
+        :type wrapper: AwxBase
+        :param executor: Executor running the calls.
+        :type executor: Executor
+        """
+        self._wrapper = wrapper
+        self._executor = executor
+
+    @property
+    def wrapper(self):
+        """Return the blocking wrapper instance."""
+        return self._wrapper
+
+    def __getattr__(self, name):
+        """Return a non-blocking version of a wrapper attribute."""
+        # properties issue requests when read, run them on the executor too
+        if isinstance(getattr(type(self._wrapper), name, None), property):
+            return self._executor.submit(getattr, self._wrapper, name)
+
+        attr = getattr(self._wrapper, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self._executor.submit(attr, *args, **kwargs)
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+
+
+class AsyncJobWrapper(AsyncWrapper):
+    """Non-blocking job wrapper class.
+
+    Waiting for jobs is served by the job watcher of the client, so any
+    number of jobs can be waited on without holding an executor thread.
+    """
+
+    def watch(self, job_id, callback=None, timeout=None):
+        """Watch a job until it finishes.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param callback: Callable taking the future once the job finishes.
+        :type callback: callable
+        :param timeout: Seconds before the watch is aborted.
+        :type timeout: float
+        :return: future completed with the finished job
+        :rtype: Future
+        """
+        return self._wrapper.watch(job_id, callback, timeout)
+
+    def wait(self, job_id, timeout=600):
+        """Wait for a job to finish.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :return: future completed with the finished job, failed when the job
+            failed
+        :rtype: Future
+        """
+        future = Future()
+
+        def done(watch):
+            error = watch.exception()
+            if error is None and watch.result()['failed']:
+                error = Exception('Job %s failed.' % job_id)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(watch.result())
+
+        self.watch(job_id, timeout=timeout).add_done_callback(done)
+        return future
+
+    def monitor(self, job_id, interval=None, timeout=600):
+        """Wait for a job to finish.
+
+        Unlike the blocking monitor, standard out is not streamed.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param interval: Ignored, the job watcher adapts its interval.
+        :type interval: float
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :return: future completed with the finished job
+        :rtype: Future
+        """
+        return self.wait(job_id, timeout)
+
+
+class AsyncAwx(object):
+    """Non-blocking Awx class.
+
+    Mirrors the main wrappers of Awx (job, job_template, workflow_job,
+    host, inventory and project) with methods returning futures. Calls run
+    on a bounded pool of threads shared by the client, waiting for jobs
+    uses the batched job watcher. The blocking Awx client it drives stays
+    available as the awx property.
+    """
+
+    def __init__(self, host=None, username=None, password=None, workers=16,
+                 awx=None, **kwargs):
+        """Constructor.
+
+        :param host: Ansible AWX host URL.
+        :type host: str
+        :param username: AWX username.
+        :type username: str
+        :param password: AWX password.
+        :type password: str
+        :param workers: Maximum number of calls running at once.
+        :type workers: int
+        :param awx: Blocking client to drive, created when not given.
+        :type awx: Awx
+        :param kwargs: Further Awx constructor arguments.
+        :type kwargs: dict
+        """
+        if awx is None:
+            kwargs.setdefault('pool_size', max(workers, 10))
+            awx = Awx(host, username, password, **kwargs)
+        self._awx = awx
+        self._executor = Executor(workers)
+        self._wrappers = {}
+
+    @property
+    def awx(self):
+        """Return the blocking client instance."""
+        return self._awx
+
+    @property
+    def executor(self):
+        """Return executor instance."""
+        return self._executor
+
+    def _wrap(self, name, cls=AsyncWrapper):
+        """Return the non-blocking wrapper of a client wrapper.
+
+        :param name: Client wrapper property name.
+        :type name: str
+        :param cls: Non-blocking wrapper class.
+        :type cls: type
+        """
+        try:
+            return self._wrappers[name]
+        except KeyError:
+            wrapper = cls(getattr(self._awx, name), self._executor)
+            return self._wrappers.setdefault(name, wrapper)
+
+    @property
+    def job(self):
+        """Return job instance."""
+        return self._wrap('job', AsyncJobWrapper)
+
+    @property
+    def job_template(self):
+        """Return job template instance."""
+        return self._wrap('job_template')
+
+    @property
+    def workflow_job(self):
+        """Return workflow job instance."""
+        return self._wrap('workflow_job', AsyncJobWrapper)
+
+    @property
+    def host(self):
+        """Return host instance."""
+        return self._wrap('host')
+
+    @property
+    def inventory(self):
+        """Return inventory instance."""
+        return self._wrap('inventory')
+
+    @property
+    def project(self):
+        """Return project instance."""
+        return self._wrap('project')
+
+    def close(self):
+        """Wait for the scheduled calls and stop the executor threads."""
+        self._executor.shutdown()
+
+    def __enter__(self):
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit the runtime context."""
+        self.close()
@@ -2,7 +2,8 @@
 from tower_cli.conf import settings
 
 from . import __name__ as __awx_name__
-from .base import LoggerMixin
+from .base import AwxRegistry, LoggerMixin
+from .cache import LookupCache
 from .commands.ad_hoc import AwxAdHoc
 from .commands.config import AwxConfig
 from .commands.credential import AwxCredential
@@ -33,7 +34,9 @@ class Awx(LoggerMixin):
 
     __tower_cli_cfg__ = '/etc/tower/tower_cli.cfg'
 
-    def __init__(self, host=None, username=None, password=None, verbose=1):
+    def __init__(self, host=None, username=None, password=None, verbose=1,
+                 cache_size=1024, cache_ttl=300, pool_size=10, timeout=30,
+                 retries=3, gzip=True):
         """Constructor.
 
         :param host: Ansible AWX host URL.
@@ -44,6 +47,18 @@ class Awx(LoggerMixin):
         :type password: str
         :param verbose: Logging verbosity level.
         :type verbose: int
+        :param cache_size: Maximum number of cached name lookups.
+        :type cache_size: int
+        :param cache_ttl: Seconds a cached name lookup stays valid.
+        :type cache_ttl: int
+        :param pool_size: Maximum number of REST connections kept open.
+        :type pool_size: int
+        :param timeout: Seconds to wait for a REST response.
+        :type timeout: float
+        :param retries: Number of retries of a failed idempotent request.
+        :type retries: int
+        :param gzip: Ask AWX for compressed REST responses.
+        :type gzip: bool
         """
         self.create_logger(__awx_name__, verbose=verbose)
 
@@ -58,33 +73,15 @@ class Awx(LoggerMixin):
                     val = item.split(':', 1)
                     setattr(self, '_awx_%s' % val[0], val[1].strip())
 
-        self._ad_hoc = AwxAdHoc()
-        self._config = AwxConfig()
-        self._credential = AwxCredential()
-        self._group = AwxGroup()
-        self._host = AwxHost()
-        self._inventory = AwxInventory()
-        self._inventory_script = AwxInventoryScript()
-        self._job = AwxJob()
-        self._job_template = AwxJobTemplate()
-        self._label = AwxLabel()
-        self._node = AwxNode()
-        self._notification_template = AwxNotificationTemplate()
-        self._organization = AwxOrganization()
-        self._permission = AwxPermission()
-        self._project = AwxProject(
-            host=self._awx_host,
-            username=self._awx_username,
-            password=self._awx_password
-        )
-        self._role = AwxRole()
-        self._schedule = AwxSchedule()
-        self._setting = AwxSetting()
-        self._team = AwxTeam()
-        self._user = AwxUser()
-        self._version = AwxVersion()
-        self._workflow = AwxWorkflow()
-        self._workflow_job = AwxWorkflowJob(
+        # wrappers are created on first access and shared by each other
+        self._registry = AwxRegistry(
+            cache=LookupCache(maxsize=cache_size, ttl=cache_ttl),
+            http_options=dict(
+                pool_size=pool_size,
+                timeout=timeout,
+                retries=retries,
+                gzip=gzip
+            ),
             host=self._awx_host,
             username=self._awx_username,
             password=self._awx_password
@@ -108,117 +105,132 @@ class Awx(LoggerMixin):
         if value:
             settings.set_or_reset_runtime_param(key, value)
 
+    @property
+    def registry(self):
+        """Return registry instance."""
+        return self._registry
+
+    @property
+    def cache(self):
+        """Return lookup cache instance."""
+        return self.registry.cache
+
+    @property
+    def http(self):
+        """Return HTTP session instance."""
+        return self.registry.http
+
     @property
     def ad_hoc(self):
         """Return ad hoc instance."""
-        return self._ad_hoc
+        return self.registry.get(AwxAdHoc)
 
     @property
     def config(self):
         """Return config instance."""
-        return self._config
+        return self.registry.get(AwxConfig)
 
     @property
     def credential(self):
         """Return credential instance."""
-        return self._credential
+        return self.registry.get(AwxCredential)
 
     @property
     def group(self):
         """Return group instance."""
-        return self._group
+        return self.registry.get(AwxGroup)
 
     @property
     def host(self):
         """Return host instance."""
-        return self._host
+        return self.registry.get(AwxHost)
 
     @property
     def inventory(self):
         """Return inventory instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def inventory_script(self):
         """Return inventory script instance."""
-        return self._inventory_script
+        return self.registry.get(AwxInventoryScript)
 
     @property
     def job(self):
         """Return job instance."""
-        return self._job
+        return self.registry.get(AwxJob)
 
     @property
     def job_template(self):
         """Return job template instance."""
-        return self._job_template
+        return self.registry.get(AwxJobTemplate)
 
     @property
     def label(self):
         """Return label instance."""
-        return self._label
+        return self.registry.get(AwxLabel)
 
     @property
     def node(self):
         """Return node instance."""
-        return self._node
+        return self.registry.get(AwxNode)
 
     @property
     def notification_template(self):
         """Return notification template instance."""
-        return self._notification_template
+        return self.registry.get(AwxNotificationTemplate)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def permission(self):
         """Return permission instance."""
-        return self._permission
+        return self.registry.get(AwxPermission)
 
     @property
     def project(self):
         """Return project instance."""
-        return self._project
+        return self.registry.get(AwxProject)
 
     @property
     def role(self):
         """Return role instance."""
-        return self._role
+        return self.registry.get(AwxRole)
 
     @property
     def schedule(self):
         """Return schedule instance."""
-        return self._schedule
+        return self.registry.get(AwxSchedule)
 
     @property
     def setting(self):
         """Return setting instance."""
-        return self._setting
+        return self.registry.get(AwxSetting)
 
     @property
     def team(self):
         """Return team instance."""
-        return self._team
+        return self.registry.get(AwxTeam)
 
     @property
     def user(self):
         """Return user instance."""
-        return self._user
+        return self.registry.get(AwxUser)
 
     @property
     def version(self):
         """Return version instance."""
-        return self._version
+        return self.registry.get(AwxVersion)
 
     @property
     def workflow(self):
         """Return workflow instance."""
-        return self._workflow
+        return self.registry.get(AwxWorkflow)
 
     @property
     def workflow_job(self):
         """Return workflow job instance."""
-        return self._workflow_job
+        return self.registry.get(AwxWorkflowJob)
@@ -1,14 +1,41 @@
 """Awx base module."""
-import inspect
+import threading
 from logging import DEBUG, INFO
 from logging import Formatter, getLogger, StreamHandler
 
 from tower_cli import get_resource
+from tower_cli.conf import settings
+
+from .cache import LookupCache
+from .http import AwxHttp
+from .instrument import Instrumented
+from .parallel import Executor, imap_bounded, prefetch as _prefetch
+from .watcher import JobWatcher
+
+
+class ClassLogger(object):
+    """Class logger descriptor.
+
+    Resolves the logger named after the module defining the class on first
+    access and caches it on that class, so later accesses only cost a
+    dictionary lookup instead of walking the call stack.
+    """
+
+    def __get__(self, instance, owner):
+        """Return the logger for the owner class."""
+        try:
+            return owner.__dict__['_class_logger']
+        except KeyError:
+            logger = getLogger(owner.__module__)
+            setattr(owner, '_class_logger', logger)
+            return logger
 
 
 class LoggerMixin(object):
     """A logger mixin class."""
 
+    logger = ClassLogger()
+
     @classmethod
     def create_logger(cls, name, verbose):
         """Create logger.
@@ -46,16 +73,153 @@ class LoggerMixin(object):
         logger.setLevel(log_level)
         logger.addHandler(handler)
 
+
+class AwxRegistry(object):
+    """Awx registry class.
+
+    Holds one lazily created instance per wrapper class for a single client,
+    so wrappers that depend on each other share the same objects instead of
+    building private dependency chains.
+    """
+
+    def __init__(self, cache=None, http_options=None, **kwargs):
+        """Constructor.
+
+        :param cache: Lookup cache shared by the wrappers.
+        :type cache: LookupCache
+        :param http_options: Options of the shared HTTP session, see
+            AwxHttp.
+        :type http_options: dict
+        :param kwargs: Connection details (host, username, password) passed
+            to wrappers talking to the REST API directly.
+        :type kwargs: dict
+        """
+        self.cache = cache if cache is not None else LookupCache()
+        self.kwargs = kwargs
+        self.http_options = http_options or {}
+        self._http = None
+        self._executor = None
+        self._instances = {}
+        self._watchers = {}
+        self._lock = threading.RLock()
+
+    @property
+    def http(self):
+        """Return the HTTP session shared by the wrappers."""
+        if self._http is None:
+            with self._lock:
+                if self._http is None:
+                    self._http = AwxHttp(
+                        **dict(self.connection, **self.http_options)
+                    )
+        return self._http
+
     @property
-    def logger(self):
-        """Return logger."""
-        return getLogger(inspect.getmodule(inspect.stack()[1][0]).__name__)
+    def connection(self):
+        """Return the connection details of the shared HTTP session.
+
+        Registries created without them, e.g. by a wrapper instantiated on
+        its own, fall back to the tower-cli settings.
+
+        :return: Host, username and password.
+        :rtype: dict
+        :raises Exception: When no host, username or password is set.
+        """
+        connection = dict(
+            (key, self.kwargs.get(key) or getattr(settings, key, None))
+            for key in ('host', 'username', 'password')
+        )
+        missing = sorted(key for key, value in connection.items()
+                         if not value)
+        if missing:
+            raise Exception('AWX connection %s not configured, pass them to '
+                            'Awx or set them in the tower-cli settings.' %
+                            ', '.join(missing))
+
+        # tower-cli defaults to https when no scheme is given
+        if '://' not in connection['host']:
+            connection['host'] = 'https://%s' % connection['host']
+        return connection
+
+    @property
+    def executor(self):
+        """Return the executor running the wrappers' concurrent calls.
+
+        It has one thread per connection of the shared HTTP session.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = Executor(
+                        self.http_options.get('pool_size', 10)
+                    )
+        return self._executor
+
+    def watcher(self, name):
+        """Return the job watcher shared by the wrappers of a resource.
+
+        :param name: Resource name, e.g. job.
+        :type name: str
+        :rtype: JobWatcher
+        """
+        try:
+            return self._watchers[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._watchers:
+                self._watchers[name] = JobWatcher(get_resource(name))
+            return self._watchers[name]
+
+    def get(self, cls):
+        """Return the shared instance of a wrapper class.
+
+        :param cls: Wrapper class.
+        :type cls: type
+        :return: Wrapper instance.
+        :rtype: AwxBase
+        """
+        try:
+            return self._instances[cls]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if cls not in self._instances:
+                self._instances[cls] = cls(registry=self)
+            return self._instances[cls]
+
+    @property
+    def instances(self):
+        """Return the wrapper instances created so far."""
+        return list(self._instances.values())
 
 
 class AwxBase(LoggerMixin):
-    """Awx base class."""
+    """Awx base class.
+
+    Public methods are recorded as operations by the enabled instruments,
+    see awx.instrument.
+    """
+    __metaclass__ = Instrumented
     __resource_name__ = None
 
+    def __init__(self, registry=None):
+        """Constructor.
+
+        :param registry: Registry shared with the other wrappers of a client.
+        :type registry: AwxRegistry
+        """
+        if registry is None:
+            registry = AwxRegistry()
+        self._registry = registry
+
+    @property
+    def registry(self):
+        """Return registry instance."""
+        return self._registry
+
     @property
     def name(self):
         """Return resource name."""
@@ -65,3 +229,138 @@ class AwxBase(LoggerMixin):
     def resource(self):
         """Return resource class object."""
         return get_resource(self.name)
+
+    @property
+    def cache(self):
+        """Return lookup cache instance."""
+        return self.registry.cache
+
+    @property
+    def http(self):
+        """Return HTTP session instance."""
+        return self.registry.http
+
+    @property
+    def executor(self):
+        """Return executor instance."""
+        return self.registry.executor
+
+    @property
+    def watcher(self):
+        """Return the job watcher of the resource."""
+        return self.registry.watcher(self.name)
+
+    def _cached_get(self, **fields):
+        """Get a single resource object by its lookup fields.
+
+        The object is served from the lookup cache when present, otherwise
+        fetched from AWX and cached.
+
+        :return: Resource object.
+        :rtype: dict
+        :raises NotFound: When no object matches the fields.
+        """
+        return self.cache.get_or_load(
+            self.name, fields, lambda: self.resource.get(**fields)
+        )
+
+    def iterate(self, page_size=200, fields=None, prefetch=False,
+                **filters):
+        """Yield every object of the resource, fetching one page at a time.
+
+        Only one page is held in memory, and the first objects are yielded
+        as soon as the first page arrives.
+
+        :param page_size: Number of objects requested per page.
+        :type page_size: int
+        :param fields: Names of the fields kept in each yielded object, None
+            to keep every field.
+        :type fields: list
+        :param prefetch: Fetch the next page in a background thread while
+            the current one is consumed.
+        :type prefetch: bool
+        :param filters: Server side filters, e.g. inventory=1 or
+            name__startswith='web'.
+        :type filters: dict
+        :return: Generator of objects.
+        :rtype: generator
+        """
+        pages = self._pages(page_size, filters)
+        if prefetch:
+            pages = _prefetch(pages)
+
+        for page in pages:
+            for item in page:
+                if fields:
+                    item = dict((field, item.get(field)) for field in fields)
+                yield item
+
+    def _pages(self, page_size, filters):
+        """Yield the objects of the resource page by page.
+
+        :param page_size: Number of objects requested per page.
+        :type page_size: int
+        :param filters: Server side filters.
+        :type filters: dict
+        """
+        page = 1
+        while page:
+            response = self.resource.list(
+                page=page, page_size=page_size, **filters
+            )
+            yield response['results']
+            page = response['next']
+
+    def _invalidate(self, **fields):
+        """Drop cached objects of this resource matching the lookup fields."""
+        self.cache.invalidate(self.name, **fields)
+
+    def _by_name(self, path, names, concurrency=8, field='name'):
+        """Look up the objects of a list endpoint by name in bulk.
+
+        :param path: API path of a list endpoint.
+        :type path: str
+        :param names: Names.
+        :type names: iterable
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :param field: Name field, e.g. username for users.
+        :type field: str
+        :return: Objects found, keyed by name.
+        :rtype: dict
+        """
+        return self._by_names({(path, field): names}, concurrency)[
+            (path, field)]
+
+    def _by_names(self, lookups, concurrency=8):
+        """Look up the objects of several list endpoints by name in bulk.
+
+        Names are looked up with one name__in filtered listing per endpoint
+        and hundred names, issued concurrently.
+
+        :param lookups: Names keyed by (API path, name field) tuples.
+        :type lookups: dict
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Objects found keyed by name, per (API path, name field).
+        :rtype: dict
+        """
+        chunks = []
+        for key, names in lookups.items():
+            names = sorted(set(names))
+            chunks.extend((key, names[i:i + 100])
+                          for i in range(0, len(names), 100))
+
+        def fetch(chunk):
+            (path, field), names = chunk
+            return list(self.http.iterate(
+                path, **{'%s__in' % field: ','.join(names)}))
+
+        objects = dict((key, {}) for key in lookups)
+        for ((path, field), _), items, error in imap_bounded(
+                fetch, chunks, concurrency, self.executor):
+            if error is not None:
+                raise error
+            objects[(path, field)].update(
+                (item[field], item) for item in items)
+        return objects
@@ -0,0 +1,300 @@
+"""Awx cache module."""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LookupCache(object):
+    """Lookup cache class.
+
+    A bounded, least recently used cache with a time to live per entry. It
+    maps a resource name plus the fields used to look the resource up (e.g.
+    ('host', name='web01', inventory=4)) to the object returned by AWX, so
+    repeated name to id resolution does not cost a request each time.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        """Constructor.
+
+        :param maxsize: Maximum number of entries kept.
+        :type maxsize: int
+        :param ttl: Seconds an entry stays valid, 0 disables caching.
+        :type ttl: int
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def key(resource, fields):
+        """Return the cache key for a lookup.
+
+        :param resource: Resource name.
+        :type resource: str
+        :param fields: Lookup fields.
+        :type fields: dict
+        :return: Cache key.
+        :rtype: tuple
+        """
+        return (resource,) + tuple(sorted(fields.items()))
+
+    @property
+    def stats(self):
+        """Return hit, miss and eviction counters."""
+        with self._lock:
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries)
+            )
+
+    def __len__(self):
+        """Return number of entries."""
+        return len(self._entries)
+
+    def get(self, resource, fields):
+        """Return a cached object.
+
+        :param resource: Resource name.
+        :type resource: str
+        :param fields: Lookup fields.
+        :type fields: dict
+        :return: Cached object.
+        :rtype: dict
+        :raises KeyError: When the entry is missing or expired.
+        """
+        key = self.key(resource, fields)
+
+        with self._lock:
+            try:
+                expires, value = self._entries.pop(key)
+            except KeyError:
+                self._misses += 1
+                raise
+
+            if expires < time.time():
+                self._misses += 1
+                raise KeyError(key)
+
+            # re-insert to mark the entry as most recently used
+            self._entries[key] = (expires, value)
+            self._hits += 1
+            return value
+
+    def set(self, resource, fields, value):
+        """Cache an object.
+
+        :param resource: Resource name.
+        :type resource: str
+        :param fields: Lookup fields.
+        :type fields: dict
+        :param value: Object to cache.
+        :type value: dict
+        """
+        if not self.ttl or not self.maxsize:
+            return
+
+        key = self.key(resource, fields)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, value)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_load(self, resource, fields, loader):
+        """Return a cached object, loading and caching it when missing.
+
+        Exceptions raised by the loader (e.g. not found) are propagated and
+        nothing is cached.
+
+        :param resource: Resource name.
+        :type resource: str
+        :param fields: Lookup fields.
+        :type fields: dict
+        :param loader: Callable returning the object.
+        :type loader: callable
+        :return: Object.
+        :rtype: dict
+        """
+        try:
+            return self.get(resource, fields)
+        except KeyError:
+            pass
+
+        value = loader()
+        self.set(resource, fields, value)
+        return value
+
+    def invalidate(self, resource, **fields):
+        """Drop entries of a resource matching the given lookup fields.
+
+        Without fields every entry of the resource is dropped.
+
+        :param resource: Resource name.
+        :type resource: str
+        """
+        match = set(fields.items())
+
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == resource and match.issubset(key[1:]):
+                    del self._entries[key]
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+class PlaybookIndex(object):
+    """Playbook index class.
+
+    A reverse index from playbook path, and playbook file name, to the name
+    of the project providing it. Each project entry records a stamp built
+    from the project's SCM revision and modification time, so refreshing
+    only fetches the playbooks of projects that changed. The index can be
+    persisted to a JSON file to survive between runs.
+    """
+
+    def __init__(self, path=None):
+        """Constructor.
+
+        :param path: JSON file the index is persisted to, None to keep it in
+            memory only.
+        :type path: str
+        """
+        self.path = path
+        self.projects = {}
+        self._paths = {}
+        self._basenames = {}
+        self._ordered = []
+
+        if path:
+            self.load()
+
+    @staticmethod
+    def stamp(project):
+        """Return the stamp identifying the state of a project.
+
+        :param project: Project object.
+        :type project: dict
+        :rtype: str
+        """
+        return '%s@%s' % (project.get('scm_revision'), project.get('modified'))
+
+    def stale(self, projects):
+        """Return the projects whose playbooks need to be fetched.
+
+        :param projects: Project objects.
+        :type projects: list
+        :rtype: list
+        """
+        stale = []
+        for project in projects:
+            entry = self.projects.get(str(project['id']))
+            if entry is None or entry['stamp'] != self.stamp(project):
+                stale.append(project)
+        return stale
+
+    def update(self, projects, playbooks):
+        """Update the index.
+
+        :param projects: Every project object, projects missing from this
+            list are dropped from the index.
+        :type projects: list
+        :param playbooks: Playbooks of the refreshed projects, keyed by
+            project name.
+        :type playbooks: dict
+        """
+        entries = {}
+        for project in projects:
+            key = str(project['id'])
+            if project['name'] in playbooks:
+                entries[key] = dict(
+                    name=project['name'],
+                    stamp=self.stamp(project),
+                    playbooks=playbooks[project['name']]
+                )
+            elif key in self.projects:
+                entries[key] = dict(self.projects[key], name=project['name'])
+
+        self.projects = entries
+        self._build()
+        self.save()
+
+    def lookup(self, playbook):
+        """Return the name of the project providing a playbook.
+
+        The playbook is matched by its path within the project first, then
+        by its file name, and last by any playbook path containing it.
+
+        :param playbook: Playbook path, file name or part of a path.
+        :type playbook: str
+        :return: Project name, None when no playbook matches.
+        :rtype: str
+        """
+        try:
+            return self._paths[playbook]
+        except KeyError:
+            pass
+
+        try:
+            return self._basenames[os.path.basename(playbook)]
+        except KeyError:
+            pass
+
+        for path, name in self._ordered:
+            if playbook in path:
+                return name
+        return None
+
+    def load(self):
+        """Load the index from its file, starting empty if unreadable."""
+        try:
+            with open(self.path, 'r') as fh:
+                self.projects = json.load(fh)
+        except (IOError, ValueError):
+            self.projects = {}
+        self._build()
+
+    def save(self):
+        """Persist the index to its file."""
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # write then rename so readers never see a partial file
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump(self.projects, fh)
+        os.rename(tmp, self.path)
+
+    def _build(self):
+        """Rebuild the reverse lookup tables."""
+        self._paths = {}
+        self._basenames = {}
+        self._ordered = []
+
+        # lowest project id wins when several projects provide a playbook
+        for key in sorted(self.projects, key=int):
+            entry = self.projects[key]
+            for playbook in entry['playbooks']:
+                self._ordered.append((playbook, entry['name']))
+                self._paths.setdefault(playbook, entry['name'])
+                self._basenames.setdefault(
+                    os.path.basename(playbook), entry['name']
+                )
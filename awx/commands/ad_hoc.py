@@ -4,6 +4,7 @@ from tower_cli.exceptions import NotFound
 from .credential import AwxCredential
 from .inventory import AwxInventory
 from ..base import AwxBase
+from ..stdout import iter_stdout, write_stdout
 
 
 # TODO: Add in additional parameters that are optional for all methods.
@@ -13,27 +14,30 @@ class AwxAdHoc(AwxBase):
     """Awx ad hoc class."""
     __resource_name__ = 'ad_hoc'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxAdHoc, self).__init__()
-        self._credential = AwxCredential()
-        self._inventory = AwxInventory()
+        super(AwxAdHoc, self).__init__(registry)
 
     @property
     def credential(self):
         """Return credential instance."""
-        return self._credential
+        return self.registry.get(AwxCredential)
 
     @property
     def inventory(self):
         """Return inventory instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def ad_hocs(self):
         """Return list of ad hocs."""
         return self.resource.list()
 
+    def iter_ad_hocs(self, page_size=200, fields=None, prefetch=False,
+                     **filters):
+        """Return a generator over the ad hoc commands, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def cancel(self):
         """Cancel a running ad hoc job."""
         raise NotImplementedError
@@ -69,7 +73,7 @@ class AwxAdHoc(AwxBase):
         # get inventory object
         _inventory = self.inventory.get(inventory)
 
-        self.logger.info('Launching ad hoc module %s.' % module)
+        self.logger.info('Launching ad hoc module %s.', module)
 
         data = self.resource.launch(
             job_type=job_type,
@@ -79,7 +83,7 @@ class AwxAdHoc(AwxBase):
             module_args=module_args
         )
 
-        self.logger.info('Ad hoc module %s successfully launched!' % module)
+        self.logger.info('Ad hoc module %s successfully launched!', module)
 
         return data
 
@@ -92,7 +96,7 @@ class AwxAdHoc(AwxBase):
         try:
             return self.resource.get(job_id)
         except NotFound as ex:
-            self.logger.error('Ad hoc job id %s does not exist!' % job_id)
+            self.logger.error('Ad hoc job id %s does not exist!', job_id)
             raise Exception(ex.message)
 
     def status(self, job_id):
@@ -110,3 +114,43 @@ class AwxAdHoc(AwxBase):
         :type job_id: int
         """
         return self.resource.stdout(job_id)
+
+    def iter_stdout(self, job_id, start_line=0, follow=True,
+                    chunk_lines=1000):
+        """Iterate over the ad hoc job's standard out as it is produced.
+
+        :param job_id: Ad hoc job id.
+        :type job_id: int
+        :param start_line: Line offset to start from, e.g. a saved offset.
+        :type start_line: int
+        :param follow: Keep polling until the job finishes.
+        :type follow: bool
+        :param chunk_lines: Maximum number of lines per request.
+        :type chunk_lines: int
+        :return: Generator of (next line offset, content) tuples.
+        :rtype: generator
+        """
+        return iter_stdout(self.resource, job_id, start_line, follow,
+                           chunk_lines)
+
+    def tail_stdout(self, job_id, sink, start_line=0, follow=True,
+                    chunk_lines=1000):
+        """Write the ad hoc job's standard out to a file-like object.
+
+        :param job_id: Ad hoc job id.
+        :type job_id: int
+        :param sink: File-like object, e.g. an open file or sys.stdout.
+        :type sink: file
+        :param start_line: Line offset to start from, e.g. a saved offset.
+        :type start_line: int
+        :param follow: Keep polling until the job finishes.
+        :type follow: bool
+        :param chunk_lines: Maximum number of lines per request.
+        :type chunk_lines: int
+        :return: Line offset to resume from.
+        :rtype: int
+        """
+        return write_stdout(
+            self.iter_stdout(job_id, start_line, follow, chunk_lines),
+            sink, start_line
+        )
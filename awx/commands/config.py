@@ -8,6 +8,6 @@ class AwxConfig(AwxBase):
     """Awx config class."""
     __resource_name__ = 'config'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxConfig, self).__init__()
+        super(AwxConfig, self).__init__(registry)
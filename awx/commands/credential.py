@@ -13,21 +13,25 @@ class AwxCredential(AwxBase):
     """Awx credential class."""
     __resource_name__ = 'credential'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxCredential, self).__init__()
-        self._organization = AwxOrganization()
+        super(AwxCredential, self).__init__(registry)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def credentials(self):
         """Return list of credentials."""
         return self.resource.list()
 
+    def iter_credentials(self, page_size=200, fields=None, prefetch=False,
+                         **filters):
+        """Return a generator over the credentials, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create_ssh_credential(self, name, organization, ssh_key_file):
         """Create a SSH credential entry.
 
@@ -63,11 +67,14 @@ class AwxCredential(AwxBase):
                 fail_on_found=True
             )
         except Found:
-            self.logger.warn('Credential %s already exists!' % name)
+            self.logger.warn('Credential %s already exists!', name)
+
+        self._invalidate(name=name)
 
     def delete(self, name, kind):
         """Delete a credential entry."""
         self.resource.delete(name=name, kind=kind)
+        self._invalidate(name=name)
 
     def get(self, name):
         """Get credential.
@@ -78,6 +85,6 @@ class AwxCredential(AwxBase):
         :type dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
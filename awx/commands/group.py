@@ -12,21 +12,25 @@ class AwxGroup(AwxBase):
     """Awx group class."""
     __resource_name__ = 'group'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxGroup, self).__init__()
-        self._inventory = AwxInventory()
+        super(AwxGroup, self).__init__(registry)
 
     @property
     def inventory(self):
         """Return inventory instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def groups(self):
         """Return list of groups."""
         return self.resource.list()
 
+    def iter_groups(self, page_size=200, fields=None, prefetch=False,
+                    **filters):
+        """Return a generator over the groups, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, inventory):
         """Create a group.
 
@@ -45,9 +49,11 @@ class AwxGroup(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('Group %s already exists!' % name)
+            self.logger.error('Group %s already exists!', name)
             raise Exception(ex.message)
 
+        self._invalidate(name=name, inventory=inventory['id'])
+
     def delete(self, name, inventory):
         """Delete a group.
 
@@ -59,9 +65,10 @@ class AwxGroup(AwxBase):
         # get inventory
         inventory = self.inventory.get(inventory)
 
-        self.logger.info('Deleting group %s.' % name)
+        self.logger.info('Deleting group %s.', name)
         self.resource.delete(name=name)
-        self.logger.info('Group %s successfully deleted!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Group %s successfully deleted!', name)
 
     def get(self, name, inventory):
         """Get group.
@@ -74,6 +81,6 @@ class AwxGroup(AwxBase):
         # get inventory
         inventory = self.inventory.get(inventory)
         try:
-            return self.resource.get(name=name, inventory=inventory['id'])
+            return self._cached_get(name=name, inventory=inventory['id'])
         except NotFound as ex:
             raise Exception(ex.message)
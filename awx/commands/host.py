@@ -1,11 +1,13 @@
 """Awx host helper module."""
 import json
 
+import requests
 from tower_cli.exceptions import NotFound
 
 from .group import AwxGroup
 from .inventory import AwxInventory
 from ..base import AwxBase
+from ..parallel import imap_bounded
 
 
 # TODO: Add in additional parameters that are optional for all methods.
@@ -15,27 +17,30 @@ class AwxHost(AwxBase):
     """Awx host class."""
     __resource_name__ = 'host'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxHost, self).__init__()
-        self._group = AwxGroup()
-        self._inventory = AwxInventory()
+        super(AwxHost, self).__init__(registry)
 
     @property
     def group(self):
         """Return group instance."""
-        return self._group
+        return self.registry.get(AwxGroup)
 
     @property
     def inventory(self):
         """Return inventory instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def hosts(self):
         """Return list of hosts."""
         return self.resource.list()
 
+    def iter_hosts(self, page_size=200, fields=None, prefetch=False,
+                   **filters):
+        """Return a generator over the hosts, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def associate(self, name, group, inventory):
         """Associate host with a group.
 
@@ -52,8 +57,121 @@ class AwxHost(AwxBase):
 
         self.resource.associate(host=host['id'], group=group['id'])
 
-    def disassociate(self, name, group):
-        """"""
+    def disassociate(self, name, group, inventory):
+        """Disassociate host from a group.
+
+        :param name: Host name.
+        :type name: str
+        :param group: Group name.
+        :type group: str
+        :param inventory: Inventory name.
+        :type inventory: str
+        """
+        # get group
+        group = self.group.get(group, inventory)
+
+        # get host
+        host = self.get(name, inventory)
+
+        self.resource.disassociate(host=host['id'], group=group['id'])
+
+    def sync_groups(self, inventory, mapping, prune=True, concurrency=8):
+        """Synchronize the hosts of groups with a desired membership.
+
+        The inventory is resolved once, groups and hosts are looked up in
+        bulk with name__in filters and the current hosts of every group are
+        listed concurrently. Only the missing memberships are associated
+        and, when pruning, the extra ones disassociated, concurrently.
+
+            awx.host.sync_groups('production', {
+                'web': ['web1', 'web2'],
+                'db': ['db1']
+            })
+
+        :param inventory: Inventory name.
+        :type inventory: str
+        :param mapping: Desired host names keyed by group name.
+        :type mapping: dict
+        :param prune: Disassociate hosts missing from the mapping, from the
+            groups it lists.
+        :type prune: bool
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Counts of associated, disassociated, unchanged and failed
+            memberships, with the failures and their error.
+        :rtype: dict
+        :raises Exception: When the inventory, a group or a host does not
+            exist.
+        """
+        # check if inventory exists
+        try:
+            _inv = self.inventory.get(inventory)
+        except Exception:
+            raise Exception('Inventory %s not found.' % inventory)
+
+        mapping = dict((group, set(hosts)) for group, hosts in mapping.items())
+        path = '/api/v1/inventories/%s/' % _inv['id']
+
+        names = set().union(*mapping.values())
+        groups = self._by_name(path + 'groups/', mapping, concurrency)
+        hosts = self._by_name(path + 'hosts/', names, concurrency)
+        for kind, wanted, found in (('Group', mapping, groups),
+                                    ('Host', names, hosts)):
+            missing = sorted(set(wanted) - set(found))
+            if missing:
+                raise Exception('%s %s not found.' % (kind,
+                                                      ', '.join(missing)))
+
+        # current direct hosts of every group
+        current = {}
+        for group, members, error in imap_bounded(
+                lambda name: list(self.http.iterate(
+                    '/api/v1/groups/%s/hosts/' % groups[name]['id'])),
+                sorted(mapping), concurrency, self.executor):
+            if error is not None:
+                raise error
+            current[group] = dict((host['name'], host['id'])
+                                  for host in members)
+
+        changes = []
+        report = dict(associated=0, disassociated=0, unchanged=0, failed=0,
+                      errors=[])
+        for group in sorted(mapping):
+            for name in sorted(mapping[group]):
+                if name in current[group]:
+                    report['unchanged'] += 1
+                else:
+                    changes.append((group, name, hosts[name]['id'], False))
+            if prune:
+                for name in sorted(set(current[group]) - mapping[group]):
+                    changes.append((group, name, current[group][name], True))
+
+        def apply_change(change):
+            group, _, host_id, remove = change
+            data = dict(id=host_id)
+            if remove:
+                data['disassociate'] = True
+            self.http.post('/api/v1/groups/%s/hosts/' % groups[group]['id'],
+                           data)
+
+        for change, _, error in imap_bounded(
+                apply_change, changes, concurrency, self.executor):
+            group, name, _, remove = change
+            if error is None:
+                report['disassociated' if remove else 'associated'] += 1
+                continue
+            error = getattr(getattr(error, 'response', None), 'text', error)
+            self.logger.error('Failed to %s host %s and group %s: %s',
+                              'disassociate' if remove else 'associate',
+                              name, group, error)
+            report['failed'] += 1
+            report['errors'].append((group, name, str(error)))
+
+        self.logger.info('Groups synchronized in inventory %s: %d '
+                         'associated, %d disassociated, %d failed.',
+                         inventory, report['associated'],
+                         report['disassociated'], report['failed'])
+        return report
 
     def create(self, name, inventory, variables=None):
         """Create a host."""
@@ -63,7 +181,7 @@ class AwxHost(AwxBase):
         except Exception:
             raise Exception('Inventory %s not found.' % inventory)
 
-        self.logger.info('Creating host %s.' % name)
+        self.logger.info('Creating host %s.', name)
 
         self.resource.create(
             name=name,
@@ -72,7 +190,120 @@ class AwxHost(AwxBase):
             fail_on_found=True
         )
 
-        self.logger.info('Host %s successfully created!' % name)
+        self._invalidate(name=name, inventory=_inv['id'])
+        self.logger.info('Host %s successfully created!', name)
+
+    def bulk_create(self, inventory, hosts, concurrency=8, retries=2):
+        """Create many hosts in an inventory.
+
+        The inventory is resolved once, then hosts are streamed from the
+        iterable and posted over the shared HTTP session by a bounded pool
+        of threads. Connection errors, timeouts and overload responses are
+        retried with the session's randomized exponential back-off. Hosts
+        that already exist are reported, not treated as failures.
+
+        :param inventory: Inventory name.
+        :type inventory: str
+        :param hosts: Host names, (name, variables) tuples or dicts with a
+            name key and optional variables, description and enabled keys.
+        :type hosts: iterable
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :param retries: Number of retries per host.
+        :type retries: int
+        :return: Counts per status and a result per host.
+        :rtype: dict
+        """
+        # check if inventory exists
+        try:
+            _inv = self.inventory.get(inventory)
+        except Exception:
+            raise Exception('Inventory %s not found.' % inventory)
+
+        self.logger.info('Creating hosts in inventory %s.', inventory)
+
+        report = dict(created=0, exists=0, failed=0, results=[])
+
+        def create_host(host):
+            record = self._host_record(host, _inv['id'])
+            return self._post_host(record, retries)
+
+        for host, result, error in imap_bounded(create_host, hosts,
+                                                concurrency, self.executor):
+            if error is not None:
+                result = dict(name=self._host_name(host), id=None,
+                              status='failed', error=str(error))
+            report[result['status']] += 1
+            report['results'].append(result)
+
+        self._invalidate(inventory=_inv['id'])
+        self.logger.info('Hosts created in inventory %s: %d created, '
+                         '%d existing, %d failed.', inventory,
+                         report['created'], report['exists'], report['failed'])
+        return report
+
+    @staticmethod
+    def _host_name(host):
+        """Return the name of a host given to bulk_create, if it has one.
+
+        :param host: Host name, (name, variables) tuple or dict.
+        :type host: str
+        :rtype: str
+        """
+        if isinstance(host, basestring):
+            return host
+        if isinstance(host, (list, tuple)):
+            return host[0] if host else None
+        if isinstance(host, dict):
+            return host.get('name')
+        return None
+
+    @classmethod
+    def _host_record(cls, host, inventory_id):
+        """Return the request body creating a host.
+
+        :param host: Host name, (name, variables) tuple or dict.
+        :type host: str
+        :param inventory_id: Inventory id.
+        :type inventory_id: int
+        :rtype: dict
+        """
+        if not cls._host_name(host):
+            raise Exception('Host %r has no name.' % (host,))
+        if inventory_id is None:
+            raise Exception('Host %s has no inventory.' % cls._host_name(host))
+
+        if isinstance(host, basestring):
+            host = dict(name=host)
+        elif isinstance(host, (list, tuple)):
+            host = dict(zip(('name', 'variables'), host))
+
+        record = dict(host, inventory=inventory_id)
+        if not isinstance(record.get('variables'), (basestring, type(None))):
+            record['variables'] = json.dumps(record['variables'])
+        return record
+
+    def _post_host(self, record, retries):
+        """Create a single host, retrying transient failures.
+
+        A retried request may have created the host already, it is then
+        reported as existing.
+
+        :param record: Request body.
+        :type record: dict
+        :param retries: Number of retries.
+        :type retries: int
+        :return: Host result.
+        :rtype: dict
+        """
+        try:
+            host = self.http.post('/api/v1/hosts/', record, retries=retries)
+        except requests.HTTPError as ex:
+            if ex.response.status_code == 400 and \
+                    'already exists' in ex.response.text:
+                return dict(name=record['name'], id=None, status='exists')
+            raise
+        return dict(name=record['name'], id=host['id'], status='created')
 
     def delete(self, name, inventory):
         """Delete a host."""
@@ -82,9 +313,10 @@ class AwxHost(AwxBase):
         except Exception:
             raise Exception('Inventory %s not found.' % inventory)
 
-        self.logger.info('Deleting host %s.' % name)
+        self.logger.info('Deleting host %s.', name)
         self.resource.delete(name=name, inventory=_inv['id'])
-        self.logger.info('Host %s successfully deleted!' % name)
+        self._invalidate(name=name, inventory=_inv['id'])
+        self.logger.info('Host %s successfully deleted!', name)
 
     def get(self, name, inventory):
         """Get host.
@@ -98,6 +330,6 @@ class AwxHost(AwxBase):
         inventory = self.inventory.get(inventory)
 
         try:
-            return self.resource.get(name=name, inventory=inventory['id'])
+            return self._cached_get(name=name, inventory=inventory['id'])
         except NotFound as ex:
             raise Exception(ex.message)
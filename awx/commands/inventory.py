@@ -12,21 +12,25 @@ class AwxInventory(AwxBase):
     """Awx inventory class."""
     __resource_name__ = 'inventory'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxInventory, self).__init__()
-        self._organization = AwxOrganization()
+        super(AwxInventory, self).__init__(registry)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def inventories(self):
         """Return list of inventories."""
         return self.resource.list()
 
+    def iter_inventories(self, page_size=200, fields=None, prefetch=False,
+                         **filters):
+        """Return a generator over the inventories, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, organization, description=None, variables=None):
         """Create an inventory file.
 
@@ -46,7 +50,7 @@ class AwxInventory(AwxBase):
         if not _org:
             raise Exception('Organization %s not found.' % organization)
 
-        self.logger.info('Creating inventory %s.' % name)
+        self.logger.info('Creating inventory %s.', name)
 
         try:
             self.resource.create(
@@ -57,10 +61,11 @@ class AwxInventory(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('Inventory %s already exists!' % name)
+            self.logger.error('Inventory %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Inventory %s successfully created!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Inventory %s successfully created!', name)
 
     def delete(self, name):
         """Delete an inventory.
@@ -68,9 +73,14 @@ class AwxInventory(AwxBase):
         :param name: Filename.
         :type name: str
         """
-        self.logger.info('Deleting inventory %s.' % name)
+        self.logger.info('Deleting inventory %s.', name)
         self.resource.delete(name=name)
-        self.logger.info('Inventory %s successfully deleted!' % name)
+        self._invalidate(name=name)
+
+        # hosts and groups are deleted along with their inventory
+        self.cache.invalidate('host')
+        self.cache.invalidate('group')
+        self.logger.info('Inventory %s successfully deleted!', name)
 
     def get(self, name):
         """Get inventory.
@@ -81,6 +91,6 @@ class AwxInventory(AwxBase):
         :rtype: dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
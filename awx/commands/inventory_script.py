@@ -8,6 +8,6 @@ class AwxInventoryScript(AwxBase):
     """Awx inventory script class."""
     __resource_name__ = 'inventory_script'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxInventoryScript, self).__init__()
+        super(AwxInventoryScript, self).__init__(registry)
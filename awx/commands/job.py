@@ -1,34 +1,150 @@
 """Awx job helper module."""
 import json
+import threading
 
+import requests
 from tower_cli.exceptions import NotFound
 
 from .job_template import AwxJobTemplate
 from ..base import AwxBase
+from ..parallel import Future
+from ..stdout import iter_stdout, write_stdout
 
 
 # TODO: Add in additional parameters that are optional for all methods.
 
 
+class LaunchHandle(object):
+    """Launch handle class.
+
+    Launches a job template repeatedly with one request per launch. The
+    template id and launch endpoint are resolved once, and the static part
+    of the request body is serialized once, so a launch only serializes
+    its extra variables.
+    """
+
+    def __init__(self, job, name, static=None):
+        """Constructor.
+
+        :param job: Job instance resolving the template.
+        :type job: AwxJob
+        :param name: Template name.
+        :type name: str
+        :param static: Request body fields sent with every launch.
+        :type static: dict
+        """
+        self.name = name
+        self._job = job
+        self._static = json.dumps(static or {})[1:-1]
+        self._path = None
+        self.resolve()
+
+    @property
+    def path(self):
+        """Return the launch endpoint."""
+        return self._path
+
+    def resolve(self):
+        """Resolve the template launch endpoint.
+
+        :raises Exception: When the template is not found or needs
+            passwords to start.
+        """
+        _job_template = self._job.job_template.get(self.name)
+        path = '/api/v1/job_templates/%s/launch/' % _job_template['id']
+
+        # passwords can not be prompted for, fail early
+        needed = self._job.http.get(path).get('passwords_needed_to_start')
+        if needed:
+            raise Exception('Job template %s needs passwords to start: %s.' %
+                            (self.name, ', '.join(needed)))
+        self._path = path
+
+    def launch(self, extra_vars=None):
+        """Launch a job.
+
+        :param extra_vars: Extra variables, a dict or a list of dicts merged
+            in order.
+        :type extra_vars: list
+        :return: Launch data, including the job id.
+        :rtype: dict
+        """
+        body = self._body(extra_vars)
+        try:
+            response = self._post(body)
+        except requests.HTTPError as ex:
+            if ex.response.status_code != 404:
+                raise Exception(ex.response.text)
+
+            # the template was replaced, resolve it again once
+            self._job.cache.invalidate(
+                self._job.job_template.name, name=self.name
+            )
+            self.resolve()
+            response = self._post(body)
+
+        response.setdefault('id', response.get('job'))
+        return response
+
+    def _body(self, extra_vars):
+        """Return the request body of a launch.
+
+        :param extra_vars: Extra variables.
+        :type extra_vars: list
+        :rtype: str
+        """
+        if isinstance(extra_vars, (list, tuple)):
+            merged = {}
+            for elem in extra_vars:
+                merged.update(elem)
+            extra_vars = merged
+
+        fields = [self._static] if self._static else []
+        if extra_vars:
+            fields.append('"extra_vars": %s' % json.dumps(
+                json.dumps(extra_vars)
+            ))
+        return '{%s}' % ', '.join(fields)
+
+    def _post(self, body):
+        """Post a launch request.
+
+        :param body: JSON request body.
+        :type body: str
+        :return: Decoded response.
+        :rtype: dict
+        """
+        return self._job.http.request(
+            'POST', self._path, data=body,
+            headers={'Content-Type': 'application/json'}
+        ).json()
+
+
 class AwxJob(AwxBase):
     """Awx job class."""
     __resource_name__ = 'job'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxJob, self).__init__()
-        self._job_template = AwxJobTemplate()
+        super(AwxJob, self).__init__(registry)
+        self._handles = {}
+        self._handles_lock = threading.Lock()
 
     @property
     def job_template(self):
         """Return job template instance."""
-        return self._job_template
+        return self.registry.get(AwxJobTemplate)
 
     @property
     def jobs(self):
         """Return a list of jobs."""
         return self.resource.list()
 
+    def iter_jobs(self, page_size=200, fields=None, prefetch=False,
+                  **filters):
+        """Return a generator over the jobs, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def launch(self, name, reason, extra_vars=None):
         """Launch a new job from a job template.
 
@@ -58,6 +174,39 @@ class AwxJob(AwxBase):
             extra_vars=_extra_vars
         )
 
+    def launch_handle(self, name, reason=None):
+        """Return a handle launching a job template repeatedly.
+
+        Handles are memoized per template and reason, so the template is
+        resolved once however many jobs are launched from it. The template
+        is resolved outside the memo lock; concurrent callers asking for
+        the same handle wait on its future, others are not held up. A
+        failed resolution is not memoized.
+
+        :param name: Template name.
+        :type name: str
+        :param reason: Reason for template launch.
+        :type reason: str
+        :return: Launch handle.
+        :rtype: LaunchHandle
+        """
+        key = (name, reason)
+        with self._handles_lock:
+            future = self._handles.get(key)
+            owner = future is None
+            if owner:
+                future = self._handles[key] = Future()
+
+        if owner:
+            static = dict(job_explanation=reason) if reason else None
+            try:
+                future.set_result(LaunchHandle(self, name, static))
+            except Exception as ex:
+                with self._handles_lock:
+                    del self._handles[key]
+                future.set_exception(ex)
+        return future.result()
+
     def status(self, job_id):
         """Get the job status
 
@@ -71,6 +220,30 @@ class AwxJob(AwxBase):
         except NotFound as ex:
             raise Exception(ex.message)
 
+    def statuses(self, job_ids, batch_size=200):
+        """Get many jobs with one list request per batch of ids
+
+        :param job_ids: job ids.
+        :type job_ids: list
+        :param batch_size: Maximum number of ids per request.
+        :type batch_size: int
+        :return: jobs keyed by job id, missing jobs are left out
+        :rtype: dict
+        """
+        job_ids = [int(job_id) for job_id in job_ids]
+        jobs = {}
+
+        for start in range(0, len(job_ids), batch_size):
+            batch = job_ids[start:start + batch_size]
+            response = self.resource.list(
+                page_size=len(batch),
+                query=[('id__in', ','.join(str(i) for i in batch))]
+            )
+            for job in response['results']:
+                jobs[job['id']] = job
+
+        return jobs
+
     def stdout(self, job_id):
         """Get the job's standard out
 
@@ -84,6 +257,46 @@ class AwxJob(AwxBase):
         except NotFound as ex:
             raise Exception(ex.message)
 
+    def iter_stdout(self, job_id, start_line=0, follow=True,
+                    chunk_lines=1000):
+        """Iterate over the job's standard out as it is produced.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param start_line: Line offset to start from, e.g. a saved offset.
+        :type start_line: int
+        :param follow: Keep polling until the job finishes.
+        :type follow: bool
+        :param chunk_lines: Maximum number of lines per request.
+        :type chunk_lines: int
+        :return: Generator of (next line offset, content) tuples.
+        :rtype: generator
+        """
+        return iter_stdout(self.resource, job_id, start_line, follow,
+                           chunk_lines)
+
+    def tail_stdout(self, job_id, sink, start_line=0, follow=True,
+                    chunk_lines=1000):
+        """Write the job's standard out to a file-like object.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param sink: File-like object, e.g. an open file or sys.stdout.
+        :type sink: file
+        :param start_line: Line offset to start from, e.g. a saved offset.
+        :type start_line: int
+        :param follow: Keep polling until the job finishes.
+        :type follow: bool
+        :param chunk_lines: Maximum number of lines per request.
+        :type chunk_lines: int
+        :return: Line offset to resume from.
+        :rtype: int
+        """
+        return write_stdout(
+            self.iter_stdout(job_id, start_line, follow, chunk_lines),
+            sink, start_line
+        )
+
     def monitor(self, job_id, interval=0.5, timeout=600):
         """Monitor the job
 
@@ -101,6 +314,38 @@ class AwxJob(AwxBase):
         except NotFound as ex:
             raise Exception(ex.message)
 
+    def watch(self, job_id, callback=None, timeout=None):
+        """Watch the job until it finishes without blocking.
+
+        Every watched job is polled by one shared watcher with a single
+        batched request, backing off while no status changes.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param callback: Callable taking the future once the job finishes.
+        :type callback: callable
+        :param timeout: Seconds before the watch is aborted.
+        :type timeout: float
+        :return: future completed with the finished job
+        :rtype: Future
+        """
+        return self.watcher.watch(job_id, callback, timeout)
+
+    def wait(self, job_id, timeout=600):
+        """Wait for the job to finish
+
+        :param job_id: job id.
+        :type job_id: int
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :return: job information
+        :rtype: dict
+        """
+        job = self.watch(job_id, timeout=timeout).result()
+        if job['failed']:
+            raise Exception('Job %s failed.' % job_id)
+        return job
+
     def cancel(self, job_id):
         """Get the job
 
@@ -17,39 +17,40 @@ class AwxJobTemplate(AwxBase):
     """Awx job template class."""
     __resource_name__ = 'job_template'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxJobTemplate, self).__init__()
-        self._inventory = AwxInventory()
-        self._credential = AwxCredential()
-        self._project = AwxProject()
-        self._notification_template = AwxNotificationTemplate()
+        super(AwxJobTemplate, self).__init__(registry)
 
     @property
     def project(self):
         """Return project instance."""
-        return self._project
+        return self.registry.get(AwxProject)
 
     @property
     def credential(self):
         """Return credential instance."""
-        return self._credential
+        return self.registry.get(AwxCredential)
 
     @property
     def inventory(self):
         """Return inventory instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def notification_template(self):
         """Return notification instance."""
-        return self._notification_template
+        return self.registry.get(AwxNotificationTemplate)
 
     @property
     def job_templates(self):
         """Return a list of job templates."""
         return self.resource.list()
 
+    def iter_job_templates(self, page_size=200, fields=None, prefetch=False,
+                           **filters):
+        """Return a generator over the job templates, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, description, job_type, inventory, project, playbook,
                credential, extra_vars=None, ask_variables_on_launch=False,
                limit=None):
@@ -93,7 +94,7 @@ class AwxJobTemplate(AwxBase):
         else:
             _extra_vars = None
 
-        self.logger.info('Creating job template %s.' % name)
+        self.logger.info('Creating job template %s.', name)
 
         try:
             self.resource.create(
@@ -110,10 +111,11 @@ class AwxJobTemplate(AwxBase):
                 limit=limit
             )
         except Found as ex:
-            self.logger.error('Job template %s already exists!' % name)
+            self.logger.error('Job template %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Job template %s successfully created!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Job template %s successfully created!', name)
 
     def delete(self, name, project):
         """Delete a job template.
@@ -127,9 +129,10 @@ class AwxJobTemplate(AwxBase):
         _project = self.project.get(project)
 
         # delete job template
-        self.logger.info('Deleting job template %s.' % name)
+        self.logger.info('Deleting job template %s.', name)
         self.resource.delete(name=name, project=_project['id'])
-        self.logger.info('Job template %s successfully deleted!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Job template %s successfully deleted!', name)
 
     def get(self, name):
         """Get job template.
@@ -140,7 +143,7 @@ class AwxJobTemplate(AwxBase):
         :rtype: dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
 
@@ -8,6 +8,6 @@ class AwxLabel(AwxBase):
     """Awx label class."""
     __resource_name__ = 'label'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxLabel, self).__init__()
+        super(AwxLabel, self).__init__(registry)
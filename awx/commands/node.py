@@ -8,6 +8,6 @@ class AwxNode(AwxBase):
     """Awx node class."""
     __resource_name__ = 'node'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxNode, self).__init__()
+        super(AwxNode, self).__init__(registry)
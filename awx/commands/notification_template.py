@@ -11,21 +11,25 @@ class AwxNotificationTemplate(AwxBase):
     """Awx notification template class."""
     __resource_name__ = 'notification_template'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxNotificationTemplate, self).__init__()
-        self._organization = AwxOrganization()
+        super(AwxNotificationTemplate, self).__init__(registry)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def notification_templates(self):
         """Return a list of job templates."""
         return self.resource.list()
 
+    def iter_notification_templates(self, page_size=200, fields=None,
+                                    prefetch=False, **filters):
+        """Return a generator over the notification templates, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, notification_type, description="",
                organization="default", notification_configuration=None):
         """Create a notification template.
@@ -44,7 +48,7 @@ class AwxNotificationTemplate(AwxBase):
         # get organization object
         _organization = self.organization.get(organization)
 
-        self.logger.info('Creating notification template %s.' % name)
+        self.logger.info('Creating notification template %s.', name)
 
         try:
             self.resource.create(
@@ -55,11 +59,11 @@ class AwxNotificationTemplate(AwxBase):
                 notification_configuration=notification_configuration
             )
         except Found as ex:
-            self.logger.error('Notification template %s already exists!' %
-                              name)
+            self.logger.error('Notification template %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Notification template %s successfully created!' %
+        self._invalidate(name=name)
+        self.logger.info('Notification template %s successfully created!',
                          name)
 
     def delete(self, name, notification_type, description="",
@@ -79,7 +83,7 @@ class AwxNotificationTemplate(AwxBase):
         """
 
         # delete notification template
-        self.logger.info('Deleting notification template %s.' % name)
+        self.logger.info('Deleting notification template %s.', name)
         self.resource.delete(
             name=name,
             description=description,
@@ -87,7 +91,8 @@ class AwxNotificationTemplate(AwxBase):
             organization=organization,
             notification_configuration=notification_configuration
             )
-        self.logger.info('Notification template %s successfully deleted!' %
+        self._invalidate(name=name)
+        self.logger.info('Notification template %s successfully deleted!',
                          name)
 
     def get(self, name):
@@ -98,6 +103,6 @@ class AwxNotificationTemplate(AwxBase):
         :rtype: dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
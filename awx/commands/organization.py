@@ -1,5 +1,7 @@
 """Awx organization helper module."""
-from tower_cli.exceptions import Found
+import threading
+
+from tower_cli.exceptions import Found, NotFound
 
 from .user import AwxUser
 from ..base import AwxBase
@@ -12,21 +14,106 @@ class AwxOrganization(AwxBase):
     """Awx organization class."""
     __resource_name__ = 'organization'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxOrganization, self).__init__()
-        self._user = AwxUser()
+        super(AwxOrganization, self).__init__(registry)
+        self._index = None
+        self._index_ids = None
+        self._index_modified = None
+        self._index_lock = threading.Lock()
 
     @property
     def user(self):
         """Return credential instance."""
-        return self._user
+        return self.registry.get(AwxUser)
 
     @property
     def organizations(self):
         """Return list of organizations."""
         return self.resource.list()
 
+    def iter_organizations(self, page_size=200, fields=None, prefetch=False,
+                           **filters):
+        """Return a generator over the organizations, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
+    @property
+    def index(self):
+        """Return the organization snapshot indexed by name, if loaded."""
+        return self._index
+
+    def load_index(self, page_size=200):
+        """Load a complete snapshot of all organizations indexed by name.
+
+        Every page is fetched, so organizations past the first page are
+        included. Once loaded, get() answers from the snapshot.
+
+        :param page_size: Number of organizations requested per page.
+        :type page_size: int
+        :return: Organizations indexed by name.
+        :rtype: dict
+        """
+        with self._index_lock:
+            self._index = {}
+            self._index_ids = {}
+            self._index_modified = None
+            self._merge_index(self.iterate(
+                page_size=page_size, order_by='modified'
+            ))
+        return self._index
+
+    def refresh_index(self, page_size=200):
+        """Refresh the organization snapshot incrementally.
+
+        Only organizations modified since the last load or refresh are
+        fetched. Deletions made by other clients are not detected, call
+        load_index() to rebuild the snapshot from scratch.
+
+        :param page_size: Number of organizations requested per page.
+        :type page_size: int
+        :return: Organizations indexed by name.
+        :rtype: dict
+        """
+        if self._index is None:
+            return self.load_index(page_size)
+
+        with self._index_lock:
+            filters = dict(order_by='modified')
+            if self._index_modified:
+                filters['modified__gte'] = self._index_modified
+            self._merge_index(self.iterate(page_size=page_size, **filters))
+        return self._index
+
+    def _merge_index(self, items):
+        """Merge organizations into the snapshot.
+
+        :param items: Organization objects ordered by modification time.
+        :type items: iterable
+        """
+        for item in items:
+            # drop the previous name when an organization was renamed
+            previous = self._index_ids.get(item['id'])
+            if previous is not None:
+                self._index.pop(previous, None)
+
+            self._index[item['name']] = item
+            self._index_ids[item['id']] = item['name']
+            self._index_modified = item.get('modified', self._index_modified)
+
+    def _drop_index(self, name):
+        """Remove an organization from the snapshot.
+
+        :param name: Organization name.
+        :type name: str
+        """
+        if self._index is None:
+            return
+
+        with self._index_lock:
+            item = self._index.pop(name, None)
+            if item is not None:
+                self._index_ids.pop(item['id'], None)
+
     def create(self, name, description=None):
         """Create an organization.
 
@@ -35,7 +122,7 @@ class AwxOrganization(AwxBase):
         :param description: Organization description.
         :type description: str
         """
-        self.logger.info('Creating organization %s.' % name)
+        self.logger.info('Creating organization %s.', name)
 
         try:
             self.resource.create(
@@ -44,10 +131,11 @@ class AwxOrganization(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('Organization %s already exists!' % name)
+            self.logger.error('Organization %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Organization %s successfully created!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Organization %s successfully created!', name)
 
     def delete(self, name):
         """Delete an organization.
@@ -55,9 +143,11 @@ class AwxOrganization(AwxBase):
         :param name: Organization name.
         :type name: str
         """
-        self.logger.info('Deleting organization %s.' % name)
+        self.logger.info('Deleting organization %s.', name)
         self.resource.delete(name=name)
-        self.logger.info('Organization %s successfully deleted!' % name)
+        self._invalidate(name=name)
+        self._drop_index(name)
+        self.logger.info('Organization %s successfully deleted!', name)
 
     def associate(self, organization, name):
         """Associate a user with the team
@@ -118,7 +208,11 @@ class AwxOrganization(AwxBase):
         :return: Organization object.
         :rtype: dict
         """
-        for item in self.organizations['results']:
-            if item['name'] == name:
-                return item
-        return {}
+        # answer from the snapshot when it has been loaded
+        if self._index is not None and name in self._index:
+            return self._index[name]
+
+        try:
+            return self._cached_get(name=name)
+        except NotFound:
+            return {}
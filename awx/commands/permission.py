@@ -8,6 +8,6 @@ class AwxPermission(AwxBase):
     """Awx permission class."""
     __resource_name__ = 'permission'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxPermission, self).__init__()
+        super(AwxPermission, self).__init__(registry)
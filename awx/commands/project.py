@@ -1,11 +1,14 @@
 """Awx project module."""
-import urlparse
+import hashlib
+import os
+import time
 
-import requests
 from tower_cli.exceptions import Found, NotFound
 
 from .organization import AwxOrganization
-from ..base import AwxBase
+from ..base import AwxBase, AwxRegistry
+from ..cache import PlaybookIndex
+from ..parallel import imap_bounded
 
 
 # TODO: Add in additional parameters that are optional for all methods.
@@ -14,19 +17,25 @@ from ..base import AwxBase
 class AwxProject(AwxBase):
     """Awx project class."""
     __resource_name__ = 'project'
+    # directory the playbook index is persisted to, None to keep it in memory
+    __playbook_index_dir__ = None
+    __synced_statuses__ = ('successful', 'ok')
+    __failed_statuses__ = ('failed', 'error', 'canceled', 'missing')
+    # largest page AWX serves
+    __page_size__ = 200
 
-    def __init__(self, **kwargs):
+    def __init__(self, registry=None, **kwargs):
         """Constructor."""
-        super(AwxProject, self).__init__()
+        super(AwxProject, self).__init__(registry or AwxRegistry(**kwargs))
         self._scm_types = ['manual', 'git', 'hg', 'svn']
-        self.kwargs = kwargs
-
-        self._organization = AwxOrganization()
+        self.kwargs = self.registry.kwargs
+        self._playbook_index = None
+        self._playbook_index_stale = False
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def scm_types(self):
@@ -38,32 +47,120 @@ class AwxProject(AwxBase):
         """Return a list of projects."""
         return self.resource.list()
 
+    def iter_projects(self, page_size=200, fields=None, prefetch=False,
+                      **filters):
+        """Return a generator over the projects, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     @property
     def playbooks(self):
         """Return a dictionary of project and its available playbooks."""
-        playbooks = {}
+        playbooks, errors = self.discover_playbooks()
 
-        for project in self.projects['results']:
-            play_path = project['related']['playbooks']
-            url = urlparse.urljoin(self.kwargs['host'], play_path)
-            response = requests.get(
-                url,
-                auth=(self.kwargs['username'], self.kwargs['password']),
-                verify=False
-            )
-            playbooks[project['name']] = response.json()
+        for project, error in errors.items():
+            self.logger.error('Unable to fetch playbooks of project %s: %s',
+                              project, error)
         return playbooks
 
-    def get_playbook_project(self, playbook):
+    def discover_playbooks(self, projects=None, concurrency=8):
+        """Fetch the available playbooks of projects concurrently.
+
+        Every page of projects is enumerated and their playbooks are fetched
+        over the shared HTTP session by a bounded pool of threads. A failing
+        project is reported in the errors rather than aborting discovery.
+
+        :param projects: Project objects, defaults to all projects.
+        :type projects: iterable
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Playbooks and errors, both keyed by project name.
+        :rtype: tuple
+        """
+        if projects is None:
+            projects = self.iterate(page_size=200)
+
+        playbooks = {}
+        errors = {}
+
+        for project, result, error in imap_bounded(
+                lambda item: self.http.get(item['related']['playbooks']),
+                projects, concurrency, self.executor):
+            if error is None:
+                playbooks[project['name']] = result
+            else:
+                errors[project['name']] = error
+        return playbooks, errors
+
+    @property
+    def playbook_index_path(self):
+        """Return the file the playbook index is persisted to.
+
+        The index is only written to disk when __playbook_index_dir__ is
+        set, e.g. to ~/.cache/awx, otherwise None is returned.
+        """
+        if not self.__playbook_index_dir__:
+            return None
+
+        host = hashlib.sha1(self.kwargs.get('host', '')).hexdigest()[:12]
+        return os.path.join(
+            os.path.expanduser(self.__playbook_index_dir__),
+            'playbooks-%s.json' % host
+        )
+
+    @property
+    def playbook_index(self):
+        """Return the playbook index, building it on first use."""
+        if self._playbook_index is None:
+            self.refresh_playbook_index()
+        return self._playbook_index
+
+    def refresh_playbook_index(self, concurrency=8):
+        """Bring the playbook index up to date.
+
+        Projects are listed and only the playbooks of projects whose SCM
+        revision or modification time changed since the index was persisted
+        are fetched again.
+
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Playbook index.
+        :rtype: PlaybookIndex
+        """
+        index = self._playbook_index
+        if index is None:
+            index = PlaybookIndex(self.playbook_index_path)
+
+        projects = list(self.iterate(page_size=200))
+        playbooks, errors = self.discover_playbooks(
+            index.stale(projects), concurrency
+        )
+
+        for project, error in errors.items():
+            self.logger.error('Unable to fetch playbooks of project %s: %s',
+                              project, error)
+
+        index.update(projects, playbooks)
+
+        self._playbook_index = index
+        self._playbook_index_stale = False
+        return index
+
+    def get_playbook_project(self, playbook, refresh=False):
         """Return the project for the associated playbook.
 
-        :param playbook: Playbook name.
+        The playbook is matched by its exact path first, then by its file
+        name, and last by any playbook path containing it.
+
+        :param playbook: Playbook path, file name or part of a path.
         :type playbook: str
+        :param refresh: Refresh the playbook index before the lookup.
+        :type refresh: bool
+        :return: Project name, None when no project provides the playbook.
+        :rtype: str
         """
-        for project, playbooks in self.playbooks.items():
-            for pb in playbooks:
-                if playbook in pb:
-                    return project
+        if refresh or self._playbook_index_stale:
+            self.refresh_playbook_index()
+        return self.playbook_index.lookup(playbook)
 
     def get(self, name):
         """Get project.
@@ -74,7 +171,7 @@ class AwxProject(AwxBase):
         :rtype: dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
 
@@ -114,7 +211,7 @@ class AwxProject(AwxBase):
         if not _org:
             raise Exception('Organization %s not found.' % organization)
 
-        self.logger.info('Creating SCM project %s.' % name)
+        self.logger.info('Creating SCM project %s.', name)
 
         try:
             self.resource.create(
@@ -132,10 +229,12 @@ class AwxProject(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('SCM project %s already exists!' % name)
+            self.logger.error('SCM project %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('SCM project %s successfully created!' % name)
+        self._invalidate(name=name)
+        self._playbook_index_stale = True
+        self.logger.info('SCM project %s successfully created!', name)
 
     def create_manual_project(self, name, description, organization):
         """Create project based on manual source.
@@ -154,7 +253,7 @@ class AwxProject(AwxBase):
         if not _org:
             raise Exception('Organization %s not found.' % organization)
 
-        self.logger.info('Creating manual project %s.' % name)
+        self.logger.info('Creating manual project %s.', name)
 
         try:
             self.resource.create(
@@ -165,10 +264,119 @@ class AwxProject(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('Manual project %s already exists!' % name)
+            self.logger.error('Manual project %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Manual project %s successfully created!' % name)
+        self._invalidate(name=name)
+        self._playbook_index_stale = True
+        self.logger.info('Manual project %s successfully created!', name)
+
+    def wait_until_synced(self, name, timeout=600, min_interval=0.5,
+                          max_interval=10.0):
+        """Wait for the SCM update of a project to finish.
+
+        :param name: Project name.
+        :type name: str
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :param min_interval: Seconds between the first status checks.
+        :type min_interval: float
+        :param max_interval: Maximum seconds between status checks.
+        :type max_interval: float
+        :return: Synced project.
+        :rtype: dict
+        """
+        return self.wait_until_all_synced(
+            [name], timeout, min_interval, max_interval
+        )[name]
+
+    def wait_until_all_synced(self, names, timeout=600, min_interval=0.5,
+                              max_interval=10.0):
+        """Wait for the SCM updates of projects to finish.
+
+        The status of every project still updating is fetched with one
+        request per check and 200 projects, the largest page AWX serves.
+        Checks start min_interval apart and back off up to max_interval
+        while no project changes status, so waiting returns shortly after
+        the playbooks become available without hammering AWX during long
+        updates.
+
+        :param names: Project names.
+        :type names: list
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :param min_interval: Seconds between the first status checks.
+        :type min_interval: float
+        :param max_interval: Maximum seconds between status checks.
+        :type max_interval: float
+        :return: Synced projects keyed by name.
+        :rtype: dict
+        :raises Exception: When an update fails or the timeout elapses.
+        :raises NotFound: When projects are deleted while waiting.
+        """
+        deadline = time.time() + timeout
+        interval = min_interval
+
+        waiting = {}
+        for name in names:
+            try:
+                waiting[self._cached_get(name=name)['id']] = name
+            except NotFound as ex:
+                raise Exception(ex.message)
+
+        synced = {}
+        failed = []
+        statuses = {}
+
+        while waiting:
+            ids = sorted(waiting)
+            projects = []
+            for start in range(0, len(ids), self.__page_size__):
+                chunk = ids[start:start + self.__page_size__]
+                projects.extend(self.resource.list(
+                    page_size=len(chunk),
+                    query=[('id__in', ','.join(str(i) for i in chunk))]
+                )['results'])
+
+            # a project deleted while waiting is left out of the listing
+            missing = set(ids) - set(project['id'] for project in projects)
+            if missing:
+                names = sorted(waiting[pk] for pk in missing)
+                for name in names:
+                    self._invalidate(name=name)
+                raise NotFound('Projects %s not found.' % ', '.join(names))
+
+            changed = False
+            for project in projects:
+                name = waiting[project['id']]
+                status = project['status']
+                if statuses.get(name) != status:
+                    statuses[name] = status
+                    changed = True
+                    self.logger.debug('Project %s status: %s.', name, status)
+
+                if status in self.__synced_statuses__:
+                    synced[name] = project
+                    del waiting[project['id']]
+                elif status in self.__failed_statuses__:
+                    failed.append('%s (%s)' % (name, status))
+                    del waiting[project['id']]
+
+            if failed:
+                raise Exception('SCM update failed for projects %s.' %
+                                ', '.join(failed))
+            if not waiting:
+                break
+            if time.time() >= deadline:
+                raise Exception('Timed out waiting for projects %s to sync.' %
+                                ', '.join(sorted(waiting.values())))
+
+            interval = min_interval if changed else \
+                min(interval * 1.5, max_interval)
+            time.sleep(min(interval, max(0, deadline - time.time())))
+
+        self._playbook_index_stale = True
+        return synced
 
     def delete(self, name):
         """Delete a project.
@@ -176,6 +384,8 @@ class AwxProject(AwxBase):
         :param name: Project name.
         :type name: str
         """
-        self.logger.info('Deleting project %s.' % name)
+        self.logger.info('Deleting project %s.', name)
         self.resource.delete(name=name)
-        self.logger.info('Project %s successfully deleted.' % name)
+        self._invalidate(name=name)
+        self._playbook_index_stale = True
+        self.logger.info('Project %s successfully deleted.', name)
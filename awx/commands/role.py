@@ -1,4 +1,6 @@
 """Awx role helper module."""
+from collections import OrderedDict
+
 from tower_cli.exceptions import Found
 
 from .credential import AwxCredential
@@ -6,6 +8,7 @@ from .inventory import AwxInventory
 from .project import AwxProject
 from .user import AwxUser
 from ..base import AwxBase
+from ..parallel import imap_bounded
 
 
 # TODO: Add in additional parameters that are optional for all methods.
@@ -14,39 +17,51 @@ from ..base import AwxBase
 class AwxRole(AwxBase):
     """Awx role class."""
     __resource_name__ = 'role'
+    __api__ = '/api/v1/'
+    __plural__ = dict(
+        user='users',
+        team='teams',
+        organization='organizations',
+        project='projects',
+        inventory='inventories',
+        credential='credentials',
+        job_template='job_templates',
+        workflow_job_template='workflow_job_templates'
+    )
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        self._credential = AwxCredential()
-        self._project = AwxProject()
-        self._inventory = AwxInventory()
-        self._user = AwxUser()
-        super(AwxRole, self).__init__()
+        super(AwxRole, self).__init__(registry)
 
     @property
     def roles(self, user=None):
         # """Return list of users."""
         return self.resource.list()
 
+    def iter_roles(self, page_size=200, fields=None, prefetch=False,
+                   **filters):
+        """Return a generator over the roles, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     @property
     def credential(self):
         """Return credential instance."""
-        return self._credential
+        return self.registry.get(AwxCredential)
 
     @property
     def inventory(self):
         """Return credential instance."""
-        return self._inventory
+        return self.registry.get(AwxInventory)
 
     @property
     def project(self):
         """Return credential instance."""
-        return self._project
+        return self.registry.get(AwxProject)
 
     @property
     def user(self):
         """Return credential instance."""
-        return self._user
+        return self.registry.get(AwxUser)
 
     def grant(self, team=None, user=None, type="use", inventory=None,
               project=None, credential=None):
@@ -103,3 +118,221 @@ class AwxRole(AwxBase):
                                 fail_on_found=True)
         except Found as ex:
             raise Exception(ex.message)
+
+    def lookup_many(self, names, objects=None, concurrency=8,
+                    required=True):
+        """Look up objects of several kinds by name in bulk.
+
+        Names are looked up with one name__in filtered listing per kind and
+        hundred names, issued concurrently, see AwxBase._by_names.
+
+        :param names: (kind, name) tuples, e.g. ('project', 'web').
+        :type names: iterable
+        :param objects: Objects already known, keyed by (kind, name).
+        :type objects: dict
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :param required: Raise when an object does not exist.
+        :type required: bool
+        :return: Objects keyed by (kind, name).
+        :rtype: dict
+        :raises Exception: When a required object does not exist.
+        """
+        objects = dict(objects or {})
+        wanted = {}
+        for kind, name in set(names):
+            if kind not in self.__plural__:
+                raise Exception('Unsupported kind %s.' % kind)
+            if (kind, name) not in objects:
+                wanted.setdefault(kind, []).append(name)
+
+        keys = dict((kind, ('%s%s/' % (self.__api__, self.__plural__[kind]),
+                            'username' if kind == 'user' else 'name'))
+                    for kind in wanted)
+        found = self._by_names(
+            dict((keys[kind], names) for kind, names in wanted.items()),
+            concurrency
+        )
+
+        for kind, names in wanted.items():
+            for name in names:
+                if name in found[keys[kind]]:
+                    objects[(kind, name)] = found[keys[kind]][name]
+                elif required:
+                    raise Exception('%s %s not found.' % (
+                        kind.capitalize(), name))
+        return objects
+
+    def resolve_grants(self, grants, objects=None, concurrency=8):
+        """Resolve the principal and role ids of grants.
+
+        :param grants: (principal, role type, resource) tuples, principal
+            and resource being (kind, name) tuples, e.g.
+            (('team', 'ops'), 'use', ('project', 'web')).
+        :type grants: iterable
+        :param objects: Objects already known, keyed by (kind, name).
+        :type objects: dict
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Unique grants as dicts with grant, principal (kind, id)
+            and role id keys, in order.
+        :rtype: list
+        :raises Exception: When a name or a role does not exist.
+        """
+        unique = OrderedDict()
+        for grant in grants:
+            principal, _, resource = grant = tuple(grant)
+            if principal[0] not in ('user', 'team'):
+                raise Exception('Principal %s is not a user or a team.' %
+                                (principal,))
+            unique[grant] = None
+
+        objects = self.lookup_many(
+            [g[0] for g in unique] + [g[2] for g in unique],
+            objects, concurrency
+        )
+
+        resolved = []
+        for principal, type, resource in unique:
+            roles = objects[resource].get('summary_fields', {}).get(
+                'object_roles', {})
+            try:
+                role_id = roles['%s_role' % type]['id']
+            except KeyError:
+                raise Exception('%s %s has no %s role.' % (
+                    resource[0].capitalize(), resource[1], type))
+            resolved.append(dict(
+                grant=(principal, type, resource),
+                principal=(principal[0], objects[principal]['id']),
+                role=role_id
+            ))
+        return resolved
+
+    def existing_grants(self, resolved, concurrency=8):
+        """Return which resolved grants are already in place.
+
+        Lists the roles of each user or team, filtered by the role ids of
+        its grants, so one request covers a principal and hundred roles.
+        The listings are issued concurrently.
+
+        :param resolved: Grants, see resolve_grants.
+        :type resolved: list
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: (principal kind, principal id, role id) tuples granted.
+        :rtype: set
+        """
+        roles = {}
+        for item in resolved:
+            roles.setdefault(item['principal'], set()).add(item['role'])
+
+        listings = []
+        for principal, ids in sorted(roles.items()):
+            ids = sorted(ids)
+            for start in range(0, len(ids), 100):
+                listings.append((principal, ids[start:start + 100]))
+
+        def fetch(listing):
+            (kind, pk), ids = listing
+            return [obj['id'] for obj in self.http.iterate(
+                '%s%s/%s/roles/' % (self.__api__, self.__plural__[kind], pk),
+                id__in=','.join(str(i) for i in ids)
+            )]
+
+        existing = set()
+        for (principal, _), ids, error in imap_bounded(
+                fetch, listings, concurrency, self.executor):
+            if error is not None:
+                raise error
+            existing.update(principal + (role_id,) for role_id in ids)
+        return existing
+
+    def assign(self, item, revoke=False):
+        """Grant or revoke a resolved grant.
+
+        :param item: Grant, see resolve_grants.
+        :type item: dict
+        :param revoke: Revoke instead of granting.
+        :type revoke: bool
+        """
+        kind, pk = item['principal']
+        data = dict(id=item['role'])
+        if revoke:
+            data['disassociate'] = True
+        self.http.post(
+            '%s%s/%s/roles/' % (self.__api__, self.__plural__[kind], pk),
+            data
+        )
+
+    def grant_many(self, grants, concurrency=8):
+        """Grant many roles to users and teams.
+
+        Names are resolved in bulk, grants already in place are skipped and
+        the remaining ones are issued concurrently.
+
+            awx.role.grant_many([
+                (('team', 'ops'), 'use', ('project', 'web')),
+                (('user', 'carbon'), 'admin', ('inventory', 'production'))
+            ])
+
+        :param grants: (principal, role type, resource) tuples, see
+            resolve_grants.
+        :type grants: iterable
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Grants issued, already in place and failed with their
+            error.
+        :rtype: dict
+        """
+        return self._assign_many(grants, False, concurrency)
+
+    def revoke_many(self, grants, concurrency=8):
+        """Revoke many roles from users and teams.
+
+        Names are resolved in bulk, grants not in place are skipped and the
+        remaining ones are revoked concurrently.
+
+        :param grants: (principal, role type, resource) tuples, see
+            resolve_grants.
+        :type grants: iterable
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Grants revoked, not in place and failed with their error.
+        :rtype: dict
+        """
+        return self._assign_many(grants, True, concurrency)
+
+    def _assign_many(self, grants, revoke, concurrency):
+        """Grant or revoke many roles, skipping the ones already done.
+
+        :param grants: (principal, role type, resource) tuples.
+        :type grants: iterable
+        :param revoke: Revoke instead of granting.
+        :type revoke: bool
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :rtype: dict
+        """
+        resolved = self.resolve_grants(grants, concurrency=concurrency)
+        existing = self.existing_grants(resolved, concurrency)
+
+        todo, report = [], dict(done=[], skipped=[], failed=[])
+        for item in resolved:
+            key = item['principal'] + (item['role'],)
+            if (key in existing) != revoke:
+                report['skipped'].append(item['grant'])
+            else:
+                todo.append(item)
+
+        for item, _, error in imap_bounded(
+                lambda i: self.assign(i, revoke), todo, concurrency,
+                self.executor):
+            if error is None:
+                report['done'].append(item['grant'])
+                continue
+            error = getattr(getattr(error, 'response', None), 'text', error)
+            self.logger.error('Failed to %s %s: %s',
+                              'revoke' if revoke else 'grant',
+                              item['grant'], error)
+            report['failed'].append((item['grant'], str(error)))
+        return report
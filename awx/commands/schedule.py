@@ -8,6 +8,6 @@ class AwxSchedule(AwxBase):
     """Awx schedule class."""
     __resource_name__ = 'schedule'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxSchedule, self).__init__()
+        super(AwxSchedule, self).__init__(registry)
@@ -8,6 +8,6 @@ class AwxSetting(AwxBase):
     """Awx setting class."""
     __resource_name__ = 'setting'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxSetting, self).__init__()
+        super(AwxSetting, self).__init__(registry)
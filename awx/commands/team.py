@@ -13,27 +13,30 @@ class AwxTeam(AwxBase):
     """Awx team class."""
     __resource_name__ = 'team'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxTeam, self).__init__()
-        self._organization = AwxOrganization()
-        self._user = AwxUser()
+        super(AwxTeam, self).__init__(registry)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def user(self):
         """Return credential instance."""
-        return self._user
+        return self.registry.get(AwxUser)
 
     @property
     def teams(self):
         """Return list of users."""
         return self.resource.list()
 
+    def iter_teams(self, page_size=200, fields=None, prefetch=False,
+                   **filters):
+        """Return a generator over the teams, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, organization, description=""):
         """Create a team
 
@@ -61,6 +64,8 @@ class AwxTeam(AwxBase):
         except Found as ex:
             raise Exception(ex.message)
 
+        self._invalidate(name=name)
+
     def delete(self, name):
         """Delete a user.
 
@@ -68,6 +73,7 @@ class AwxTeam(AwxBase):
         :type name: str
         """
         self.resource.delete(name=name)
+        self._invalidate(name=name)
 
     def associate(self, team, name):
         """Associate a user with the team
@@ -106,6 +112,6 @@ class AwxTeam(AwxBase):
         :type name: str
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
@@ -11,15 +11,20 @@ class AwxUser(AwxBase):
     """Awx user class."""
     __resource_name__ = 'user'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxUser, self).__init__()
+        super(AwxUser, self).__init__(registry)
 
     @property
     def users(self):
         """Return list of users."""
         return self.resource.list()
 
+    def iter_users(self, page_size=200, fields=None, prefetch=False,
+                   **filters):
+        """Return a generator over the users, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, password, email, first_name, last_name,
                superuser=False, system_auditor=False):
         """Create a user.
@@ -39,7 +44,7 @@ class AwxUser(AwxBase):
         :param system_auditor: System auditor field.
         :type system_auditor: bool
         """
-        self.logger.info('Creating user %s.' % name)
+        self.logger.info('Creating user %s.', name)
         try:
             self.resource.create(
                 username=name,
@@ -52,10 +57,11 @@ class AwxUser(AwxBase):
                 fail_on_found=True
             )
         except Found as ex:
-            self.logger.error('User %s already exists!' % name)
+            self.logger.error('User %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('User %s successfully created!' % name)
+        self._invalidate(username=name)
+        self.logger.info('User %s successfully created!', name)
 
     def delete(self, name):
         """Delete a user.
@@ -63,9 +69,10 @@ class AwxUser(AwxBase):
         :param name: Username.
         :type name: str
         """
-        self.logger.info('Deleting user %s.' % name)
+        self.logger.info('Deleting user %s.', name)
         self.resource.delete(username=name)
-        self.logger.info('User %s successfully deleted.' % name)
+        self._invalidate(username=name)
+        self.logger.info('User %s successfully deleted.', name)
 
     def get(self, name):
         """Get a user.
@@ -74,6 +81,6 @@ class AwxUser(AwxBase):
         :type name: str
         """
         try:
-            return self.resource.get(username=name)
+            return self._cached_get(username=name)
         except NotFound as ex:
             raise Exception(ex.message)
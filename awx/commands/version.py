@@ -8,6 +8,6 @@ class AwxVersion(AwxBase):
     """Awx version class."""
     __resource_name__ = 'version'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxVersion, self).__init__()
+        super(AwxVersion, self).__init__(registry)
@@ -1,5 +1,7 @@
 """Awx workflow helper module."""
 from ..base import AwxBase
+from ..parallel import imap_bounded
+from ..schema import WorkflowSchema
 from .organization import AwxOrganization
 from tower_cli.exceptions import Found, NotFound
 
@@ -9,22 +11,27 @@ from tower_cli.exceptions import Found, NotFound
 class AwxWorkflow(AwxBase):
     """Awx workflow class."""
     __resource_name__ = 'workflow'
+    __node_path__ = '/api/v1/workflow_job_template_nodes/%s/'
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """Constructor."""
-        super(AwxWorkflow, self).__init__()
-        self._organization = AwxOrganization()
+        super(AwxWorkflow, self).__init__(registry)
 
     @property
     def organization(self):
         """Return organization instance."""
-        return self._organization
+        return self.registry.get(AwxOrganization)
 
     @property
     def workflow_templates(self):
         """Return a list of workflow templates."""
         return self.resource.list()
 
+    def iter_workflow_templates(self, page_size=200, fields=None,
+                                prefetch=False, **filters):
+        """Return a generator over the workflow templates, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
+
     def create(self, name, description, organization, fail_on_found=True):
         """Create a workflow template.
 
@@ -38,7 +45,7 @@ class AwxWorkflow(AwxBase):
         :type fail_on_found: boolean
         """
 
-        self.logger.info('Creating workflow template %s.' % name)
+        self.logger.info('Creating workflow template %s.', name)
         _org = self.organization.get(organization)
 
         # quit if organization not found
@@ -53,32 +60,250 @@ class AwxWorkflow(AwxBase):
                 fail_on_found=fail_on_found
             )
         except Found as ex:
-            self.logger.error('Workflow template %s already exists!' % name)
+            self.logger.error('Workflow template %s already exists!', name)
             raise Exception(ex.message)
 
-        self.logger.info('Workflow template %s successfully created!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Workflow template %s successfully created!', name)
 
-    def upload_schema(self, name, schema_loc):
+    def upload_schema(self, name, schema_loc, concurrency=8):
         """Upload a workflow schema (json or yaml)
 
+        A compiled schema is uploaded straight through the REST API: the job
+        templates are looked up in bulk, then the nodes and their edges are
+        created concurrently. Nodes already in the workflow are kept.
+
         :param name: Workflow template name.
         :type name: str
-        :param schema_loc: File location of the schema.
-        :type schema_loc: str
-        :return: workflow template object.
+        :param schema_loc: File location of the schema, or compiled schema.
+        :type schema_loc: str or WorkflowSchema
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: workflow template object, or the node ids created keyed by
+            schema node id when uploading a compiled schema.
         :rtype: dict
         """
         workflow_obj = self.get(name)
 
-        # load the schema file
-        with open(schema_loc, 'r') as fh:
-            schema_content = fh.read()
         # quit if organization not found
         if not workflow_obj:
             raise Exception('Workflow Template {} not found.'.format(name))
+
+        if isinstance(schema_loc, WorkflowSchema):
+            return self._upload_nodes(workflow_obj, schema_loc, concurrency)
+
+        # load the schema file
+        with open(schema_loc, 'r') as fh:
+            schema_content = fh.read()
         return self.resource.schema(wfjt=workflow_obj["id"],
                                     node_network=schema_content)
 
+    def _upload_nodes(self, workflow_obj, schema, concurrency):
+        """Create the nodes and edges of a compiled schema.
+
+        :param workflow_obj: Workflow template object.
+        :type workflow_obj: dict
+        :param schema: Compiled schema.
+        :type schema: WorkflowSchema
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Node ids created, keyed by schema node id.
+        :rtype: dict
+        """
+        templates = self._template_ids(schema, concurrency)
+
+        path = '/api/v1/workflow_job_templates/%s/workflow_nodes/' % \
+            workflow_obj['id']
+        ids = {}
+        for node, created, error in imap_bounded(
+                lambda node: self.http.post(path, dict(
+                    unified_job_template=templates[node['job_template']]
+                )), schema.nodes.values(), concurrency, self.executor):
+            if error is not None:
+                raise error
+            ids[node['id']] = created['id']
+
+        for _, _, error in imap_bounded(
+                lambda edge: self._link(ids[edge[0]], ids[edge[1]], edge[2]),
+                schema.edges, concurrency, self.executor):
+            if error is not None:
+                raise error
+
+        self.logger.info('Uploaded %d nodes and %d edges to workflow '
+                         'template %s.', len(ids), len(schema.edges),
+                         workflow_obj['name'])
+        return ids
+
+    def sync_schema(self, name, schema, dry_run=False, concurrency=8):
+        """Synchronize the nodes of a workflow template with a schema.
+
+        The current nodes are fetched and matched structurally with the
+        schema, parents first: a node matches an existing node having the
+        same parents through the same edges, preferably running the same
+        job template, else an existing node running the same job template.
+        Only the differences are sent: nodes are created, their job
+        template updated or deleted, and edges linked or unlinked,
+        concurrently. Syncing an interrupted sync again completes it.
+
+        :param name: Workflow template name.
+        :type name: str
+        :param schema: Compiled schema.
+        :type schema: WorkflowSchema
+        :param dry_run: Only report the changes needed.
+        :type dry_run: bool
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Counts of created, updated, deleted, unchanged nodes and
+            linked, unlinked edges, with the node ids keyed by schema node
+            id.
+        :rtype: dict
+        """
+        workflow_obj = self.get(name)
+
+        # quit if workflow template not found
+        if not workflow_obj:
+            raise Exception('Workflow Template {} not found.'.format(name))
+
+        templates = self._template_ids(schema, concurrency)
+        current = dict((node['id'], node) for node in self.http.iterate(
+            '/api/v1/workflow_job_templates/%s/workflow_nodes/' %
+            workflow_obj['id']))
+
+        # existing nodes indexed by their parents and edges
+        existing = set()
+        parents = dict((pk, set()) for pk in current)
+        for node in current.values():
+            for edge in WorkflowSchema.__edges__:
+                for child in node['%s_nodes' % edge]:
+                    existing.add((node['id'], child, edge))
+                    parents.setdefault(child, set()).add((node['id'], edge))
+        # candidates are kept in descending id order, the lowest id last
+        candidates, by_template = {}, {}
+        for pk in sorted(current, reverse=True):
+            candidates.setdefault(frozenset(parents[pk]), []).append(pk)
+            by_template.setdefault(
+                current[pk]['unified_job_template'], []).append(pk)
+
+        def pick(pool, template=None):
+            """Take the first unmatched node of a pool, if any."""
+            while pool and pool[-1] in matched:
+                pool.pop()
+            for pk in reversed(pool):
+                if pk not in matched and (template is None or current[pk][
+                        'unified_job_template'] == template):
+                    matched.add(pk)
+                    return pk
+
+        ids, matched, updates, creates = {}, set(), [], []
+        desired_parents = schema.parents()
+        for pk in schema.order():
+            template = templates[schema.nodes[pk]['job_template']]
+            pool = []
+            if all(p in ids for p, _ in desired_parents[pk]):
+                pool = candidates.get(frozenset(
+                    (ids[p], edge) for p, edge in desired_parents[pk]), [])
+
+            # same parents and template, same parents, then same template
+            found = pick(pool, template)
+            if found is None:
+                found = pick(pool)
+                if found is not None:
+                    updates.append((found, template))
+            if found is None:
+                found = pick(by_template.get(template, []))
+            if found is None:
+                creates.append((pk, template))
+            else:
+                ids[pk] = found
+
+        deletes = sorted(set(current) - set(ids.values()))
+        wanted = set((ids[p], ids[c], edge) for p, c, edge in schema.edges
+                     if p in ids and c in ids)
+        unlinks = sorted(e for e in existing - wanted
+                         if e[0] not in deletes and e[1] not in deletes)
+
+        # nodes still to create are keyed by schema node id until created
+        links = sorted(set(
+            (ids.get(p, ('new', p)), ids.get(c, ('new', c)), edge)
+            for p, c, edge in schema.edges) - existing)
+
+        report = dict(created=len(creates), updated=len(updates),
+                      deleted=len(deletes), linked=len(links),
+                      unlinked=len(unlinks),
+                      unchanged=len(ids) - len(updates), nodes=ids)
+        if dry_run:
+            return report
+
+        path = '/api/v1/workflow_job_templates/%s/workflow_nodes/' % \
+            workflow_obj['id']
+        for (pk, _), created, error in imap_bounded(
+                lambda item: self.http.post(path, dict(
+                    unified_job_template=item[1])),
+                creates, concurrency, self.executor):
+            if error is not None:
+                raise error
+            ids[pk] = created['id']
+
+        links = [tuple(ids[n[1]] if isinstance(n, tuple) else n
+                       for n in link[:2]) + (link[2],) for link in links]
+
+        for func, items in (
+                (lambda item: self.http.patch(
+                    self.__node_path__ % item[0],
+                    dict(unified_job_template=item[1])), updates),
+                (lambda edge: self._link(*edge, unlink=True), unlinks),
+                (lambda pk: self.http.delete(self.__node_path__ % pk),
+                 deletes),
+                (lambda edge: self._link(*edge), links)):
+            for _, _, error in imap_bounded(func, items, concurrency,
+                                            self.executor):
+                if error is not None:
+                    raise error
+
+        self.logger.info('Synchronized workflow template %s: %d nodes '
+                         'created, %d updated, %d deleted, %d edges linked, '
+                         '%d unlinked.', name, report['created'],
+                         report['updated'], report['deleted'],
+                         report['linked'], report['unlinked'])
+        return report
+
+    def _template_ids(self, schema, concurrency):
+        """Return the ids of the job templates run by a schema.
+
+        :param schema: Compiled schema.
+        :type schema: WorkflowSchema
+        :param concurrency: Maximum number of concurrent requests.
+        :type concurrency: int
+        :return: Job template ids keyed by name.
+        :rtype: dict
+        :raises Exception: When a job template does not exist.
+        """
+        templates = self._by_name('/api/v1/job_templates/',
+                                  schema.job_templates, concurrency)
+        missing = sorted(set(schema.job_templates) - set(templates))
+        if missing:
+            raise Exception('Job template %s not found.' %
+                            ', '.join(missing))
+        return dict((name, t['id']) for name, t in templates.items())
+
+    def _link(self, parent, child, edge, unlink=False):
+        """Link or unlink two workflow nodes.
+
+        :param parent: Parent node id.
+        :type parent: int
+        :param child: Child node id.
+        :type child: int
+        :param edge: success, failure or always.
+        :type edge: str
+        :param unlink: Unlink instead of linking.
+        :type unlink: bool
+        """
+        data = dict(id=child)
+        if unlink:
+            data['disassociate'] = True
+        self.http.post('%s%s_nodes/' % (self.__node_path__ % parent, edge),
+                       data)
+
     def get_schema(self, name):
         """Get the schema of an existing workflow schema
 
@@ -103,9 +328,10 @@ class AwxWorkflow(AwxBase):
         """
 
         # delete workflow template
-        self.logger.info('Deleting workflow template %s.' % name)
+        self.logger.info('Deleting workflow template %s.', name)
         self.resource.delete(name=name)
-        self.logger.info('Workflow template %s successfully deleted!' % name)
+        self._invalidate(name=name)
+        self.logger.info('Workflow template %s successfully deleted!', name)
 
     def get(self, name):
         """Get the workflow
@@ -116,6 +342,6 @@ class AwxWorkflow(AwxBase):
         :type dict
         """
         try:
-            return self.resource.get(name=name)
+            return self._cached_get(name=name)
         except NotFound as ex:
             raise Exception(ex.message)
@@ -1,10 +1,9 @@
 """Awx workflow job helper module."""
 import json
-import requests
-import urlparse
 
 from tower_cli.exceptions import NotFound
-from ..base import AwxBase
+from ..base import AwxBase, AwxRegistry
+from ..parallel import imap_bounded
 from .workflow import AwxWorkflow
 
 # TODO: Add in additional parameters that are optional for all methods.
@@ -14,38 +13,66 @@ class AwxWorkflowJob(AwxBase):
     """Awx workflow job class."""
     __resource_name__ = 'workflow_job'
 
-    def __init__(self, **kwargs):
+    def __init__(self, registry=None, **kwargs):
         """Constructor."""
-        super(AwxWorkflowJob, self).__init__()
-        self._workflow = AwxWorkflow()
-        self.kwargs = kwargs
+        super(AwxWorkflowJob, self).__init__(
+            registry or AwxRegistry(**kwargs)
+        )
+        self.kwargs = self.registry.kwargs
 
     @property
     def workflow(self):
         """Return job template instance."""
-        return self._workflow
+        return self.registry.get(AwxWorkflow)
 
     @property
     def workflow_jobs(self):
         """Return a list of jobs."""
         return self.resource.list()
 
-    def get_jobs(self, job_id):
-        """Return a dictionary of project and its available playbooks."""
-        jobs = []
-        workflow_nodes = "/api/v1/workflow_jobs/" + str(job_id) +\
-                         "/workflow_nodes/"
-        url = urlparse.urljoin(self.kwargs['host'], workflow_nodes)
-        response = requests.get(
-            url,
-            auth=(self.kwargs['username'], self.kwargs['password']),
-            verify=False
-        )
+    def iter_workflow_jobs(self, page_size=200, fields=None, prefetch=False,
+                           **filters):
+        """Return a generator over the workflow jobs, see iterate."""
+        return self.iterate(page_size, fields, prefetch, **filters)
 
-        workflow_nodes = response.json()
-        for result in workflow_nodes["results"]:
-            if "job" in result["summary_fields"]:
-                jobs.append(result["summary_fields"]["job"]["id"])
+    def get_jobs(self, job_id, page_size=200, detail=False, concurrency=4):
+        """Return the jobs run by a workflow job.
+
+        Every page of workflow nodes is read. The first page gives the node
+        count, the remaining pages, if any, are then fetched concurrently.
+
+        :param job_id: Workflow job id.
+        :type job_id: int
+        :param page_size: Number of nodes requested per page.
+        :type page_size: int
+        :param detail: Return the workflow nodes, including their job
+            summaries, instead of the job ids.
+        :type detail: bool
+        :param concurrency: Maximum number of pages fetched at once.
+        :type concurrency: int
+        :return: Job ids, or workflow nodes which ran a job.
+        :rtype: list
+        """
+        path = '/api/v1/workflow_jobs/%s/workflow_nodes/' % job_id
+        first = self.http.get(path, page=1, page_size=page_size)
+
+        pages = {1: first['results']}
+        last = (first['count'] + page_size - 1) // page_size
+        if last > 1:
+            for page, result, error in imap_bounded(
+                    lambda page: self.http.get(path, page=page,
+                                               page_size=page_size),
+                    range(2, last + 1), concurrency, self.executor):
+                if error is not None:
+                    raise error
+                pages[page] = result['results']
+
+        jobs = []
+        for page in sorted(pages):
+            for result in pages[page]:
+                if "job" in result["summary_fields"]:
+                    jobs.append(result if detail else
+                                result["summary_fields"]["job"]["id"])
 
         return jobs
 
@@ -119,6 +146,38 @@ class AwxWorkflowJob(AwxBase):
         except NotFound as ex:
             raise Exception(ex.message)
 
+    def watch(self, job_id, callback=None, timeout=None):
+        """Watch the job until it finishes without blocking.
+
+        Every watched workflow job is polled by one shared watcher with a
+        single batched request, backing off while no status changes.
+
+        :param job_id: job id.
+        :type job_id: int
+        :param callback: Callable taking the future once the job finishes.
+        :type callback: callable
+        :param timeout: Seconds before the watch is aborted.
+        :type timeout: float
+        :return: future completed with the finished job
+        :rtype: Future
+        """
+        return self.watcher.watch(job_id, callback, timeout)
+
+    def wait(self, job_id, timeout=3600):
+        """Wait for the job to finish
+
+        :param job_id: job id.
+        :type job_id: int
+        :param timeout: Seconds before waiting is aborted.
+        :type timeout: float
+        :return: job information
+        :rtype: dict
+        """
+        job = self.watch(job_id, timeout=timeout).result()
+        if job['failed']:
+            raise Exception('Job %s failed.' % job_id)
+        return job
+
     def cancel(self, job_id):
         """Get the job
 
@@ -0,0 +1,331 @@
+"""Awx task graph module."""
+import Queue
+import heapq
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from .base import LoggerMixin
+
+
+class Task(object):
+    """Task class."""
+
+    def __init__(self, name, func, after=None, hosts=None, cleanup=False,
+                 on_failure=None):
+        """Constructor.
+
+        :param name: Task name.
+        :type name: str
+        :param func: Callable running the task.
+        :type func: callable
+        :param after: Names of the tasks this task runs after.
+        :type after: list
+        :param hosts: Hosts the task runs on.
+        :type hosts: list
+        :param cleanup: Run once every other task finished, even when some
+            of them failed.
+        :type cleanup: bool
+        :param on_failure: Name of the handler run when the task fails.
+        :type on_failure: str
+        """
+        self.name = name
+        self.func = func
+        self.after = list(after or [])
+        self.hosts = list(hosts or [])
+        self.cleanup = cleanup
+        self.on_failure = on_failure
+
+
+class TaskGraph(object):
+    """Task graph class.
+
+    Tasks declared in order, like the orchestrate section of a descriptor,
+    turned into a dependency graph. A task depends on the tasks named in its
+    after list and on the previous task sharing one of its hosts, in an
+    order honouring the after lists. Tasks on distinct hosts are therefore
+    independent. Cleanup tasks depend on every other task. Handlers are not
+    scheduled on their own, they run when the task naming them fails.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self.tasks = OrderedDict()
+        self.handlers = OrderedDict()
+
+    def add(self, name, func, after=None, hosts=None, cleanup=False,
+            on_failure=None):
+        """Add a task.
+
+        :param name: Task name.
+        :type name: str
+        :param func: Callable running the task.
+        :type func: callable
+        :param after: Names of the tasks this task runs after.
+        :type after: list
+        :param hosts: Hosts the task runs on.
+        :type hosts: list
+        :param cleanup: Run the task last, even when other tasks failed.
+        :type cleanup: bool
+        :param on_failure: Name of the handler run when the task fails.
+        :type on_failure: str
+        :return: Task.
+        :rtype: Task
+        """
+        if name in self.tasks or name in self.handlers:
+            raise Exception('Task %s already defined.' % name)
+        self.tasks[name] = Task(name, func, after, hosts, cleanup, on_failure)
+        return self.tasks[name]
+
+    def add_handler(self, name, func, hosts=None):
+        """Add a failure handler.
+
+        :param name: Handler name.
+        :type name: str
+        :param func: Callable running the handler.
+        :type func: callable
+        :param hosts: Hosts the handler runs on.
+        :type hosts: list
+        :return: Handler task.
+        :rtype: Task
+        """
+        if name in self.tasks or name in self.handlers:
+            raise Exception('Task %s already defined.' % name)
+        self.handlers[name] = Task(name, func, hosts=hosts)
+        return self.handlers[name]
+
+    def order(self):
+        """Return the task names in execution order.
+
+        Tasks keep their declaration order unless an after list requires
+        otherwise. Cleanup tasks come last.
+
+        :rtype: list
+        :raises Exception: When an after list names an unknown task or the
+            after lists are circular.
+        """
+        regular = [t for t in self.tasks.values() if not t.cleanup]
+        index = dict((t.name, i) for i, t in enumerate(regular))
+        dependants = dict((t.name, []) for t in regular)
+        blocking = dict((t.name, 0) for t in regular)
+
+        for task in regular:
+            for name in task.after:
+                if name not in index:
+                    raise Exception('Task %s runs after unknown task %s.' % (
+                        task.name, name))
+                dependants[name].append(task.name)
+                blocking[task.name] += 1
+
+        ready = [(index[n], n) for n, count in blocking.items() if not count]
+        heapq.heapify(ready)
+
+        order = []
+        while ready:
+            _, name = heapq.heappop(ready)
+            order.append(name)
+            for dependant in dependants[name]:
+                blocking[dependant] -= 1
+                if not blocking[dependant]:
+                    heapq.heappush(ready, (index[dependant], dependant))
+
+        if len(order) != len(regular):
+            raise Exception('Tasks %s have circular after dependencies.' %
+                            ', '.join(sorted(set(index) - set(order))))
+
+        return order + [t.name for t in self.tasks.values() if t.cleanup]
+
+    def dependencies(self):
+        """Return the tasks each task depends on, in execution order.
+
+        :return: Task names mapped to the set of names they depend on.
+        :rtype: OrderedDict
+        :raises Exception: When a task names an unknown failure handler.
+        """
+        dependencies = OrderedDict()
+        last = {}
+        regular = []
+
+        for name in self.order():
+            task = self.tasks[name]
+            if task.on_failure and task.on_failure not in self.handlers:
+                raise Exception('Task %s names unknown failure handler %s.' %
+                                (name, task.on_failure))
+
+            depends = set(task.after)
+            if task.cleanup:
+                depends.update(regular)
+            else:
+                regular.append(name)
+
+            # a host runs one task at a time, in order
+            for host in task.hosts:
+                if host in last:
+                    depends.add(last[host])
+                last[host] = name
+
+            depends.discard(name)
+            dependencies[name] = depends
+
+        return dependencies
+
+    def critical_path(self, durations):
+        """Return the longest chain of dependent tasks.
+
+        :param durations: Seconds each task takes, keyed by task name.
+        :type durations: dict
+        :return: Total seconds and task names of the chain.
+        :rtype: tuple
+        """
+        finish = {}
+        previous = {}
+
+        for name, depends in self.dependencies().items():
+            start = 0
+            for dependency in depends:
+                if finish[dependency] > start:
+                    start = finish[dependency]
+                    previous[name] = dependency
+            finish[name] = start + durations.get(name, 0)
+
+        if not finish:
+            return 0, []
+
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = [name]
+        while name in previous:
+            name = previous[name]
+            path.append(name)
+        return total, path[::-1]
+
+
+class DagExecutor(LoggerMixin):
+    """Task graph executor class.
+
+    Runs the tasks of a graph on a bounded pool of threads, starting each
+    task as soon as the tasks it depends on succeeded, so the wall time
+    approaches the critical path instead of the sum of all tasks. Tasks
+    depending on a failed task are skipped, cleanup tasks still run.
+    """
+
+    def __init__(self, graph, concurrency=4):
+        """Constructor.
+
+        :param graph: Task graph.
+        :type graph: TaskGraph
+        :param concurrency: Maximum number of tasks running at once.
+        :type concurrency: int
+        """
+        self.graph = graph
+        self.concurrency = max(1, concurrency)
+
+    def run(self):
+        """Run every task of the graph.
+
+        :return: Result per task (status, result, error, started, finished
+            and the outcome of the failure handler when one ran), status
+            counts, elapsed seconds and the critical path.
+        :rtype: dict
+        """
+        pending = self.graph.dependencies()
+        results = OrderedDict((name, None) for name in pending)
+        done = Queue.Queue()
+        running = 0
+        start = time.time()
+
+        def worker(task):
+            done.put((task.name, self._execute(task)))
+
+        pool = ThreadPool(self.concurrency)
+        try:
+            while pending or running:
+                for name, depends in list(pending.items()):
+                    if running >= self.concurrency:
+                        break
+                    if any(results[d] is None for d in depends):
+                        continue
+
+                    del pending[name]
+                    task = self.graph.tasks[name]
+                    failed = [d for d in depends
+                              if results[d]['status'] != 'successful']
+                    if failed and not task.cleanup:
+                        self.logger.warn('Skipping task %s, %s did not '
+                                         'succeed.', name, ', '.join(failed))
+                        now = time.time()
+                        results[name] = dict(status='skipped',
+                                             started=now, finished=now)
+                        continue
+
+                    pool.apply_async(worker, (task,))
+                    running += 1
+
+                if running:
+                    name, outcome = done.get()
+                    results[name] = outcome
+                    running -= 1
+        finally:
+            pool.close()
+            pool.join()
+
+        elapsed = time.time() - start
+        total, path = self.graph.critical_path(dict(
+            (name, r['finished'] - r['started']) for name, r in results.items()
+        ))
+
+        report = dict(
+            results=results,
+            elapsed=elapsed,
+            critical_path=path,
+            critical_time=total,
+            successful=0,
+            failed=0,
+            skipped=0
+        )
+        for result in results.values():
+            report[result['status']] += 1
+
+        self.logger.info('Ran %d tasks in %.1fs (%d successful, %d failed, '
+                         '%d skipped), critical path %s took %.1fs.',
+                         len(results), elapsed, report['successful'],
+                         report['failed'], report['skipped'],
+                         ' -> '.join(path), total)
+        return report
+
+    def _execute(self, task):
+        """Run a task, then its failure handler if it failed.
+
+        :param task: Task.
+        :type task: Task
+        :return: Task result.
+        :rtype: dict
+        """
+        outcome = self._call(task)
+        if outcome['status'] == 'failed' and task.on_failure:
+            handler = self.graph.handlers[task.on_failure]
+            outcome['handler'] = dict(self._call(handler), name=handler.name)
+            outcome['finished'] = outcome['handler']['finished']
+        return outcome
+
+    def _call(self, task):
+        """Call the function of a task.
+
+        :param task: Task.
+        :type task: Task
+        :return: Task result.
+        :rtype: dict
+        """
+        self.logger.info('Starting task %s.', task.name)
+        outcome = dict(started=time.time())
+        try:
+            outcome['result'] = task.func()
+            outcome['status'] = 'successful'
+        except Exception as ex:
+            self.logger.error('Task %s failed: %s', task.name, ex)
+            outcome['error'] = ex
+            outcome['status'] = 'failed'
+        outcome['finished'] = time.time()
+        self.logger.info('Task %s finished: %s.', task.name,
+                         outcome['status'])
+        return outcome
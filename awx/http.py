@@ -0,0 +1,213 @@
+"""Awx HTTP helper module."""
+import random
+import threading
+import time
+import urlparse
+
+import requests
+
+from .instrument import InstrumentedAdapter
+
+
+class AwxHttp(object):
+    """Awx HTTP class.
+
+    A pooled keep-alive session for the REST calls that tower-cli does not
+    cover. One instance is shared by every wrapper of a client, so requests
+    reuse open connections instead of opening one each. Idempotent requests
+    failing with a connection error or a transient server error are retried
+    with exponential back-off and random jitter.
+    """
+
+    # idempotent methods are safe to send again after a failure
+    __retry_methods__ = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    __retry_statuses__ = (429, 502, 503, 504)
+
+    def __init__(self, host, username, password, pool_size=10, verify=False,
+                 timeout=30, retries=3, backoff=0.2, gzip=True,
+                 keep_alive=True):
+        """Constructor.
+
+        :param host: Ansible AWX host URL.
+        :type host: str
+        :param username: AWX username.
+        :type username: str
+        :param password: AWX password.
+        :type password: str
+        :param pool_size: Maximum number of connections kept open.
+        :type pool_size: int
+        :param verify: Verify the server SSL certificate.
+        :type verify: bool
+        :param timeout: Seconds to wait for a connection or a response, None
+            to wait forever.
+        :type timeout: float
+        :param retries: Number of retries of a failed idempotent request.
+        :type retries: int
+        :param backoff: Seconds before the first retry, doubled after each
+            attempt and randomized by up to half its value.
+        :type backoff: float
+        :param gzip: Ask AWX for compressed responses.
+        :type gzip: bool
+        :param keep_alive: Keep connections open between requests.
+        :type keep_alive: bool
+        """
+        self.host = host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.verify = verify
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate' if gzip else 'identity',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        })
+
+        self.adapter = InstrumentedAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._retried = 0
+
+    @property
+    def stats(self):
+        """Return request, connection and retry counters.
+
+        Requests and connections are read from the connection pools, so
+        reused is the number of requests served by an already open
+        connection.
+        """
+        requests_sent = connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+
+        return dict(
+            requests=requests_sent,
+            connections=connections,
+            reused=max(0, requests_sent - connections),
+            retries=self._retried
+        )
+
+    def url(self, path):
+        """Return the absolute URL of an API path.
+
+        :param path: API path, e.g. /api/v1/projects/.
+        :type path: str
+        """
+        return urlparse.urljoin(self.host, path)
+
+    def request(self, method, path, retries=None, **kwargs):
+        """Issue a request.
+
+        :param method: HTTP method.
+        :type method: str
+        :param path: API path.
+        :type path: str
+        :param retries: Number of retries, by default the session's for
+            idempotent methods and none for the others.
+        :type retries: int
+        :return: Response.
+        :rtype: requests.Response
+        :raises requests.HTTPError: When AWX answers with an error status.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if retries is None:
+            retries = self.retries if method in self.__retry_methods__ \
+                else 0
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.request(
+                    method, self.url(path), **kwargs
+                )
+                if response.status_code not in self.__retry_statuses__ or \
+                        attempt > retries:
+                    response.raise_for_status()
+                    return response
+                response.close()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt > retries:
+                    raise
+
+            with self._lock:
+                self._retried += 1
+
+            delay = self.backoff * 2 ** (attempt - 1)
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+    def get(self, path, **params):
+        """Issue a GET request and return the decoded JSON body.
+
+        :param path: API path.
+        :type path: str
+        :param params: Query string parameters.
+        :type params: dict
+        """
+        return self.request('GET', path, params=params or None).json()
+
+    def post(self, path, data=None, retries=0):
+        """Issue a POST request with a JSON body.
+
+        :param path: API path.
+        :type path: str
+        :param data: Request body.
+        :type data: dict
+        :param retries: Number of retries, only for requests safe to send
+            twice.
+        :type retries: int
+        :return: Decoded JSON body, None when the response is empty.
+        :rtype: dict
+        """
+        response = self.request('POST', path, retries=retries, json=data)
+        return response.json() if response.content else None
+
+    def patch(self, path, data):
+        """Issue a PATCH request with a JSON body.
+
+        :param path: API path.
+        :type path: str
+        :param data: Fields to update.
+        :type data: dict
+        :return: Decoded JSON body.
+        :rtype: dict
+        """
+        return self.request('PATCH', path, json=data).json()
+
+    def delete(self, path):
+        """Issue a DELETE request.
+
+        :param path: API path.
+        :type path: str
+        """
+        self.request('DELETE', path).close()
+
+    def iterate(self, path, page_size=200, **params):
+        """Yield every object of a list endpoint, following its pages.
+
+        :param path: API path of a list endpoint.
+        :type path: str
+        :param page_size: Number of objects requested per page.
+        :type page_size: int
+        :param params: Query string parameters, e.g. filters.
+        :type params: dict
+        """
+        response = self.get(path, page_size=page_size, **params)
+        while True:
+            for item in response['results']:
+                yield item
+            if not response.get('next'):
+                return
+            # next is a path carrying the query string of the next page
+            path = urlparse.urljoin(path, response['next'])
+            response = self.request('GET', path).json()
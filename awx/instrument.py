@@ -0,0 +1,471 @@
+"""Awx instrumentation module."""
+import functools
+import inspect
+import os
+import tempfile
+import threading
+import time
+from logging import INFO, getLogger
+
+from requests.adapters import HTTPAdapter
+
+_local = threading.local()
+
+# instruments collecting, shared by every client of the process
+_instruments = []
+_lock = threading.Lock()
+
+
+def operations():
+    """Return the wrapper operations running in this thread.
+
+    :return: Operation names, e.g. AwxHost.associate, outermost first.
+    :rtype: tuple
+    """
+    return getattr(_local, 'stack', ())
+
+
+def bind(func):
+    """Return a callable running with the operations of the calling thread.
+
+    Requests made by a pool thread on behalf of a wrapper method are then
+    accounted to that method.
+
+    :param func: Callable.
+    :type func: callable
+    :rtype: callable
+    """
+    stack = operations()
+    if not stack:
+        return func
+
+    def bound(*args, **kwargs):
+        previous = operations()
+        _local.stack = stack
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.stack = previous
+    return bound
+
+
+class _Call(object):
+    """Wrapper method call, timed while it runs in the current thread."""
+
+    def __init__(self, name):
+        """Constructor.
+
+        :param name: Operation name.
+        :type name: str
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.failed = False
+        self._previous = ()
+        self._start = None
+
+    def __enter__(self):
+        """Push the operation and start the timer."""
+        self._previous = operations()
+        _local.stack = self._previous + (self.name,)
+        self._start = time.time()
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        """Stop the timer and pop the operation."""
+        self.seconds += time.time() - self._start
+        _local.stack = self._previous
+        if kind is not None:
+            self.failed = True
+
+    def finish(self):
+        """Record the call in the enabled instruments."""
+        for instrument in list(_instruments):
+            instrument.record_operation(self.name, self.seconds, self.failed)
+
+
+def instrumented(func):
+    """Return a method recorded as an operation by the enabled instruments.
+
+    Generator methods are timed while they produce items, not while the
+    caller consumes them.
+
+    :param func: Method.
+    :type func: function
+    :rtype: function
+    """
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator(self, *args, **kwargs):
+            items = func(self, *args, **kwargs)
+            if not _instruments:
+                for item in items:
+                    yield item
+                return
+
+            call = _Call('%s.%s' % (type(self).__name__, func.__name__))
+            try:
+                while True:
+                    with call:
+                        try:
+                            item = next(items)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                call.finish()
+        return generator
+
+    @functools.wraps(func)
+    def method(self, *args, **kwargs):
+        if not _instruments:
+            return func(self, *args, **kwargs)
+
+        call = _Call('%s.%s' % (type(self).__name__, func.__name__))
+        try:
+            with call:
+                return func(self, *args, **kwargs)
+        finally:
+            call.finish()
+    return method
+
+
+class Instrumented(type):
+    """Metaclass recording the public methods of a class as operations."""
+
+    def __new__(mcs, name, bases, attrs):
+        """Create the class, its public methods instrumented."""
+        for attr, value in list(attrs.items()):
+            if not attr.startswith('_') and inspect.isfunction(value):
+                attrs[attr] = instrumented(value)
+        return type.__new__(mcs, name, bases, attrs)
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTP adapter reporting every request sent to the enabled instruments.
+
+    Retries are separate requests. Bytes received are read from the
+    Content-Length header, or from the body unless it is streamed.
+    """
+
+    def send(self, request, stream=False, **kwargs):
+        """Send a request, calling the hooks of the enabled instruments."""
+        instruments = list(_instruments)
+        if not instruments:
+            return HTTPAdapter.send(self, request, stream=stream, **kwargs)
+
+        for instrument in instruments:
+            for hook in instrument.before_hooks:
+                hook(request)
+
+        response = error = None
+        start = time.time()
+        try:
+            response = HTTPAdapter.send(self, request, stream=stream,
+                                        **kwargs)
+            return response
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            stack = operations()
+            event = dict(
+                method=request.method,
+                url=request.url,
+                status=getattr(response, 'status_code', None),
+                seconds=time.time() - start,
+                bytes_sent=len(request.body)
+                if hasattr(request.body, '__len__') else 0,
+                bytes_received=self._received(response, stream),
+                operation=stack[-1] if stack else None,
+                operations=stack,
+                error=error,
+                request=request,
+                response=response
+            )
+            for instrument in instruments:
+                instrument.record_request(event)
+
+    @staticmethod
+    def _received(response, stream):
+        """Return the size of a response body.
+
+        :param response: Response, None when the request failed.
+        :type response: requests.Response
+        :param stream: Whether the body is streamed to the caller.
+        :type stream: bool
+        :rtype: int
+        """
+        if response is None:
+            return 0
+        try:
+            return int(response.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return 0 if stream else len(response.content or '')
+
+
+def _install():
+    """Report the requests tower-cli sends to the enabled instruments."""
+    from tower_cli.api import client
+
+    for prefix in ('http://', 'https://'):
+        if not isinstance(client.get_adapter(prefix), InstrumentedAdapter):
+            client.mount(prefix, InstrumentedAdapter())
+
+
+class Instrument(object):
+    """Instrument class.
+
+    Counts, per wrapper operation (a public wrapper method, e.g.
+    AwxHost.associate), the calls, failures and time spent, and the HTTP
+    requests and bytes sent through AwxHttp or tower-cli while it ran,
+    including requests made by its nested operations and pool threads:
+
+        instrument = Instrument().enable()
+        awx.host.associate('web01', 'web', 'production')
+        instrument.log()
+        instrument.write_prometheus('/var/lib/node_exporter/awx.prom')
+
+    Hooks run before every request is sent, with the prepared request, and
+    after it completed, with the request event also accounted.
+    """
+
+    __prefix__ = 'awx'
+
+    def __init__(self):
+        """Constructor."""
+        self.before_hooks = []
+        self.after_hooks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __enter__(self):
+        """Enable the instrument."""
+        return self.enable()
+
+    def __exit__(self, kind, value, traceback):
+        """Disable the instrument."""
+        self.disable()
+
+    def enable(self):
+        """Start collecting.
+
+        :return: The instrument.
+        :rtype: Instrument
+        """
+        with _lock:
+            _install()
+            if self not in _instruments:
+                _instruments.append(self)
+        return self
+
+    def disable(self):
+        """Stop collecting."""
+        with _lock:
+            if self in _instruments:
+                _instruments.remove(self)
+
+    def reset(self):
+        """Clear the collected counters."""
+        with self._lock:
+            self.operations = {}
+            self.requests = {}
+
+    def before_request(self, func):
+        """Add a hook called before each request is sent.
+
+        :param func: Callable taking the requests.PreparedRequest.
+        :type func: callable
+        :return: The hook, so the method can be used as a decorator.
+        :rtype: callable
+        """
+        self.before_hooks.append(func)
+        return func
+
+    def after_request(self, func):
+        """Add a hook called after each request completed or failed.
+
+        :param func: Callable taking the request event, a dict with method,
+            url, status, seconds, bytes_sent, bytes_received, operation,
+            operations, error, request and response keys.
+        :type func: callable
+        :return: The hook, so the method can be used as a decorator.
+        :rtype: callable
+        """
+        self.after_hooks.append(func)
+        return func
+
+    @staticmethod
+    def _counters(**fields):
+        """Return new counters."""
+        return dict(fields, calls=0, errors=0, seconds=0.0, max_seconds=0.0,
+                    requests=0, own_requests=0, request_seconds=0.0,
+                    bytes_sent=0, bytes_received=0)
+
+    def record_operation(self, name, seconds, failed):
+        """Account a finished wrapper operation.
+
+        :param name: Operation name.
+        :type name: str
+        :param seconds: Seconds the operation ran.
+        :type seconds: float
+        :param failed: Whether the operation raised.
+        :type failed: bool
+        """
+        with self._lock:
+            counters = self.operations.get(name)
+            if counters is None:
+                counters = self.operations[name] = self._counters(
+                    operation=name)
+            counters['calls'] += 1
+            counters['errors'] += failed
+            counters['seconds'] += seconds
+            counters['max_seconds'] = max(counters['max_seconds'], seconds)
+
+    def record_request(self, event):
+        """Account a request and call the after request hooks.
+
+        :param event: Request event, see after_request.
+        :type event: dict
+        """
+        key = (event['method'], event['status'])
+        with self._lock:
+            counters = self.requests.get(key)
+            if counters is None:
+                counters = self.requests[key] = self._counters(
+                    method=event['method'], status=event['status'])
+            self._account(counters, event)
+            counters['errors'] += event['error'] is not None
+
+            # every running operation made the request, the innermost one
+            # made it itself
+            for name in set(event['operations']) or (None,):
+                operation = self.operations.get(name)
+                if operation is None:
+                    operation = self.operations[name] = self._counters(
+                        operation=name)
+                self._account(operation, event)
+                operation['own_requests'] += name == event['operation']
+
+        for hook in self.after_hooks:
+            hook(event)
+
+    @staticmethod
+    def _account(counters, event):
+        """Add a request event to counters."""
+        counters['requests'] += 1
+        counters['request_seconds'] += event['seconds']
+        counters['bytes_sent'] += event['bytes_sent']
+        counters['bytes_received'] += event['bytes_received']
+
+    def report(self):
+        """Return the counters of the operations, slowest first.
+
+        Requests made outside of any wrapper operation, e.g. by the job
+        watcher, are counted under the None operation.
+
+        :rtype: list
+        """
+        with self._lock:
+            operations = [dict(c) for c in self.operations.values()]
+        return sorted(operations, key=lambda c: c['seconds'], reverse=True)
+
+    def log(self, logger=None, level=INFO):
+        """Log the counters of the operations and requests.
+
+        :param logger: Logger, the module logger by default.
+        :type logger: logging.Logger
+        :param level: Log level.
+        :type level: int
+        """
+        logger = logger or getLogger(__name__)
+        for counters in self.report():
+            logger.log(
+                level, '%s: %d calls, %d failed, %.3fs, %d requests '
+                '(%d own, %.1f per call), %d bytes sent, %d received.',
+                counters['operation'] or 'no operation', counters['calls'],
+                counters['errors'], counters['seconds'], counters['requests'],
+                counters['own_requests'],
+                float(counters['requests']) / max(1, counters['calls']),
+                counters['bytes_sent'], counters['bytes_received']
+            )
+
+        with self._lock:
+            requests = sorted(self.requests.values(),
+                              key=lambda c: (c['method'], c['status']))
+        for counters in requests:
+            logger.log(level, '%s %s: %d requests, %.3fs, %d bytes sent, '
+                       '%d received.', counters['method'],
+                       counters['status'] or 'error', counters['requests'],
+                       counters['request_seconds'], counters['bytes_sent'],
+                       counters['bytes_received'])
+
+    def prometheus(self):
+        """Return the counters in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        with self._lock:
+            operations = [dict(c) for c in self.operations.values()]
+            requests = [dict(c) for c in self.requests.values()]
+
+        metrics = [
+            ('operation_calls_total', 'Wrapper operation calls.', 'calls',
+             operations),
+            ('operation_errors_total', 'Wrapper operations that raised.',
+             'errors', operations),
+            ('operation_seconds_total', 'Seconds spent in wrapper '
+             'operations.', 'seconds', operations),
+            ('operation_requests_total', 'HTTP requests made by wrapper '
+             'operations and their nested operations.', 'requests',
+             operations),
+            ('operation_own_requests_total', 'HTTP requests made by wrapper '
+             'operations themselves.', 'own_requests', operations),
+            ('operation_bytes_sent_total', 'Request bytes sent by wrapper '
+             'operations.', 'bytes_sent', operations),
+            ('operation_bytes_received_total', 'Response bytes received by '
+             'wrapper operations.', 'bytes_received', operations),
+            ('requests_total', 'HTTP requests sent.', 'requests', requests),
+            ('request_errors_total', 'HTTP requests failing without a '
+             'response.', 'errors', requests),
+            ('request_seconds_total', 'Seconds spent in HTTP requests.',
+             'request_seconds', requests),
+            ('request_bytes_sent_total', 'Request bytes sent.', 'bytes_sent',
+             requests),
+            ('request_bytes_received_total', 'Response bytes received.',
+             'bytes_received', requests),
+        ]
+
+        lines = []
+        for name, description, field, series in metrics:
+            name = '%s_%s' % (self.__prefix__, name)
+            lines.append('# HELP %s %s' % (name, description))
+            lines.append('# TYPE %s counter' % name)
+            for counters in series:
+                if 'operation' in counters:
+                    labels = 'operation="%s"' % (counters['operation'] or '')
+                else:
+                    labels = 'method="%s",status="%s"' % (
+                        counters['method'], counters['status'] or '')
+                lines.append('%s{%s} %s' % (name, labels, counters[field]))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the counters to a Prometheus text file.
+
+        The file is replaced atomically, so a collector never reads it
+        half written.
+
+        :param path: File path, e.g. for the node exporter textfile
+            collector.
+        :type path: str
+        """
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix='.awx', suffix='.prom')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(self.prometheus())
+            os.rename(temp, path)
+        except Exception:
+            os.remove(temp)
+            raise
@@ -0,0 +1,209 @@
+"""Awx job launcher module."""
+import Queue
+import threading
+import time
+
+from .base import LoggerMixin
+from .commands.job import AwxJob
+from .parallel import Future
+
+
+class AwxLauncher(LoggerMixin):
+    """Awx job launcher class.
+
+    Launches queued (template, extra vars) work items while keeping at most
+    max_running jobs running. The next item is launched as soon as a
+    running job finishes, completion being tracked by the batched job
+    watcher. Submitting blocks once queue_size items are waiting, so a
+    producer cannot outrun AWX.
+
+        launcher = AwxLauncher(awx.job, max_running=20)
+        futures = [launcher.submit('deploy', [{'shard': i}])
+                   for i in range(500)]
+        launcher.join()
+        print(launcher.metrics)
+    """
+
+    def __init__(self, wrapper, max_running=10, queue_size=0,
+                 reason='Launched by AwxLauncher.', timeout=3600):
+        """Constructor.
+
+        :param wrapper: Job or workflow job instance launching the items.
+        :type wrapper: AwxJob
+        :param max_running: Maximum number of jobs running at once.
+        :type max_running: int
+        :param queue_size: Maximum number of items waiting, 0 for no limit.
+        :type queue_size: int
+        :param reason: Reason given for job template launches.
+        :type reason: str
+        :param timeout: Seconds before watching a job is aborted.
+        :type timeout: float
+        """
+        self.wrapper = wrapper
+        self.max_running = max(1, max_running)
+        self.reason = reason
+        self.timeout = timeout
+
+        self._queue = Queue.Queue(maxsize=queue_size)
+        self._slots = threading.Semaphore(self.max_running)
+        self._lock = threading.Condition(threading.Lock())
+        self._thread = None
+        self._closed = False
+        self._started = None
+        self._counters = dict(
+            submitted=0, running=0, completed=0, successful=0, failed=0
+        )
+
+    @property
+    def metrics(self):
+        """Return queue depth, running jobs, completion and throughput."""
+        with self._lock:
+            metrics = dict(self._counters, queued=self._queue.qsize())
+            elapsed = time.time() - self._started if self._started else 0
+        metrics['elapsed'] = elapsed
+        metrics['throughput'] = metrics['completed'] / elapsed \
+            if elapsed else 0.0
+        return metrics
+
+    def submit(self, template, extra_vars=None):
+        """Queue a work item.
+
+        Blocks while the queue is full.
+
+        :param template: Template name.
+        :type template: str
+        :param extra_vars: Extra variables.
+        :type extra_vars: list
+        :return: Future completed with the finished job, failed when the
+            launch fails or the job cannot be watched.
+        :rtype: Future
+        """
+        future = Future()
+
+        with self._lock:
+            if self._closed:
+                raise Exception('Launcher is closed.')
+            if self._started is None:
+                self._started = time.time()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch)
+                self._thread.daemon = True
+                self._thread.start()
+            self._counters['submitted'] += 1
+
+        self._queue.put((template, extra_vars, future))
+        return future
+
+    def map(self, items):
+        """Queue work items.
+
+        :param items: (template, extra vars) tuples.
+        :type items: iterable
+        :return: Futures, in item order.
+        :rtype: list
+        """
+        return [self.submit(template, extra_vars)
+                for template, extra_vars in items]
+
+    def join(self, timeout=None):
+        """Wait until every submitted item finished.
+
+        :param timeout: Seconds to wait, None to wait forever.
+        :type timeout: float
+        :return: Whether every item finished.
+        :rtype: bool
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while self._counters['completed'] < self._counters['submitted']:
+                remaining = 1.0 if deadline is None else \
+                    deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(min(remaining, 1.0))
+        return True
+
+    def close(self):
+        """Wait for the submitted items and stop the dispatcher thread."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+
+        self.join()
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _dispatch(self):
+        """Launch queued items as running slots free up."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            template, extra_vars, future = item
+            self._slots.acquire()
+
+            try:
+                job = self._launch(template, extra_vars)
+            except Exception as ex:
+                self.logger.error('Launching %s failed: %s', template, ex)
+                self._finish(future, error=ex)
+                continue
+
+            with self._lock:
+                self._counters['running'] += 1
+
+            self.wrapper.watch(
+                job['id'],
+                lambda watch, f=future: self._finish(f, watch, running=True),
+                self.timeout
+            )
+
+    def _launch(self, template, extra_vars):
+        """Launch a work item.
+
+        :param template: Template name.
+        :type template: str
+        :param extra_vars: Extra variables.
+        :type extra_vars: list
+        :return: Launch data.
+        :rtype: dict
+        """
+        if isinstance(self.wrapper, AwxJob):
+            handle = self.wrapper.launch_handle(template, self.reason)
+            return handle.launch(extra_vars)
+        return self.wrapper.launch(template, extra_vars)
+
+    def _finish(self, future, watch=None, error=None, running=False):
+        """Record a finished item and free its slot.
+
+        :param future: Future of the item.
+        :type future: Future
+        :param watch: Completed job watch.
+        :type watch: Future
+        :param error: Error the launch failed with.
+        :type error: Exception
+        :param running: Whether the item held a running job.
+        :type running: bool
+        """
+        if watch is not None:
+            error = watch.exception()
+        job = watch.result() if error is None else None
+
+        with self._lock:
+            if running:
+                self._counters['running'] -= 1
+            self._counters['completed'] += 1
+            if job is not None and not job['failed']:
+                self._counters['successful'] += 1
+            else:
+                self._counters['failed'] += 1
+            self._lock.notify_all()
+
+        self._slots.release()
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(job)
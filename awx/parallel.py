@@ -0,0 +1,339 @@
+"""Awx parallel helper module."""
+import Queue
+import logging
+import threading
+import time
+from itertools import chain, islice
+from multiprocessing.pool import ThreadPool
+
+from .instrument import bind
+
+
+def imap_bounded(func, items, concurrency=8, executor=None):
+    """Call a function on items using a bounded number of threads.
+
+    Items are consumed lazily, keeping at most concurrency calls in flight
+    on the executor, so arbitrarily long iterables can be streamed.
+    Results are yielded in completion order, exceptions are returned
+    rather than raised so one failing item does not abort the others.
+    Empty and single item inputs, and calls made from a thread of the
+    executor itself, run inline in the calling thread.
+
+    :param func: Callable taking one item.
+    :type func: callable
+    :param items: Items to process.
+    :type items: iterable
+    :param concurrency: Maximum number of concurrent calls.
+    :type concurrency: int
+    :param executor: Executor running the calls, the shared default
+        executor when not given.
+    :type executor: Executor
+    :return: Generator of (item, result, error) tuples.
+    :rtype: generator
+    """
+    items = iter(items)
+    head = list(islice(items, 2))
+    if executor is None:
+        executor = default_executor()
+
+    if len(head) < 2 or concurrency <= 1 or executor.in_worker():
+        for item in chain(head, items):
+            try:
+                yield item, func(item), None
+            except Exception as ex:
+                yield item, None, ex
+        return
+
+    done = Queue.Queue()
+
+    def callback(item):
+        def put(future):
+            error = future.exception()
+            result = future.result() if error is None else None
+            done.put((item, result, error))
+        return put
+
+    pending = 0
+    for item in chain(head, items):
+        if pending >= concurrency:
+            yield done.get()
+            pending -= 1
+        executor.submit(func, item).add_done_callback(callback(item))
+        pending += 1
+
+    while pending:
+        yield done.get()
+        pending -= 1
+
+
+class Future(object):
+    """Future class.
+
+    The eventual result of an operation completed by another thread, e.g.
+    a job watched until it finishes.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._result = None
+        self._error = None
+
+    def done(self):
+        """Return whether the result is available."""
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """Return the result, blocking until it is available.
+
+        :param timeout: Seconds to wait, None to wait forever.
+        :type timeout: float
+        :return: Result.
+        :raises Exception: The error the operation failed with, or a timeout
+            error when the result is not available in time.
+        """
+        # wait in slices so the calling thread stays interruptible
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._event.is_set():
+            remaining = 1.0 if deadline is None else deadline - time.time()
+            if remaining <= 0:
+                raise Exception('Timed out waiting for result.')
+            self._event.wait(min(remaining, 1.0))
+
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self):
+        """Return the error the operation failed with, if any."""
+        return self._error
+
+    def add_done_callback(self, callback):
+        """Call a function with the future once it is done.
+
+        The callback runs right away when the future is already done.
+
+        :param callback: Callable taking the future.
+        :type callback: callable
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def set_result(self, result):
+        """Complete the future with a result.
+
+        :param result: Result.
+        """
+        self._complete(result, None)
+
+    def set_exception(self, error):
+        """Complete the future with an error.
+
+        :param error: Error.
+        :type error: Exception
+        """
+        self._complete(None, error)
+
+    def _complete(self, result, error):
+        """Store the outcome and run the callbacks."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._result = result
+            self._error = error
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Future callback failed.'
+                )
+
+
+def prefetch(items, depth=1):
+    """Consume an iterable from a background thread, one step ahead.
+
+    While the caller processes an item the next ones (at most depth) are
+    already being produced, e.g. the next page of a listing is requested
+    while the current one is consumed. Exceptions raised by the iterable
+    are re-raised to the caller. Closing the generator early stops the
+    background thread.
+
+    :param items: Items to consume.
+    :type items: iterable
+    :param depth: Maximum number of items produced ahead.
+    :type depth: int
+    :return: Generator of items.
+    :rtype: generator
+    """
+    done = object()
+    queue = Queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(entry):
+        # give up when the consumer went away instead of blocking forever
+        while not stop.is_set():
+            try:
+                queue.put(entry, timeout=0.1)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
+    def producer():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as ex:
+            put((done, ex))
+        else:
+            put((done, None))
+
+    thread = threading.Thread(target=bind(producer))
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item, error = queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+class Executor(object):
+    """Executor class.
+
+    Runs calls on a bounded pool of threads and returns a Future per call,
+    so many calls can be in flight without a thread per caller.
+    """
+
+    def __init__(self, workers=16):
+        """Constructor.
+
+        :param workers: Number of threads running calls.
+        :type workers: int
+        """
+        self.workers = max(1, workers)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def in_worker(self):
+        """Return whether the calling thread is one of the executor's."""
+        return getattr(self._local, 'worker', False)
+
+    def _init_worker(self):
+        """Mark a new pool thread as a worker of the executor."""
+        self._local.worker = True
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule a call.
+
+        :param func: Callable.
+        :type func: callable
+        :return: Future completed with the return value of the call.
+        :rtype: Future
+        """
+        future = Future()
+        func = bind(func)
+
+        def worker():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as ex:
+                future.set_exception(ex)
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers, self._init_worker)
+            self._pool.apply_async(worker)
+        return future
+
+    def shutdown(self):
+        """Wait for the scheduled calls and stop the threads."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def gather(futures, timeout=None):
+    """Return the results of futures, in order.
+
+    :param futures: Futures.
+    :type futures: list
+    :param timeout: Seconds to wait for all results.
+    :type timeout: float
+    :return: Results.
+    :rtype: list
+    :raises Exception: The first error a future failed with.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    results = []
+    for future in futures:
+        remaining = None if deadline is None else \
+            max(0, deadline - time.time())
+        results.append(future.result(remaining))
+    return results
+
+
+def as_completed(futures, timeout=None):
+    """Yield futures as they complete.
+
+    :param futures: Futures.
+    :type futures: list
+    :param timeout: Seconds to wait for all futures.
+    :type timeout: float
+    :return: Generator of futures.
+    :rtype: generator
+    :raises Exception: When the timeout elapses.
+    """
+    done = Queue.Queue()
+    futures = list(futures)
+    for future in futures:
+        future.add_done_callback(done.put)
+
+    deadline = None if timeout is None else time.time() + timeout
+    pending = len(futures)
+    while pending:
+        remaining = 1.0 if deadline is None else deadline - time.time()
+        if remaining <= 0:
+            raise Exception('Timed out waiting for results.')
+        try:
+            future = done.get(timeout=min(remaining, 1.0))
+        except Queue.Empty:
+            continue
+        pending -= 1
+        yield future
+
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+
+def default_executor():
+    """Return the executor shared by callers not bringing their own.
+
+    :rtype: Executor
+    """
+    global _default_executor
+    if _default_executor is None:
+        with _default_lock:
+            if _default_executor is None:
+                _default_executor = Executor()
+    return _default_executor
@@ -0,0 +1,258 @@
+"""Awx workflow schema module."""
+import re
+from collections import OrderedDict
+
+from .dag import TaskGraph
+
+
+def _split(value):
+    """Return the names of a comma or space separated list.
+
+    :param value: Names, as a string or a list.
+    :type value: str
+    :rtype: list
+    """
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [v for v in re.split(r'[,\s]+', value or '') if v]
+
+
+class WorkflowSchema(object):
+    """Workflow node network class.
+
+    Nodes are numbered in creation order and keep the job template they
+    run and the nodes started on success, on failure and always. Unlike the
+    nested schema format of tower-cli, a node may have several parents, so
+    fan-in does not duplicate nodes.
+    """
+
+    __edges__ = ('success', 'failure', 'always')
+
+    def __init__(self):
+        """Constructor."""
+        self.nodes = OrderedDict()
+
+    def add_node(self, name, job_template, copied=False):
+        """Add a node.
+
+        :param name: Node name, unique within the schema.
+        :type name: str
+        :param job_template: Job template run by the node.
+        :type job_template: str
+        :param copied: Copy the node under each of its parents in the
+            nested format, e.g. cleanup nodes run after any branch.
+        :type copied: bool
+        :return: Node.
+        :rtype: dict
+        """
+        node = dict(id=len(self.nodes) + 1, name=name,
+                    job_template=job_template, success=[], failure=[],
+                    always=[], copied=copied)
+        self.nodes[node['id']] = node
+        return node
+
+    def link(self, parent, child, edge='success'):
+        """Start a node once its parent finished.
+
+        :param parent: Parent node id.
+        :type parent: int
+        :param child: Child node id.
+        :type child: int
+        :param edge: success, failure or always.
+        :type edge: str
+        """
+        if edge not in self.__edges__:
+            raise Exception('Unknown edge %s.' % edge)
+        if child not in self.nodes[parent][edge]:
+            self.nodes[parent][edge].append(child)
+
+    @property
+    def edges(self):
+        """Return (parent id, child id, edge) tuples."""
+        return [(node['id'], child, edge)
+                for node in self.nodes.values()
+                for edge in self.__edges__
+                for child in node[edge]]
+
+    @property
+    def job_templates(self):
+        """Return the names of the job templates run by the nodes."""
+        return sorted(set(n['job_template'] for n in self.nodes.values()))
+
+    def parents(self):
+        """Return the (parent id, edge) tuples of every node.
+
+        :rtype: dict
+        """
+        parents = dict((pk, []) for pk in self.nodes)
+        for parent, child, edge in self.edges:
+            parents[child].append((parent, edge))
+        return parents
+
+    def order(self):
+        """Return the node ids, every node after its parents.
+
+        :rtype: list
+        :raises Exception: When the edges are circular.
+        """
+        blocking = dict((pk, len(p)) for pk, p in self.parents().items())
+        ready = [pk for pk in self.nodes if not blocking[pk]]
+        order = []
+        while ready:
+            pk = ready.pop()
+            order.append(pk)
+            for edge in self.__edges__:
+                for child in self.nodes[pk][edge]:
+                    blocking[child] -= 1
+                    if not blocking[child]:
+                        ready.append(child)
+
+        if len(order) != len(self.nodes):
+            raise Exception('Schema edges are circular.')
+        return order
+
+    def roots(self):
+        """Return the ids of the nodes without parent.
+
+        :rtype: list
+        """
+        children = set(child for _, child, _ in self.edges)
+        return [pk for pk in self.nodes if pk not in children]
+
+    def network(self):
+        """Return the node network in the nested tower-cli schema format.
+
+        :return: Nested nodes with job_template and edge keys.
+        :rtype: list
+        :raises Exception: When a node has several parents, which the
+            nested format cannot express, unless it is copied under each
+            of them. A parent starting a node on several edges is fine, only
+            one of them fires.
+        """
+        parents = {}
+        for parent, child, _ in self.edges:
+            if self.nodes[child]['copied']:
+                continue
+            if parents.get(child, parent) != parent:
+                raise Exception('Node %s has several parents, upload the '
+                                'schema instead.' % self.nodes[child]['name'])
+            parents[child] = parent
+
+        def nest(pk):
+            node = self.nodes[pk]
+            nested = dict(job_template=node['job_template'])
+            for edge in self.__edges__:
+                if node[edge]:
+                    nested[edge] = [nest(child) for child in node[edge]]
+            return nested
+
+        return [nest(pk) for pk in self.roots()]
+
+
+def compile_schema(orchestrate, template=None):
+    """Compile the orchestrate section of a descriptor into a node network.
+
+    Tasks run after the tasks named in their after list and after the
+    previous task sharing one of their hosts, as with TaskGraph, so tasks on
+    distinct hosts fan out and join again where a later task depends on
+    several of them. A task naming an on_failure handler starts its own
+    copy of the handler when it fails. Cleanup tasks run once the last
+    tasks succeeded, or after any failed task and its handler. The network
+    is built in a single pass over the ordered tasks and their
+    dependencies, leaving out dependencies another one already implies.
+
+    :param orchestrate: Tasks with name, hosts, after, on_failure, cleanup
+        and cleanup_task keys.
+    :type orchestrate: list
+    :param template: Callable returning the job template of a task, the
+        task name by default.
+    :type template: callable
+    :return: Workflow schema.
+    :rtype: WorkflowSchema
+    :raises Exception: When a task names unknown tasks or handlers, or the
+        after lists are circular.
+    """
+    template = template or (lambda item: item.get('job_template',
+                                                  item['name']))
+    graph = TaskGraph()
+    keys = OrderedDict()
+    items = OrderedDict()
+
+    # tasks may share a name, key them uniquely
+    for index, item in enumerate(orchestrate):
+        key = item['name']
+        if key in items:
+            key = '%s[%d]' % (item['name'], index)
+        keys.setdefault(item['name'], []).append(key)
+        items[key] = item
+
+    for key, item in items.items():
+        hosts = _split(item.get('hosts'))
+        if item.get('cleanup_task'):
+            graph.add_handler(key, None, hosts=hosts)
+            continue
+
+        after = []
+        for name in _split(item.get('after')):
+            after.extend(keys.get(name, [name]))
+        handler = item.get('on_failure')
+        graph.add(key, None, after=after, hosts=hosts,
+                  cleanup=bool(item.get('cleanup')),
+                  on_failure=keys.get(handler, [handler])[0]
+                  if handler else None)
+
+    schema = WorkflowSchema()
+    dependencies = graph.dependencies()
+    cleanups = [name for name in dependencies if graph.tasks[name].cleanup]
+
+    def add(name, copied=False):
+        return schema.add_node(name, template(items[name]), copied)['id']
+
+    # dependencies are in execution order, parents come first; a
+    # dependency already reached through another one is left out, so a
+    # task following a host chain keeps a single parent
+    ids = OrderedDict()
+    ancestors = {}
+    for name, depends in dependencies.items():
+        if graph.tasks[name].cleanup:
+            continue
+        ids[name] = add(name)
+
+        # ancestors are bit sets of node ids
+        reached = 0
+        for dependency in depends:
+            reached |= ancestors[dependency]
+        ancestors[name] = reached
+        for dependency in depends:
+            ancestors[name] |= 1 << ids[dependency]
+            if not reached & (1 << ids[dependency]):
+                schema.link(ids[dependency], ids[name])
+
+    # one cleanup chain started by every branch, only the nested format
+    # needs a copy per branch
+    first = previous = None
+    for name in cleanups:
+        pk = add(name, copied=True)
+        if previous is None:
+            first = pk
+        else:
+            schema.link(previous, pk, 'always')
+        previous = pk
+
+    for name, pk in ids.items():
+        task = graph.tasks[name]
+        if task.on_failure:
+            handler = add(task.on_failure)
+            schema.link(pk, handler, 'failure')
+            if cleanups:
+                schema.link(handler, first, 'always')
+        elif cleanups:
+            schema.link(pk, first, 'failure')
+
+    # cleanup after the last tasks succeeded
+    if cleanups:
+        for name, pk in ids.items():
+            if not schema.nodes[pk]['success']:
+                schema.link(pk, first)
+
+    return schema
@@ -0,0 +1,85 @@
+"""Awx job standard out module."""
+import time
+
+from .watcher import JobWatcher
+
+
+def iter_stdout(resource, job_id, start_line=0, follow=True,
+                chunk_lines=1000, min_interval=0.5, max_interval=5.0):
+    """Yield the standard out of a unified job incrementally.
+
+    Output is requested in chunks of lines starting at a line offset, so
+    only one chunk is held in memory. Each chunk is yielded with the offset
+    of the line following it, which can be saved and passed back as the
+    start line to resume. When following a running job, incomplete trailing
+    lines are held back until they are complete, and polling backs off
+    from min_interval to max_interval while no output arrives.
+
+    :param resource: Tower-cli unified job resource, e.g. job or ad_hoc.
+    :type resource: tower_cli.models.base.MonitorableResource
+    :param job_id: Job id.
+    :type job_id: int
+    :param start_line: Line offset to start from.
+    :type start_line: int
+    :param follow: Keep polling until the job finishes.
+    :type follow: bool
+    :param chunk_lines: Maximum number of lines per request.
+    :type chunk_lines: int
+    :param min_interval: Seconds between polls while output arrives.
+    :type min_interval: float
+    :param max_interval: Maximum seconds between polls.
+    :type max_interval: float
+    :return: Generator of (next line offset, content) tuples.
+    :rtype: generator
+    """
+    line = start_line
+    interval = min_interval
+    finished = not follow
+
+    while True:
+        content = resource.lookup_stdout(job_id, line, line + chunk_lines)
+
+        # output is not available during the first moments of a job
+        if content.startswith(b'Waiting for results'):
+            content = b''
+
+        lines = content.splitlines(True)
+        if lines and not finished and not lines[-1].endswith(b'\n'):
+            lines.pop()
+
+        if lines:
+            line += len(lines)
+            interval = min_interval
+            yield line, b''.join(lines)
+            if len(lines) >= chunk_lines:
+                continue
+
+        if finished:
+            return
+
+        # drain what is left once more after the job finished
+        if resource.status(job_id)['status'] in JobWatcher.FINISHED:
+            finished = True
+            continue
+
+        time.sleep(interval)
+        interval = min(interval * 1.5, max_interval)
+
+
+def write_stdout(chunks, sink, start_line=0):
+    """Write standard out chunks to a file-like object.
+
+    :param chunks: (next line offset, content) tuples, see iter_stdout.
+    :type chunks: iterable
+    :param sink: File-like object written to and flushed after each chunk.
+    :type sink: file
+    :param start_line: Line offset the chunks start from.
+    :type start_line: int
+    :return: Offset of the line following the last line written.
+    :rtype: int
+    """
+    line = start_line
+    for line, content in chunks:
+        sink.write(content)
+        sink.flush()
+    return line
@@ -0,0 +1,210 @@
+"""Awx job watcher module."""
+import threading
+import time
+from logging import getLogger
+
+from .parallel import Future
+
+LOG = getLogger(__name__)
+
+
+class JobWatcher(object):
+    """Job watcher class.
+
+    Tracks any number of jobs of one resource (e.g. job, workflow_job) from
+    a single background thread. Each poll fetches the status of every
+    watched job with one list request filtered by id__in, so the request
+    rate depends on the poll interval rather than on the number of jobs.
+    The interval starts at min_interval and grows by the backoff factor up
+    to max_interval while no watched job changes status. When a job
+    finishes its futures are completed with the job object.
+    """
+
+    FINISHED = ('successful', 'failed', 'error', 'canceled')
+
+    def __init__(self, resource, min_interval=0.5, max_interval=10.0,
+                 backoff=1.5, batch_size=200):
+        """Constructor.
+
+        :param resource: Tower-cli resource listing the jobs.
+        :type resource: tower_cli.models.base.Resource
+        :param min_interval: Seconds between polls after a status change.
+        :type min_interval: float
+        :param max_interval: Maximum seconds between polls.
+        :type max_interval: float
+        :param backoff: Factor the interval grows by on idle polls.
+        :type backoff: float
+        :param batch_size: Maximum number of job ids per list request.
+        :type batch_size: int
+        """
+        self.resource = resource
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self._watched = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._polls = 0
+        self._requests = 0
+
+    @property
+    def stats(self):
+        """Return poll and request counters."""
+        with self._lock:
+            return dict(
+                polls=self._polls,
+                requests=self._requests,
+                watching=len(self._watched)
+            )
+
+    def watch(self, job_id, callback=None, timeout=None):
+        """Watch a job until it finishes.
+
+        :param job_id: Job id.
+        :type job_id: int
+        :param callback: Callable taking the future, called once the job
+            finishes or the watch times out.
+        :type callback: callable
+        :param timeout: Seconds before the watch is aborted, None to watch
+            until the job finishes.
+        :type timeout: float
+        :return: Future completed with the finished job object.
+        :rtype: Future
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._lock:
+            self._watched.setdefault(int(job_id), []).append(
+                (future, deadline)
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+
+        # poll soon, the new job is likely to change status shortly
+        self._wakeup.set()
+        return future
+
+    def _run(self):
+        """Poll the watched jobs until none is left."""
+        interval = self.min_interval
+        last_poll = 0
+
+        while True:
+            with self._lock:
+                if not self._watched:
+                    self._thread = None
+                    return
+                job_ids = sorted(self._watched)
+
+            # never poll more often than min_interval, even when woken up
+            time.sleep(max(0, last_poll + self.min_interval - time.time()))
+            last_poll = time.time()
+
+            if self._poll(job_ids):
+                interval = self.min_interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+
+            self._expire()
+
+            if self._wakeup.wait(interval):
+                self._wakeup.clear()
+                interval = self.min_interval
+
+    def _poll(self, job_ids):
+        """Fetch the status of jobs and complete the finished ones.
+
+        :param job_ids: Job ids.
+        :type job_ids: list
+        :return: Whether any job changed status.
+        :rtype: bool
+        """
+        changed = False
+
+        for start in range(0, len(job_ids), self.batch_size):
+            batch = job_ids[start:start + self.batch_size]
+            try:
+                response = self.resource.list(
+                    page_size=len(batch),
+                    query=[('id__in', ','.join(str(i) for i in batch))]
+                )
+            except Exception as ex:
+                LOG.warning('Polling jobs %s failed: %s', batch, ex)
+                continue
+            finally:
+                with self._lock:
+                    self._requests += 1
+
+            jobs = dict((job['id'], job) for job in response['results'])
+            for job_id in batch:
+                job = jobs.get(job_id)
+                if job is None:
+                    self._complete(job_id, error=Exception(
+                        'Job %s not found.' % job_id
+                    ))
+                    changed = True
+                    continue
+
+                if self._statuses.get(job_id) != job['status']:
+                    self._statuses[job_id] = job['status']
+                    changed = True
+
+                if job['status'] in self.FINISHED:
+                    self._complete(job_id, job=job)
+
+        with self._lock:
+            self._polls += 1
+        return changed
+
+    def _expire(self):
+        """Abort watches whose timeout elapsed."""
+        now = time.time()
+        expired = []
+
+        with self._lock:
+            for job_id, watches in list(self._watched.items()):
+                keep = []
+                for future, deadline in watches:
+                    if deadline is not None and deadline < now:
+                        expired.append((job_id, future))
+                    else:
+                        keep.append((future, deadline))
+                if keep:
+                    self._watched[job_id] = keep
+                else:
+                    del self._watched[job_id]
+                    self._statuses.pop(job_id, None)
+
+        for job_id, future in expired:
+            future.set_exception(Exception(
+                'Monitoring job %s aborted due to timeout.' % job_id
+            ))
+
+    def _complete(self, job_id, job=None, error=None):
+        """Stop watching a job and complete its futures.
+
+        :param job_id: Job id.
+        :type job_id: int
+        :param job: Finished job object.
+        :type job: dict
+        :param error: Error to fail the futures with.
+        :type error: Exception
+        """
+        with self._lock:
+            watches = self._watched.pop(job_id, [])
+            self._statuses.pop(job_id, None)
+
+        for future, _ in watches:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(job)
@@ -0,0 +1 @@
+"""Awx benchmarks package."""
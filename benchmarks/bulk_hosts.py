@@ -0,0 +1,67 @@
+"""Benchmark bulk host creation against the local stub server.
+
+Creates hosts one at a time through AwxHost.create, then through
+AwxHost.bulk_create at several concurrency levels, and reports throughput
+and requests served per host.
+
+Run from the repository root:
+
+    $ python -m benchmarks.bulk_hosts --hosts 500 --latency 0.005
+"""
+import argparse
+import time
+
+from awx import Awx
+from benchmarks.stub_server import StubServer
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 8, 16])
+    args = parser.parse_args()
+
+    server = StubServer(latency=args.latency).start()
+    awx = Awx(host=server.url, username='admin', password='admin',
+              verbose=0)
+
+    org = server.store.create('organizations', name='bench')
+
+    def run(label, func):
+        inventory = 'inv_%s' % label
+        server.store.create('inventories', name=inventory,
+                            organization=org['id'])
+        names = ['%s-host%05d' % (label, i) for i in range(args.hosts)]
+
+        server.reset_counters()
+        start = time.time()
+        func(inventory, names)
+        elapsed = time.time() - start
+
+        print('%-12s %8.1f hosts/s %6.2f requests/host' % (
+            label, args.hosts / elapsed,
+            float(server.request_count) / args.hosts
+        ))
+
+    def serial(inventory, names):
+        for name in names:
+            awx.host.create(name, inventory, variables={'bench': True})
+
+    run('create', serial)
+
+    for concurrency in args.concurrency:
+        run('bulk_%d' % concurrency,
+            lambda inventory, names: awx.host.bulk_create(
+                inventory,
+                ((name, {'bench': True}) for name in names),
+                concurrency=concurrency
+            ))
+
+    server.stop()
+
+
+if '__main__' == __name__:
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark the logging overhead of AwxHost.create.
+
+Times the two log calls AwxHost.create makes per host, once through the
+cached class logger and once through the previous stack inspecting logger
+property, with the log level enabled and disabled.
+
+Run from the repository root:
+
+    $ python -m benchmarks.logging_overhead --calls 20000
+"""
+import argparse
+import inspect
+import timeit
+from logging import CRITICAL, INFO, NullHandler, getLogger
+
+from awx.commands.host import AwxHost
+
+
+class LegacyAwxHost(AwxHost):
+    """AwxHost resolving its logger by inspecting the call stack."""
+
+    @property
+    def logger(self):
+        """Return logger."""
+        return getLogger(inspect.getmodule(inspect.stack()[1][0]).__name__)
+
+
+def create_logging(host, name='host01'):
+    """Issue the log calls made by AwxHost.create."""
+    host.logger.info('Creating host %s.', name)
+    host.logger.info('Host %s successfully created!', name)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    logger = getLogger('awx')
+    logger.addHandler(NullHandler())
+
+    for level in [INFO, CRITICAL]:
+        logger.setLevel(level)
+        for host in [LegacyAwxHost(), AwxHost()]:
+            elapsed = timeit.timeit(
+                lambda: create_logging(host), number=args.calls)
+            print('%-14s level=%-8s %.2f us/call' % (
+                type(host).__name__,
+                'enabled' if level == INFO else 'disabled',
+                elapsed / args.calls * 1e6
+            ))
+
+
+if '__main__' == __name__:
+    main()
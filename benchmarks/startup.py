@@ -0,0 +1,71 @@
+"""Benchmark the cost of constructing the Awx facade.
+
+Reports the number of wrapper objects alive and the wall time taken for:
+
+* constructing Awx()
+* constructing Awx() and touching every wrapper property
+
+Run from the repository root:
+
+    $ python -m benchmarks.startup --rounds 200
+"""
+import argparse
+import gc
+import timeit
+
+from awx import Awx
+from awx.base import AwxBase
+
+WRAPPERS = [
+    'ad_hoc', 'config', 'credential', 'group', 'host', 'inventory',
+    'inventory_script', 'job', 'job_template', 'label', 'node',
+    'notification_template', 'organization', 'permission', 'project', 'role',
+    'schedule', 'setting', 'team', 'user', 'version', 'workflow',
+    'workflow_job'
+]
+
+
+def construct():
+    """Construct the facade only."""
+    return Awx(host='http://localhost', username='admin', password='admin')
+
+
+def construct_and_touch():
+    """Construct the facade and access every wrapper and its dependencies."""
+    awx = construct()
+    for name in WRAPPERS:
+        wrapper = getattr(awx, name)
+        for attr in dir(type(wrapper)):
+            if isinstance(getattr(type(wrapper), attr), property) and \
+                    attr in WRAPPERS:
+                getattr(wrapper, attr)
+    return awx
+
+
+def count_wrappers(func):
+    """Return the number of wrapper objects created by func."""
+    gc.collect()
+    before = len([o for o in gc.get_objects() if isinstance(o, AwxBase)])
+    keep = func()
+    after = len([o for o in gc.get_objects() if isinstance(o, AwxBase)])
+    del keep
+    return after - before
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=100)
+    args = parser.parse_args()
+
+    for func in [construct, construct_and_touch]:
+        elapsed = timeit.timeit(func, number=args.rounds)
+        print('%-20s objects=%-4d time=%.3f ms' % (
+            func.__name__,
+            count_wrappers(func),
+            elapsed / args.rounds * 1000
+        ))
+
+
+if '__main__' == __name__:
+    main()
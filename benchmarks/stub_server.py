@@ -0,0 +1,981 @@
+"""Local stand-in for the AWX REST API.
+
+Serves an in-memory store of AWX objects over HTTP so the awx wrappers can
+be exercised without a live AWX server. Objects are plain dicts kept per
+collection (e.g. hosts, inventories); list endpoints support exact and
+__in/__gt/__gte/__lt/__lte filters and pagination. Both the /api/v1/ and
+the /api/v2/ prefixes serve the same store.
+
+Besides the collections, the endpoints the wrappers use are answered:
+
+- nested lists, e.g. inventories/<id>/hosts/ and
+  workflow_job_templates/<id>/workflow_nodes/
+- associations, e.g. groups/<id>/hosts/, organizations/<id>/admins/,
+  users/<id>/roles/ and workflow_job_template_nodes/<id>/success_nodes/
+- object roles, created with organizations, teams, projects, inventories,
+  credentials and (workflow) job templates
+- job template and workflow launches, project updates, job cancels and
+  job standard out; jobs run for job_duration seconds, then finish with
+  the stub_status of their template, successful by default
+
+Latency, page sizes and failures are configurable:
+
+    from benchmarks.stub_server import StubServer
+
+    server = StubServer(latency=0.005, failure_rate=0.01).start()
+    server.fail('POST', 'hosts', status=500, count=2)
+    server.store.create('inventories', name='inv', organization=1)
+    awx = Awx(host=server.url, username='admin', password='admin')
+    ...
+    server.stop()
+"""
+import BaseHTTPServer
+import SocketServer
+import base64
+import json
+import random
+import socket
+import threading
+import time
+import urllib
+import urlparse
+from collections import OrderedDict
+
+API_PREFIXES = ['/api/v1/', '/api/v2/']
+
+# fields identifying an object uniquely within a collection
+UNIQUE = {
+    'hosts': ('name', 'inventory'),
+    'groups': ('name', 'inventory'),
+    'inventories': ('name', 'organization'),
+    'organizations': ('name',),
+    'projects': ('name',),
+    'job_templates': ('name',),
+    'workflow_job_templates': ('name',),
+    'teams': ('name', 'organization'),
+    'users': ('username',),
+}
+
+# roles created with the objects of a collection
+ROLES = {
+    'organizations': ('admin', 'member', 'read', 'auditor', 'execute'),
+    'teams': ('admin', 'member', 'read'),
+    'projects': ('admin', 'use', 'update', 'read'),
+    'inventories': ('admin', 'use', 'adhoc', 'update', 'read'),
+    'credentials': ('admin', 'use', 'read'),
+    'job_templates': ('admin', 'execute', 'read'),
+    'workflow_job_templates': ('admin', 'execute', 'read'),
+}
+
+# associations: (collection, relation) -> collection of the members
+ASSOCIATIONS = {
+    ('organizations', 'users'): 'users',
+    ('organizations', 'admins'): 'users',
+    ('teams', 'users'): 'users',
+    ('groups', 'hosts'): 'hosts',
+    ('groups', 'children'): 'groups',
+    ('hosts', 'groups'): 'groups',
+    ('users', 'roles'): 'roles',
+    ('teams', 'roles'): 'roles',
+    ('roles', 'users'): 'users',
+    ('roles', 'teams'): 'teams',
+    ('workflow_job_template_nodes', 'success_nodes'):
+        'workflow_job_template_nodes',
+    ('workflow_job_template_nodes', 'failure_nodes'):
+        'workflow_job_template_nodes',
+    ('workflow_job_template_nodes', 'always_nodes'):
+        'workflow_job_template_nodes',
+}
+
+# associations seen from the members
+INVERSE = {
+    ('groups', 'hosts'): 'groups',
+    ('hosts', 'groups'): 'hosts',
+    ('users', 'roles'): 'users',
+    ('teams', 'roles'): 'teams',
+    ('roles', 'users'): 'roles',
+    ('roles', 'teams'): 'roles',
+}
+
+# nested lists: (collection, relation) -> (collection, parent field)
+CHILDREN = {
+    ('inventories', 'hosts'): ('hosts', 'inventory'),
+    ('inventories', 'groups'): ('groups', 'inventory'),
+    ('job_templates', 'jobs'): ('jobs', 'job_template'),
+    ('projects', 'project_updates'): ('project_updates', 'project'),
+    ('workflow_job_templates', 'workflow_nodes'):
+        ('workflow_job_template_nodes', 'workflow_job_template'),
+    ('workflow_job_templates', 'workflow_jobs'):
+        ('workflow_jobs', 'workflow_job_template'),
+    ('workflow_jobs', 'workflow_nodes'):
+        ('workflow_job_nodes', 'workflow_job'),
+}
+
+# unified jobs, which run for a while once created
+JOBS = ('jobs', 'project_updates', 'ad_hoc_commands', 'workflow_jobs')
+FINISHED = ('successful', 'failed', 'error', 'canceled')
+
+# action endpoints listed in the related URLs of an object
+ACTIONS = dict(
+    [(c, ('launch',)) for c in ('job_templates', 'workflow_job_templates')] +
+    [(c, ('cancel', 'stdout')) for c in JOBS] +
+    [('projects', ('update', 'playbooks'))]
+)
+
+
+class StubError(Exception):
+    """Stub error class carrying an HTTP status and body."""
+
+    def __init__(self, status, body):
+        """Constructor.
+
+        :param status: HTTP status code.
+        :type status: int
+        :param body: Response body.
+        :type body: dict
+        """
+        super(StubError, self).__init__(body)
+        self.status = status
+        self.body = body
+
+
+class StubStore(object):
+    """In-memory store of AWX objects."""
+
+    def __init__(self, job_duration=0.0):
+        """Constructor.
+
+        :param job_duration: Seconds a unified job runs.
+        :type job_duration: float
+        """
+        self.collections = {}
+        self.links = {}
+        self.lock = threading.RLock()
+        self.job_duration = job_duration
+        self._next_id = 0
+        self._timers = {}
+        # unique keys and names of the objects, for constant time lookups
+        self._keys = {}
+        self._names = {}
+
+    def collection(self, name):
+        """Return the objects of a collection keyed by id.
+
+        :param name: Collection name, e.g. hosts.
+        :type name: str
+        :rtype: OrderedDict
+        """
+        return self.collections.setdefault(name, OrderedDict())
+
+    def create(self, collection, **fields):
+        """Create an object.
+
+        Objects of collections having roles get them, listed in their
+        summary fields. Unified jobs start pending and finish after the job
+        duration with their final_status field, successful by default.
+
+        :param collection: Collection name.
+        :type collection: str
+        :return: Created object.
+        :rtype: dict
+        :raises StubError: When an object with the same unique fields exists.
+        """
+        with self.lock:
+            items = self.collection(collection)
+            self._check_unique(collection, fields)
+
+            self._next_id += 1
+            pk = self._next_id
+            url = '/api/v1/%s/%d/' % (collection, pk)
+            item = dict(fields)
+            item.update(
+                id=pk,
+                url=url,
+                related=dict(
+                    (relation, '%s%s/' % (url, relation))
+                    for (parent, relation) in
+                    list(ASSOCIATIONS) + list(CHILDREN)
+                    if parent == collection
+                ),
+                summary_fields=dict(fields.get('summary_fields') or {}),
+                created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                modified='%.6f' % time.time()
+            )
+            items[pk] = item
+            self._index(collection, item)
+            for relation in ACTIONS.get(collection, ()):
+                item['related'][relation] = '%s%s/' % (url, relation)
+
+            for edge in ('success_nodes', 'failure_nodes', 'always_nodes'):
+                if (collection, edge) in ASSOCIATIONS:
+                    item[edge] = []
+
+            if collection == 'projects':
+                item.setdefault('playbooks', ['site.yml'])
+                item['status'] = 'successful'
+
+            roles = OrderedDict()
+            for name in ROLES.get(collection, ()):
+                role = self.create('roles', name=name.capitalize(),
+                                   resource_type=collection[:-1],
+                                   resource=pk)
+                roles['%s_role' % name] = dict(id=role['id'],
+                                               name=role['name'])
+            if roles:
+                item['summary_fields']['object_roles'] = roles
+
+            if collection in JOBS:
+                final = item.pop('final_status', 'successful')
+                item.update(status='pending', failed=False, started=None,
+                            finished=None, elapsed=0.0)
+                now = time.time()
+                self._timers[(collection, pk)] = (
+                    now, now + self.job_duration, final
+                )
+                self.refresh(collection, item)
+            return item
+
+    def update(self, collection, pk, fields):
+        """Update an object.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param pk: Object id.
+        :type pk: int
+        :param fields: Changed fields.
+        :type fields: dict
+        :return: Object.
+        :rtype: dict
+        :raises StubError: When another object has the same unique fields.
+        """
+        with self.lock:
+            item = self.get(collection, pk)
+            changed = dict(item, **fields)
+            if self._key(collection, changed) != self._key(collection, item):
+                self._check_unique(collection, changed)
+            self._index(collection, item, remove=True)
+            item.update(fields, modified='%.6f' % time.time())
+            self._index(collection, item)
+            return item
+
+    @staticmethod
+    def _key(collection, fields):
+        """Return the unique key of an object, None when it has none.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param fields: Object fields.
+        :type fields: dict
+        :rtype: tuple
+        """
+        unique = UNIQUE.get(collection)
+        if unique:
+            return tuple(str(fields.get(field)) for field in unique)
+
+    def _check_unique(self, collection, fields):
+        """Refuse an object with the unique fields of an existing one.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param fields: Object fields.
+        :type fields: dict
+        :raises StubError: When an object with the same unique fields
+            exists.
+        """
+        key = self._key(collection, fields)
+        if key is not None and key in self._keys.get(collection, {}):
+            raise StubError(400, {
+                '__all__': ['%s with this %s already exists.' % (
+                    collection, ' and '.join(UNIQUE[collection]))]
+            })
+
+    def _index(self, collection, item, remove=False):
+        """Add an object to the unique key and name indexes.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param item: Object.
+        :type item: dict
+        :param remove: Remove the object from the indexes instead.
+        :type remove: bool
+        """
+        key = self._key(collection, item)
+        keys = self._keys.setdefault(collection, {})
+        names = self._names.setdefault(collection, {}).setdefault(
+            str(item.get(UNIQUE.get(collection, ('name',))[0])), set())
+        if remove:
+            keys.pop(key, None)
+            names.discard(item['id'])
+        else:
+            if key is not None:
+                keys[key] = item['id']
+            names.add(item['id'])
+
+    def refresh(self, collection, item):
+        """Advance the status of a unified job with time.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param item: Object.
+        :type item: dict
+        """
+        timer = self._timers.get((collection, item['id']))
+        if timer is None or item['status'] in FINISHED:
+            return
+
+        started, finishes, final = timer
+        now = time.time()
+        if now >= finishes:
+            item.update(status=final, failed=final != 'successful',
+                        started=started, finished=finishes,
+                        elapsed=finishes - started)
+        else:
+            item.update(status='running', started=started,
+                        elapsed=now - started)
+
+    def progress(self, collection, item):
+        """Return the part of a unified job done, between 0 and 1.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param item: Object.
+        :type item: dict
+        :rtype: float
+        """
+        self.refresh(collection, item)
+        timer = self._timers.get((collection, item['id']))
+        if timer is None or item['status'] in FINISHED:
+            return 1.0
+        started, finishes, _ = timer
+        return min(1.0, (time.time() - started) / (finishes - started))
+
+    def get(self, collection, pk):
+        """Return an object.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param pk: Object id.
+        :type pk: int
+        :rtype: dict
+        :raises StubError: When the object does not exist.
+        """
+        try:
+            item = self.collection(collection)[int(pk)]
+        except (KeyError, ValueError):
+            raise StubError(404, {'detail': 'Not found.'})
+        self.refresh(collection, item)
+        return item
+
+    def delete(self, collection, pk):
+        """Delete an object and its associations.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param pk: Object id.
+        :type pk: int
+        """
+        with self.lock:
+            self.get(collection, pk)
+            pk = int(pk)
+            self._index(collection, self.collection(collection)[pk],
+                        remove=True)
+            del self.collection(collection)[pk]
+
+            for key in list(self.links):
+                parent, parent_pk, relation = key
+                if parent == collection and parent_pk == pk:
+                    del self.links[key]
+                elif ASSOCIATIONS.get((parent, relation)) == collection and \
+                        pk in self.links[key]:
+                    self.links[key].remove(pk)
+                    item = self.collection(parent).get(parent_pk)
+                    if item is not None and relation in item:
+                        item[relation] = list(self.links[key])
+
+    def members(self, collection, pk, relation):
+        """Return the ids associated with an object.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param pk: Object id.
+        :type pk: int
+        :param relation: Relation name, e.g. hosts.
+        :type relation: str
+        :rtype: list
+        """
+        return self.links.setdefault((collection, int(pk), relation), [])
+
+    def associate(self, collection, pk, relation, other, disassociate=False):
+        """Associate or disassociate two objects.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param pk: Object id.
+        :type pk: int
+        :param relation: Relation name, e.g. hosts.
+        :type relation: str
+        :param other: Id of the associated object.
+        :type other: int
+        :param disassociate: Remove the association instead.
+        :type disassociate: bool
+        """
+        with self.lock:
+            item = self.get(collection, pk)
+            self.get(ASSOCIATIONS[(collection, relation)], other)
+
+            pairs = [(collection, int(pk), relation, int(other))]
+            inverse = INVERSE.get((collection, relation))
+            if inverse:
+                pairs.append((ASSOCIATIONS[(collection, relation)],
+                              int(other), inverse, int(pk)))
+
+            for parent, parent_pk, name, member in pairs:
+                members = self.members(parent, parent_pk, name)
+                if disassociate and member in members:
+                    members.remove(member)
+                elif not disassociate and member not in members:
+                    members.append(member)
+
+            if relation in item:
+                item[relation] = list(self.members(collection, pk, relation))
+
+    @staticmethod
+    def matches(item, field, value):
+        """Return whether an object matches a query string filter.
+
+        :param item: Object.
+        :type item: dict
+        :param field: Filter, e.g. name or id__in.
+        :type field: str
+        :param value: Filter value.
+        :type value: str
+        :rtype: bool
+        """
+        name, _, op = field.partition('__')
+        actual = item.get(name)
+        if op == 'in':
+            return str(actual) in value.split(',')
+        if op in ('gt', 'gte', 'lt', 'lte'):
+            if actual is None:
+                return False
+            try:
+                actual, value = float(actual), float(value)
+            except ValueError:
+                actual = str(actual)
+            return dict(
+                gt=actual > value, gte=actual >= value,
+                lt=actual < value, lte=actual <= value
+            )[op]
+        return str(actual) == value or \
+            (isinstance(actual, bool) and str(actual).lower() == value)
+
+    def query(self, collection, params, items=None, page_size=25,
+              max_page_size=200):
+        """Return a page of objects matching the query string parameters.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param params: Query string parameters.
+        :type params: dict
+        :param items: Objects to filter, defaults to the whole collection.
+        :type items: list
+        :param page_size: Page size when the request does not give one.
+        :type page_size: int
+        :param max_page_size: Largest page size served.
+        :type max_page_size: int
+        :return: Page in the AWX list format.
+        :rtype: dict
+        """
+        query = dict(params)
+        params = dict(params)
+        page = int(params.pop('page', 1))
+        page_size = min(int(params.pop('page_size', page_size)),
+                        max_page_size)
+        order_by = params.pop('order_by', None)
+
+        # output options of list endpoints, not filters
+        for option in ('format', 'content_encoding', 'content_format'):
+            params.pop(option, None)
+
+        with self.lock:
+            # exact name filters use the name index
+            field = UNIQUE.get(collection, ('name',))[0]
+            if items is None and field in params:
+                objects = self.collection(collection)
+                items = [objects[pk] for pk in sorted(
+                    self._names.get(collection, {}).get(params[field], ()))]
+            elif items is None:
+                items = list(self.collection(collection).values())
+            for item in items:
+                self.refresh(collection, item)
+            for field, value in params.items():
+                items = [i for i in items if self.matches(i, field, value)]
+
+        if order_by:
+            reverse = order_by.startswith('-')
+            items.sort(key=lambda i: i.get(order_by.lstrip('-')),
+                       reverse=reverse)
+
+        # like AWX, page links keep the filters of the request
+        def link(number):
+            return '?' + urllib.urlencode(
+                sorted(dict(query, page=number).items())
+            )
+
+        start = (page - 1) * page_size
+        return {
+            'count': len(items),
+            'next': link(page + 1)
+            if start + page_size < len(items) else None,
+            'previous': link(page - 1) if page > 1 else None,
+            'results': items[start:start + page_size]
+        }
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Request handler serving the stub store."""
+
+    protocol_version = 'HTTP/1.1'
+
+    # send each response in one packet, small writes on a keep-alive
+    # connection otherwise stall on delayed acknowledgements
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        """Silence request logging."""
+
+    def _route(self, method):
+        """Dispatch a request and write the response."""
+        self.server.count(method)
+        if self.server.latency or self.server.jitter:
+            time.sleep(self.server.latency +
+                       random.uniform(0, self.server.jitter))
+
+        url = urlparse.urlparse(self.path)
+        params = dict(urlparse.parse_qsl(url.query))
+        path = url.path
+        for prefix in API_PREFIXES:
+            if path.startswith(prefix):
+                path = path[len(prefix):]
+                break
+        parts = [p for p in path.split('/') if p]
+
+        body = None
+        length = int(self.headers.getheader('content-length') or 0)
+        if length:
+            body = json.loads(self.rfile.read(length) or 'null')
+
+        try:
+            self.server.inject(method, parts)
+            status, payload = self.server.dispatch(method, parts, params,
+                                                   body or {})
+        except StubError as ex:
+            status, payload = ex.status, ex.body
+
+        data = json.dumps(payload) if payload is not None else ''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        """Handle GET requests."""
+        self._route('GET')
+
+    def do_OPTIONS(self):
+        """Handle OPTIONS requests."""
+        self._route('OPTIONS')
+
+    def do_POST(self):
+        """Handle POST requests."""
+        self._route('POST')
+
+    def do_PATCH(self):
+        """Handle PATCH requests."""
+        self._route('PATCH')
+
+    def do_PUT(self):
+        """Handle PUT requests."""
+        self._route('PUT')
+
+    def do_DELETE(self):
+        """Handle DELETE requests."""
+        self._route('DELETE')
+
+
+class StubServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Threaded HTTP server answering like AWX from an in-memory store."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, page_size=25,
+                 max_page_size=200, failure_rate=0.0, failure_status=503,
+                 job_duration=0.0, stdout_lines=100, seed=None):
+        """Constructor.
+
+        :param port: Port to listen on, 0 picks a free one.
+        :type port: int
+        :param latency: Seconds added to every response.
+        :type latency: float
+        :param jitter: Maximum random seconds added on top of the latency.
+        :type jitter: float
+        :param page_size: Page size of list endpoints when the request does
+            not give one.
+        :type page_size: int
+        :param max_page_size: Largest page size served.
+        :type max_page_size: int
+        :param failure_rate: Share of requests failing at random.
+        :type failure_rate: float
+        :param failure_status: HTTP status of random failures.
+        :type failure_status: int
+        :param job_duration: Seconds a unified job runs.
+        :type job_duration: float
+        :param stdout_lines: Number of standard out lines of a job.
+        :type stdout_lines: int
+        :param seed: Seed of the random failures and jitter, for
+            reproducible runs.
+        :type seed: int
+        """
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('127.0.0.1', port), StubHandler
+        )
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.stdout_lines = stdout_lines
+        self.store = StubStore(job_duration=job_duration)
+        self.requests = {}
+        self.failures = 0
+        self._rules = []
+        self._random = random.Random(seed)
+        self._counter_lock = threading.Lock()
+        self._connections = set()
+        self._thread = None
+
+    @property
+    def url(self):
+        """Return the base URL of the server."""
+        return 'http://%s:%d' % self.server_address
+
+    @property
+    def request_count(self):
+        """Return the number of requests served."""
+        return sum(self.requests.values())
+
+    def count(self, method):
+        """Count a served request.
+
+        :param method: HTTP method.
+        :type method: str
+        """
+        with self._counter_lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+
+    def reset_counters(self):
+        """Reset the request and failure counters."""
+        with self._counter_lock:
+            self.requests = {}
+            self.failures = 0
+
+    def fail(self, method, path, status=500, count=1, body=None):
+        """Fail the next requests matching a method and path.
+
+        :param method: HTTP method, None for any.
+        :type method: str
+        :param path: Start of the path after the version prefix, e.g.
+            hosts or job_templates/3/launch.
+        :type path: str
+        :param status: HTTP status answered.
+        :type status: int
+        :param count: Number of requests failing, None for every request.
+        :type count: int
+        :param body: Response body.
+        :type body: dict
+        """
+        with self._counter_lock:
+            self._rules.append(dict(
+                method=method, parts=[p for p in path.split('/') if p],
+                status=status, count=count,
+                body=body or {'detail': 'Injected failure.'}
+            ))
+
+    def inject(self, method, parts):
+        """Fail a request when a failure rule or the failure rate says so.
+
+        :param method: HTTP method.
+        :type method: str
+        :param parts: API path segments after the version prefix.
+        :type parts: list
+        :raises StubError: When the request fails.
+        """
+        with self._counter_lock:
+            for rule in self._rules:
+                if rule['method'] not in (None, method) or \
+                        parts[:len(rule['parts'])] != rule['parts']:
+                    continue
+                if rule['count'] is not None:
+                    rule['count'] -= 1
+                    if not rule['count']:
+                        self._rules.remove(rule)
+                self.failures += 1
+                raise StubError(rule['status'], rule['body'])
+
+            if self.failure_rate and \
+                    self._random.random() < self.failure_rate:
+                self.failures += 1
+                raise StubError(self.failure_status,
+                                {'detail': 'Injected failure.'})
+
+    def start(self):
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and close the kept alive connections."""
+        self.shutdown()
+        self.server_close()
+        with self._counter_lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def get_request(self):
+        """Accept a connection, remembering it until it is closed."""
+        connection, address = self.socket.accept()
+        with self._counter_lock:
+            self._connections.add(connection)
+        return connection, address
+
+    def shutdown_request(self, request):
+        """Close a connection."""
+        with self._counter_lock:
+            self._connections.discard(request)
+        BaseHTTPServer.HTTPServer.shutdown_request(self, request)
+
+    def query(self, collection, params, items=None):
+        """Return a page of objects, see StubStore.query.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param params: Query string parameters.
+        :type params: dict
+        :param items: Objects to filter, defaults to the whole collection.
+        :type items: list
+        :rtype: dict
+        """
+        return self.store.query(collection, params, items, self.page_size,
+                                self.max_page_size)
+
+    def dispatch(self, method, parts, params, body):
+        """Answer a request.
+
+        :param method: HTTP method.
+        :type method: str
+        :param parts: API path segments after the version prefix.
+        :type parts: list
+        :param params: Query string parameters.
+        :type params: dict
+        :param body: Decoded JSON request body.
+        :type body: dict
+        :return: HTTP status and response payload.
+        :rtype: tuple
+        """
+        if not parts:
+            return 200, dict(
+                (name, '/api/v1/%s/' % name)
+                for name in sorted(set(self.store.collections) |
+                                   set(ROLES) | set(JOBS))
+            )
+
+        collection = parts[0]
+        if collection in ('config', 'ping', 'me'):
+            return 200, dict(version='1.0.1', ansible_version='2.4',
+                             ha=False, instances=[])
+
+        if len(parts) == 1:
+            if method == 'GET':
+                return 200, self.query(collection, params)
+            if method == 'OPTIONS':
+                return 200, dict(actions=dict(POST=dict(
+                    organization=dict(type='field'))))
+            if method == 'POST':
+                return 201, self.store.create(collection, **body)
+        elif len(parts) == 2:
+            if method == 'GET':
+                return 200, self.store.get(collection, parts[1])
+            if method in ('PATCH', 'PUT'):
+                return 200, self.store.update(collection, parts[1], body)
+            if method == 'DELETE':
+                self.store.delete(collection, parts[1])
+                return 204, None
+        elif len(parts) == 3:
+            return self.dispatch_nested(method, parts, params, body)
+
+        raise StubError(405, {'detail': 'Method not allowed.'})
+
+    def dispatch_nested(self, method, parts, params, body):
+        """Answer a request on a nested endpoint of an object.
+
+        :param method: HTTP method.
+        :type method: str
+        :param parts: Collection, object id and relation.
+        :type parts: list
+        :param params: Query string parameters.
+        :type params: dict
+        :param body: Decoded JSON request body.
+        :type body: dict
+        :return: HTTP status and response payload.
+        :rtype: tuple
+        """
+        collection, pk, relation = parts
+        item = self.store.get(collection, pk)
+        key = (collection, relation)
+
+        if key in ASSOCIATIONS:
+            members = ASSOCIATIONS[key]
+            if method == 'GET':
+                return 200, self.query(members, params, [
+                    self.store.get(members, other) for other in
+                    self.store.members(collection, pk, relation)
+                ])
+            if method == 'POST':
+                # posting an object without id creates the member first
+                if 'id' not in body:
+                    body = dict(id=self.store.create(members, **body)['id'])
+                self.store.associate(collection, pk, relation, body['id'],
+                                     bool(body.get('disassociate')))
+                return 204, None
+
+        elif key in CHILDREN:
+            children, field = CHILDREN[key]
+            if method == 'GET':
+                items = [i for i in self.store.collection(children).values()
+                         if i.get(field) == item['id']]
+                return 200, self.query(children, params, items)
+            if method == 'POST':
+                return 201, self.store.create(children, **dict(
+                    body, **{field: item['id']}))
+
+        elif relation == 'playbooks' and method == 'GET':
+            return 200, item.get('playbooks', [])
+
+        elif relation == 'launch':
+            if method == 'GET':
+                return 200, dict(passwords_needed_to_start=[],
+                                 can_start_without_user_input=True,
+                                 variables_needed_to_start=[])
+            if method == 'POST':
+                return 201, self.launch(collection, item, body)
+
+        elif relation == 'update' and collection == 'projects':
+            if method == 'GET':
+                return 200, dict(can_update=True)
+            if method == 'POST':
+                update = self.store.create('project_updates', project=item[
+                    'id'], name=item['name'])
+                item['related']['last_update'] = update['url']
+                return 202, dict(project_update=update['id'],
+                                 id=update['id'])
+
+        elif relation == 'cancel' and collection in JOBS:
+            if method == 'GET':
+                return 200, dict(can_cancel=item['status'] not in FINISHED)
+            if method == 'POST':
+                if item['status'] not in FINISHED:
+                    item.update(status='canceled', failed=True,
+                                finished=time.time())
+                return 202, None
+
+        elif relation == 'stdout' and collection in JOBS:
+            return 200, self.stdout(collection, item, params)
+
+        raise StubError(404, {'detail': 'Not found.'})
+
+    def launch(self, collection, template, body):
+        """Launch a job or a workflow job from its template.
+
+        :param collection: job_templates or workflow_job_templates.
+        :type collection: str
+        :param template: Template object.
+        :type template: dict
+        :param body: Launch request body.
+        :type body: dict
+        :return: Launch response.
+        :rtype: dict
+        """
+        fields = dict(
+            name=template['name'],
+            extra_vars=body.get('extra_vars', ''),
+            job_explanation=body.get('job_explanation', ''),
+            final_status=template.get('stub_status', 'successful')
+        )
+
+        if collection == 'job_templates':
+            job = self.store.create('jobs', job_template=template['id'],
+                                    unified_job_template=template['id'],
+                                    **fields)
+            return dict(job=job['id'], id=job['id'], ignored_fields={})
+
+        job = self.store.create('workflow_jobs',
+                                workflow_job_template=template['id'],
+                                unified_job_template=template['id'],
+                                **fields)
+        for node in list(self.store.collection(
+                'workflow_job_template_nodes').values()):
+            if node.get('workflow_job_template') != template['id']:
+                continue
+            try:
+                unified = self.store.get('job_templates',
+                                         node['unified_job_template'])
+            except (KeyError, StubError):
+                continue
+            child = self.store.create(
+                'jobs', name=unified['name'], job_template=unified['id'],
+                unified_job_template=unified['id'],
+                final_status=unified.get('stub_status', 'successful')
+            )
+            self.store.create(
+                'workflow_job_nodes', workflow_job=job['id'],
+                unified_job_template=unified['id'], job=child['id'],
+                summary_fields=dict(job=dict(
+                    id=child['id'], name=child['name'],
+                    status=child['status'], failed=child['failed']))
+            )
+        return dict(workflow_job=job['id'], id=job['id'], ignored_fields={})
+
+    def stdout(self, collection, job, params):
+        """Return the standard out of a unified job.
+
+        Lines appear as the job runs, all of them once it finished.
+
+        :param collection: Unified job collection.
+        :type collection: str
+        :param job: Unified job object.
+        :type job: dict
+        :param params: Query string parameters.
+        :type params: dict
+        :return: Standard out in the AWX json format.
+        :rtype: dict
+        """
+        total = int(self.stdout_lines * self.store.progress(collection, job))
+        start = min(int(params.get('start_line') or 0), total)
+        end = min(int(params.get('end_line') or total), total)
+        content = ''.join('%s line %d\n' % (job['name'], line)
+                          for line in range(start, end))
+
+        if params.get('content_encoding') == 'base64':
+            content = base64.b64encode(content)
+        return dict(range=dict(start=start, end=end, absolute_end=total),
+                    content=content)
@@ -0,0 +1,402 @@
+"""Benchmark the hot paths of the Awx client against the local stub server.
+
+Runs each scenario below at every scale, the number of hosts in the
+benchmarked inventory, and reports latency percentiles, requests served
+per operation and peak RSS:
+
+* construct: Awx() construction
+* lookup: host name lookup through AwxHost.get
+* host_create: AwxHost.create
+* host_bulk: AwxHost.bulk_create of a few hosts
+* playbooks: AwxProject.playbooks
+* launch_monitor: AwxJob.launch followed by AwxJob.monitor
+* demo_go: demo.Run.go end to end
+
+The stub server runs in this process and every scenario runs in a fresh
+worker process, so its peak RSS is the client's alone. Results are written
+to a JSON file and compared with an earlier one to spot regressions:
+
+    $ python -m benchmarks.suite --scale 10 1000 50000 --output base.json
+    $ git checkout feature
+    $ python -m benchmarks.suite --scale 10 1000 50000 --compare base.json
+
+Run from the repository root.
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREDENTIALS = dict(username='admin', password='admin', verbose=0)
+
+
+def construct(awx, context, index):
+    """Construct the facade."""
+    from awx import Awx
+    Awx(host=context['url'], **CREDENTIALS)
+
+
+def lookup(awx, context, index):
+    """Look a host up by name, spread over the inventory."""
+    number = index * 7919 % context['scale']
+    awx.host.get('bench-host%06d' % number, context['inventory'])
+
+
+def host_create(awx, context, index):
+    """Create a host in the benchmarked inventory."""
+    awx.host.create('bench-new%06d' % index, context['inventory'],
+                    variables={'bench': True})
+
+
+def host_bulk(awx, context, index):
+    """Create a few hosts at once, the common size of a bulk call."""
+    awx.host.bulk_create(context['inventory'], [
+        'bench-bulk%06d-%d' % (index, number) for number in range(3)
+    ])
+
+
+def playbooks(awx, context, index):
+    """Fetch the playbooks of every project."""
+    awx.project.playbooks
+
+
+def launch_monitor(awx, context, index):
+    """Launch a job and follow it until it finishes."""
+    job = awx.job.launch(context['job_template'], 'benchmark')
+    awx.job.monitor(job['id'], interval=context['interval'])
+
+
+def demo_go(awx, context, index):
+    """Run a demo descriptor end to end."""
+    from demo import Run
+    Run(copy.deepcopy(context['descriptor']), awx=awx).go()
+
+
+SCENARIOS = OrderedDict([
+    ('construct', construct),
+    ('lookup', lookup),
+    ('host_create', host_create),
+    ('host_bulk', host_bulk),
+    ('playbooks', playbooks),
+    ('launch_monitor', launch_monitor),
+    ('demo_go', demo_go),
+])
+
+
+def seed(server, scale, projects, interval):
+    """Create the objects the scenarios use in the stub store.
+
+    :param server: Stub server.
+    :type server: StubServer
+    :param scale: Number of hosts in the benchmarked inventory.
+    :type scale: int
+    :param projects: Number of projects.
+    :type projects: int
+    :param interval: Seconds between job status polls.
+    :type interval: float
+    :return: Context handed to the scenarios.
+    :rtype: dict
+    """
+    store = server.store
+    org = store.create('organizations', name='Carbon')
+    inventory = store.create('inventories', name='bench',
+                             organization=org['id'])
+    for number in range(scale):
+        store.create('hosts', name='bench-host%06d' % number,
+                     inventory=inventory['id'], variables='{}')
+
+    project = None
+    for number in range(projects):
+        project = store.create('projects', name='bench-project%03d' % number,
+                               organization=org['id'])
+    store.create('job_templates', name='bench', inventory=inventory['id'],
+                 project=project and project['id'], playbook='site.yml')
+
+    # the ssh key is only read, never used
+    key = tempfile.NamedTemporaryFile(prefix='bench-key', delete=False)
+    key.close()
+    tasks = [dict(name='task%d' % number, description='Task %d' % number,
+                  hosts='web' if number % 2 else 'db',
+                  scm=dict(url='https://example.com/bench.git'))
+             for number in range(4)]
+    hosts = [dict(name=group, host='%s.example.com' % group,
+                  ansible_vars=dict(ansible_user='root',
+                                    ansible_ssh_private_key_file=key.name))
+             for group in ('web', 'db')]
+    descriptor = dict(provision=hosts, orchestrate=tasks)
+
+    return dict(url=server.url, scale=scale, inventory='bench',
+                job_template='bench', interval=interval,
+                descriptor=descriptor, key=key.name)
+
+
+def percentile(values, percent):
+    """Return the nearest rank percentile of sorted values.
+
+    :param values: Sorted values.
+    :type values: list
+    :param percent: Percentile, between 0 and 100.
+    :type percent: float
+    :rtype: float
+    """
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in kB.
+
+    ru_maxrss survives exec on Linux and so would count the memory of the
+    suite process forking the worker, the high water mark of the process
+    memory does not.
+    """
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def work(name, context, ops, output):
+    """Run the operations of a scenario and write their timings.
+
+    :param name: Scenario name.
+    :type name: str
+    :param context: Context returned by seed.
+    :type context: dict
+    :param ops: Number of operations.
+    :type ops: int
+    :param output: Path of the JSON file written.
+    :type output: str
+    """
+    from awx import Awx
+    awx = Awx(host=context['url'], **CREDENTIALS)
+    scenario = SCENARIOS[name]
+    latencies = []
+    errors = []
+
+    for index in range(ops):
+        start = time.time()
+        try:
+            scenario(awx, context, index)
+        except Exception as ex:
+            errors.append('%s: %s' % (type(ex).__name__, ex))
+            continue
+        latencies.append(time.time() - start)
+
+    with open(output, 'w') as fh:
+        json.dump(dict(
+            latencies=latencies,
+            errors=errors,
+            peak_rss_kb=peak_rss()
+        ), fh)
+
+
+def measure(server, name, context, ops):
+    """Run a scenario in a worker process.
+
+    :param server: Stub server the worker talks to.
+    :type server: StubServer
+    :param name: Scenario name.
+    :type name: str
+    :param context: Context returned by seed.
+    :type context: dict
+    :param ops: Number of operations.
+    :type ops: int
+    :return: Result with latency percentiles in milliseconds, requests
+        per operation and peak RSS.
+    :rtype: dict
+    """
+    fd, output = tempfile.mkstemp(prefix='bench-', suffix='.json')
+    os.close(fd)
+    server.reset_counters()
+
+    # scenarios echo job output and log, keep both off the report
+    with open(os.devnull, 'w') as devnull:
+        worker = subprocess.Popen([
+            sys.executable, '-m', 'benchmarks.suite', '--worker', name,
+            '--context', json.dumps(context), '--ops', str(ops),
+            '--output', output
+        ], cwd=ROOT, stdout=devnull, stderr=subprocess.PIPE)
+        _, log = worker.communicate()
+    if worker.returncode:
+        raise Exception('Scenario %s failed:\n%s' % (
+            name, '\n'.join(log.splitlines()[-20:])))
+
+    with open(output) as fh:
+        data = json.load(fh)
+    os.remove(output)
+
+    latencies = sorted(t * 1000 for t in data['latencies'])
+    return OrderedDict([
+        ('scenario', name),
+        ('scale', context['scale']),
+        ('ops', ops),
+        ('errors', len(data['errors'])),
+        ('error', data['errors'][0] if data['errors'] else None),
+        ('mean_ms', sum(latencies) / len(latencies) if latencies else None),
+        ('p50_ms', percentile(latencies, 50)),
+        ('p90_ms', percentile(latencies, 90)),
+        ('p99_ms', percentile(latencies, 99)),
+        ('max_ms', latencies[-1] if latencies else None),
+        ('requests_per_op', float(server.request_count) / ops),
+        ('requests', dict(server.requests)),
+        ('peak_rss_kb', data['peak_rss_kb']),
+    ])
+
+
+def commit():
+    """Return the checked out commit, None outside of a git tree."""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                stderr=devnull
+            ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(result):
+    """Print a result line."""
+    if result['p50_ms'] is None:
+        print('%-15s %6d  all %d operations failed: %s' % (
+            result['scenario'], result['scale'], result['ops'],
+            result['error']))
+        return
+
+    print('%-15s %6d %9.2f %9.2f %9.2f %8.2f %8.1f %4d' % (
+        result['scenario'], result['scale'], result['p50_ms'],
+        result['p90_ms'], result['p99_ms'], result['requests_per_op'],
+        result['peak_rss_kb'] / 1024.0, result['errors']))
+
+
+def compare(baseline, current, threshold):
+    """Print the changes between two runs.
+
+    A median latency, requests per operation or peak RSS growing by more
+    than the threshold is a regression. The p99 latency is shown only, with
+    few operations it is the slowest one and too noisy to judge.
+
+    :param baseline: Earlier results.
+    :type baseline: dict
+    :param current: Current results.
+    :type current: dict
+    :param threshold: Relative growth tolerated, e.g. 0.1 for 10%.
+    :type threshold: float
+    :return: Number of regressions.
+    :rtype: int
+    """
+    metrics = ('p50_ms', 'p99_ms', 'requests_per_op', 'peak_rss_kb')
+    judged = ('p50_ms', 'requests_per_op', 'peak_rss_kb')
+    before = dict(((r['scenario'], r['scale']), r)
+                  for r in baseline['results'])
+    regressions = 0
+
+    print('\nCompared with %s (%s):' % (
+        baseline.get('commit'), baseline.get('created')))
+    if baseline.get('options') != current.get('options'):
+        # e.g. fewer operations hit the lookup cache less often
+        print('Warning: options differ, %s against %s.' % (
+            current.get('options'), baseline.get('options')))
+    print('%-15s %6s %9s %9s %9s %9s' % (
+        'scenario', 'scale', 'p50', 'p99', 'req/op', 'rss'))
+    for result in current['results']:
+        old = before.get((result['scenario'], result['scale']))
+        if old is None:
+            continue
+
+        changes = []
+        flagged = False
+        for metric in metrics:
+            if not old[metric] or result[metric] is None:
+                changes.append('%9s' % '-')
+                continue
+            change = float(result[metric]) / old[metric] - 1
+            changes.append('%+8.1f%%' % (change * 100))
+            flagged = flagged or metric in judged and change > threshold
+        regressions += flagged
+
+        print('%-15s %6d %s%s' % (result['scenario'], result['scale'],
+                                  ' '.join(changes),
+                                  '  REGRESSION' if flagged else ''))
+    return regressions
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[10, 1000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS),
+                        default=list(SCENARIOS))
+    parser.add_argument('--ops', type=int, default=20)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.002)
+    parser.add_argument('--job-duration', type=float, default=0.2)
+    parser.add_argument('--interval', type=float, default=0.1)
+    parser.add_argument('--output', help='JSON file the results go to')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='JSON file of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--context', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        work(args.worker, json.loads(args.context), args.ops, args.output)
+        return
+
+    from benchmarks.stub_server import StubServer
+
+    results = dict(
+        commit=commit(),
+        created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        python=platform.python_version(),
+        options=dict(ops=args.ops, projects=args.projects,
+                     latency=args.latency, job_duration=args.job_duration,
+                     interval=args.interval),
+        results=[]
+    )
+
+    print('%-15s %6s %9s %9s %9s %8s %8s %4s' % (
+        'scenario', 'scale', 'p50 ms', 'p90 ms', 'p99 ms', 'req/op',
+        'rss MB', 'err'))
+    for scale in args.scale:
+        server = StubServer(latency=args.latency,
+                            job_duration=args.job_duration).start()
+        context = seed(server, scale, args.projects, args.interval)
+        try:
+            for name in args.scenarios:
+                result = measure(server, name, context, args.ops)
+                results['results'].append(result)
+                report(result)
+        finally:
+            server.stop()
+            os.remove(context['key'])
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            if compare(json.load(fh), results, args.threshold):
+                sys.exit(1)
+
+
+if '__main__' == __name__:
+    main()
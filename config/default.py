@@ -1,45 +1,52 @@
 """Configure Ansible AWX static configuration.
 
-This script is to be run one time only to pre configure the server for future
-automated use. This will require ADMINISTRATOR access to your AWX server.
-Please make sure your /etc/tower/tower_cli.cfg has the admin authentication
-details before running. If they do not, you may get privilege failures.
+This script brings the server in line with the desired state below, it can be
+run again after editing it: only the differences are applied. This will require
+ADMINISTRATOR access to your AWX server. Please make sure your
+/etc/tower/tower_cli.cfg has the admin authentication details before running.
+If they do not, you may get privilege failures.
 
 Before running, update the organizations and users based on your needs.
 """
-from awx import Awx
+import sys
 
-ORGANIZATIONS = [
-    {
-        'name': 'Carbon',
-        'description': 'Carbon Organization'
-    }
-]
+from awx import Awx
+from awx.apply import AwxApply
 
-USERS = [
-    {
-        'first_name': 'Carbon',
-        'last_name': 'Normal',
-        'organization': 'Carbon',
-        'email': 'carbon@carbon.com',
-        'username': 'carbon',
-        'password': 'password',
-        'system_admin': False,
-        'system_auditor': False,
-        'organization_admin': True
-    },
-    {
-        'first_name': 'Carbon',
-        'last_name': 'Auditor',
-        'organization': 'Carbon',
-        'email': 'carbon-auditor@carbon.com',
-        'username': 'carbon-auditor',
-        'password': 'password',
-        'system_admin': False,
-        'system_auditor': True,
-        'organization_admin': False
-    }
-]
+STATE = {
+    'organizations': [
+        {
+            'name': 'Carbon',
+            'description': 'Carbon Organization'
+        }
+    ],
+    'users': [
+        {
+            'first_name': 'Carbon',
+            'last_name': 'Normal',
+            'email': 'carbon@carbon.com',
+            'username': 'carbon',
+            'password': 'password',
+            'is_superuser': False,
+            'is_system_auditor': False,
+            'organizations': ['Carbon'],
+            'admin_of': ['Carbon']
+        },
+        {
+            'first_name': 'Carbon',
+            'last_name': 'Auditor',
+            'email': 'carbon-auditor@carbon.com',
+            'username': 'carbon-auditor',
+            'password': 'password',
+            'is_superuser': False,
+            'is_system_auditor': True,
+            'organizations': ['Carbon'],
+            'admin_of': []
+        }
+    ],
+    'teams': [],
+    'roles': []
+}
 
 
 def main():
@@ -48,49 +55,19 @@ def main():
     Primary purpose is to configure AWX server with config information such as:
         - organizations
         - users
+        - teams
+        - roles
     """
     # create awx object
     awx = Awx()
 
-    # create organizations
-    for item in ORGANIZATIONS:
-        try:
-            awx.organization.create(
-                name=item['name'],
-                description=item['description']
-            )
-        except Exception:
-            awx.logger.warn('Skip creating organization..')
-
-    # create users
-    for item in USERS:
-        try:
-            # create
-            awx.user.create(
-                name=item['username'],
-                password=item['password'],
-                email=item['email'],
-                first_name=item['first_name'],
-                last_name=item['last_name'],
-                superuser=item['system_admin'],
-                system_auditor=item['system_auditor']
-            )
-
-            # associate user to their organization
-            awx.organization.associate(
-                name=item['username'],
-                organization=item['organization']
-            )
+    report = AwxApply(awx).apply(STATE)
+    for change in report['changes']:
+        awx.logger.info('%s %s %s: %s', change['action'], change['kind'],
+                        change['name'], change['status'])
 
-            # associate user with admin privilege to organization
-            if item['organization_admin']:
-                # admin privilege
-                awx.organization.associate_admin(
-                    name=item['username'],
-                    organization=item['organization']
-                )
-        except Exception:
-            awx.logger.warn('Skip creating user..')
+    if report['failed']:
+        sys.exit(1)
 
 
 if '__main__' == __name__:
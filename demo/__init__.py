@@ -1,27 +1,99 @@
-import time
+import re
 import uuid
+from collections import OrderedDict
+from functools import partial
 
 from awx import Awx
+from awx.dag import DagExecutor, TaskGraph
 
 
 class Run(object):
 
     __organization__ = 'Carbon'
 
-    def __init__(self, input_config):
+    def __init__(self, input_config, concurrency=4, awx=None):
         self.hosts = input_config['provision']
         self.orchestrate = input_config['orchestrate']
         self.rid = uuid.uuid4().hex[:4]
+        self.concurrency = concurrency
 
         self.inventory = 'inventory_%s' % self.rid
         self.project = 'project_%s' % self.rid
 
-        self.awx = Awx()
+        self.awx = awx or Awx()
 
     @property
     def organization(self):
         return self.__organization__
 
+    @staticmethod
+    def _split(value):
+        return [v for v in re.split(r'[,\s]+', value or '') if v]
+
+    @staticmethod
+    def _project_name(url):
+        return url.split('/')[-1].split('.')[0]
+
+    def setup_project(self, item):
+        # get branch
+        try:
+            branch = item['scm']['branch']
+        except KeyError:
+            branch = 'master'
+
+        # create project
+        project = self._project_name(item['scm']['url'])
+        try:
+            self.awx.project.create_scm_project(
+                name=project,
+                description=item['scm']['url'],
+                organization=self.organization,
+                scm_type='git',
+                url=item['scm']['url'],
+                branch=branch
+            )
+        except Exception:
+            self.awx.logger.warn('Project %s already exists.', project)
+
+        # wait for SCM update to finish
+        self.awx.project.wait_until_synced(project)
+
+    def run_task(self, item, credential, job_template):
+        project = self._project_name(item['scm']['url'])
+
+        # set extra vars for playbook
+        try:
+            extra_vars = item['extra_vars']
+        except KeyError:
+            extra_vars = None
+
+        # create job template
+        self.awx.job_template.create(
+            name=job_template,
+            description=item['description'],
+            job_type='run',
+            inventory=self.inventory,
+            project=project,
+            playbook='%s.yml' % item['name'],  # TODO: which file ext?
+            credential=credential,
+            extra_vars=extra_vars,
+            limit=','.join(self._split(item['hosts']))
+        )
+
+        try:
+            # run job template
+            results = self.awx.job.launch(
+                job_template,
+                item['description']
+            )
+
+            # wait for job to complete
+            output = self.awx.job.wait(results['id'], timeout=300)
+            self.awx.logger.debug(output)
+        finally:
+            # delete job template
+            self.awx.job_template.delete(job_template, project)
+
     def go(self):
         # create inventory
         self.awx.inventory.create(self.inventory, self.organization)
@@ -63,81 +135,53 @@ class Run(object):
                 inventory=self.inventory
             )
 
-        for item in self.orchestrate:
-            # get branch
-            try:
-                branch = item['scm']['branch']
-            except KeyError:
-                branch = 'master'
-
-            # create project
-            try:
-                project = item['scm']['url'].split('/')[-1].split('.')[0]
-
-                self.awx.project.create_scm_project(
-                    name=project,
-                    description=item['scm']['url'],
-                    organization=self.organization,
-                    scm_type='git',
-                    url=item['scm']['url'],
-                    branch=branch
-                )
-            except Exception:
-                self.awx.logger.warn('Project %s already exists.' % project)
-
-            # lets delay for SCM update to finish
-            # TODO: add a better check here
-            self.awx.logger.warn('Delay 15 seconds for SCM update to finish.')
-            time.sleep(15)
-
-            # create job template
-            job_template = 'job_%s' % self.rid
-
-            # set extra vars for playbook
-            try:
-                extra_vars = item['extra_vars']
-            except KeyError:
-                extra_vars = None
-
-            self.awx.job_template.create(
-                name=job_template,
-                description=item['description'],
-                job_type='run',
-                inventory=self.inventory,
-                project=project,
-                playbook='%s.yml' % item['name'],  # TODO: which file ext?
-                credential=credential,
-                extra_vars=extra_vars,
-                limit=item['hosts'].replace(' ', ',').strip()
-            )
-
-            # run job template
-            results = self.awx.job.launch(
-                job_template,
-                item['description']
+        # run the orchestrate tasks as a dependency graph
+        graph = TaskGraph()
+        projects = OrderedDict()
+        keys = {}
+        tasks = []
+
+        for index, item in enumerate(self.orchestrate):
+            # tasks may share a playbook name, key them uniquely
+            key = item['name']
+            if key in keys or key in graph.tasks:
+                key = '%s[%d]' % (item['name'], index)
+            keys.setdefault(item['name'], []).append(key)
+
+            # one project per scm url, shared by the tasks using it
+            url = item['scm']['url']
+            if url not in projects:
+                projects[url] = 'project:%s' % url
+                graph.add(projects[url], partial(self.setup_project, item))
+            tasks.append(key)
+
+        for index, (key, item) in enumerate(zip(tasks, self.orchestrate)):
+            after = [projects[item['scm']['url']]]
+            for name in self._split(item.get('after')):
+                after.extend(keys.get(name, [name]))
+
+            func = partial(self.run_task, item, credential,
+                           'job_%s_%d' % (self.rid, index))
+
+            # cleanup tasks only run when the task naming them fails
+            if item.get('cleanup_task'):
+                graph.add_handler(key, func, hosts=self._split(item['hosts']))
+                continue
+
+            graph.add(
+                key,
+                func,
+                after=after,
+                hosts=self._split(item['hosts']),
+                cleanup=bool(item.get('cleanup')),
+                on_failure=item.get('on_failure')
             )
 
-            # wait for job to complete
-            try:
-                output = self.awx.job.monitor(
-                    results['id'],
-                    interval=1,
-                    timeout=300
-                )
-                self.awx.logger.debug(output)
-
-                # delay
-                self.awx.logger.info('Delaying..')
-                time.sleep(2)
-
-            except Exception as ex:
-                self.awx.logger.warn(ex)
-
-            # delete job template
-            self.awx.job_template.delete(job_template, project)
+        DagExecutor(graph, self.concurrency).run()
 
-            # delete project
-            self.awx.project.delete(project)
+        # delete projects
+        for url in projects:
+            self.awx.project.delete(self._project_name(url))
 
         # delete inventory
         self.awx.inventory.delete(self.inventory)
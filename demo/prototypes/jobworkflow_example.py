@@ -112,7 +112,8 @@ for index, job_template in enumerate(playbookdict):
         )
         del_project = True
 
-    sleep(15)
+        # wait for SCM update to finish
+        awx_user.project.wait_until_synced(project + (str(index)))
 
     # create credentials
     awx_user.credential.create_ssh_credential(credential,
@@ -175,9 +176,15 @@ joblist = awx_user.workflow_job.get_jobs(workflow_job_id)
 
 job_result_list = []
 
-# Get the status of the individual jobs executed
+# Get the status of the individual jobs executed, in one request
+statuses = awx_user.job.statuses(joblist)
 for job_id in joblist:
-    status = awx_user.job.status(job_id)
+    status = statuses.get(job_id)
+    if status is None:
+        # deleted since the workflow ran, its outcome is unknown
+        LOG.error('Job {} not found, counting it as failed'.format(job_id))
+        job_result_list.append('failed')
+        continue
     job_result_list.append(status["status"])
     if status['status'] == 'successful':
         LOG.info('Playbook execution was successful')